@@ -0,0 +1,238 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from trade_table import CATEGORICAL_FIELDS, NUMERIC_FIELDS, DATE_FILTERS
+from trade_store import TradeStore
+from journal_log import JournalLog
+from sqlite_store import SQLiteJournalStore, JOURNAL_DB_FILE
+from partitions import PartitionedJournal, partition_dir
+import text_index
+import profiling
+
+# Headless analytics: nothing in here (or anything it imports) may pull in
+# tkinter or PIL, so reports can run on a server without a display.
+
+TRADES_FILE = "trades_journal.json"
+FILTER_FLAGS = {
+    "setup": "Setup",
+    "entry": "Entry Type",
+    "session": "Market Session",
+    "sl_reason": "Stop Loss Reason",
+    "close_reason": "Reason for Close",
+    "tp_reason": "Take Profit Reason",
+}
+SORT_FIELDS = CATEGORICAL_FIELDS + list(NUMERIC_FIELDS)
+
+
+def _no_progress(done, total, stage=""):
+    pass
+
+
+# --- Loading ---
+def load_journal(trades_file=TRADES_FILE, db_file=JOURNAL_DB_FILE, progress=_no_progress, keep_trades=True,
+                 date_range=None, workers=None, search=False, digests=False):
+    # search=True also attaches a text index (store.search), reusing the saved
+    # one when the journal files have not changed since it was written.
+    # digests=True keeps per-trade content digests for journal_watch.
+    signature = text_index.journal_signature(trades_file, db_file)
+    store, journal_trades = _read_store(trades_file, db_file, progress, keep_trades, date_range, workers, digests)
+    store.signature = signature
+    if search:
+        progress(0, 0, "Indexing notes")
+        with profiling.span("search.build"):
+            text_index.open_search_index(store, trades_file, signature, journal_trades)
+    return store
+
+
+def _read_store(trades_file, db_file, progress, keep_trades, date_range, workers, digests):
+    # (store, the journal dicts it was read from or None); a store that keeps
+    # no trades has no other way back to the notes for the text index.
+    if db_file and os.path.exists(db_file):
+        # Only the stats and text columns are read; full trades are fetched on demand.
+        progress(0, 0, "Querying database")
+        backend = SQLiteJournalStore(db_file)
+        with profiling.span("journal.read"):
+            source = backend.stats_trades()
+        store = TradeStore.from_journal(source, progress, backend=backend, keep_trades=False, digests=digests)
+        store.source = backend
+        return store, source
+    partitioned = PartitionedJournal(partition_dir(trades_file))
+    if partitioned.exists():
+        # Only partitions overlapping the range are parsed; the rest contribute
+        # their sidecar cubes to store.unloaded for all-time totals.
+        start, end = date_range or (None, None)
+        with profiling.span("journal.read"):
+            table, view, unloaded = partitioned.load_range(start, end, workers, progress)
+        profiling.count("trades_parsed", len(table))
+        with profiling.span("index.build"):
+            store = TradeStore(None, table, backend=view)
+        store.unloaded = unloaded
+        store.source = partitioned
+        return store, None
+    journal = JournalLog(trades_file)
+    if not journal.exists():
+        raise FileNotFoundError(f"{trades_file} not found.")
+    progress(0, 0, "Reading journal")
+    with profiling.span("journal.read"):
+        source = journal.read_trades()
+    store = TradeStore.from_journal(source, progress, keep_trades=keep_trades, digests=digests)
+    store.source = journal
+    return store, source
+
+
+def database_preview(db_file, filters=None):
+    # All-trade totals and filter options straight from SQLite, shown while the
+    # stats rows are still loading.
+    backend = SQLiteJournalStore(db_file)
+    try:
+        return backend.aggregates(filters or {}), {field: backend.distinct(field) for field in CATEGORICAL_FIELDS}
+    finally:
+        backend.close()
+
+
+# --- Filtering and Aggregates ---
+def min_sl_size(filters):
+    try:
+        return float(filters.get("Stop Loss Size", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def row_filters(filters):
+    return {field: filters.get(field, "") for field in ("Stop Loss Size",) + DATE_FILTERS}
+
+
+def filter_mask(table, index, filters, search=None):
+    mask = index.to_mask(index.select(filters)) & table.mask(row_filters(filters))
+    if search is not None and filters.get("Search", "").strip():
+        found = search.search(filters["Search"])
+        if found is not None:
+            mask &= found
+    return mask
+
+
+def aggregate(table, cube, filters, mask):
+    # SL size, trade dates and text search are not cube dimensions, so those
+    # filters need the trade rows.
+    if min_sl_size(filters) is not None or any(filters.get(field) for field in DATE_FILTERS + ("Search",)):
+        return table.aggregates(mask)
+    return cube.query(filters)
+
+
+def breakdown(cube, row_dim, col_dim, filters):
+    row_values, col_values, cells = cube.breakdown(row_dim, col_dim, filters)
+    return {
+        "rows": row_dim,
+        "columns": col_dim,
+        "cells": [
+            dict(cell, **{row_dim: row_value, col_dim: col_value})
+            for row_value, row_cells in zip(row_values, cells)
+            for col_value, cell in zip(col_values, row_cells)
+            if cell["total_trades"]
+        ],
+    }
+
+
+def journal_report(trades_file, db_file=None, filters=None, breakdown_dims=None, include_trades=False, sort_keys=()):
+    filters = filters or {}
+    if db_file and os.path.exists(db_file) and not (breakdown_dims or include_trades or filters.get("Search", "").strip()):
+        # A plain summary is one query; no trades need to be read.
+        summary, _ = database_preview(db_file, filters)
+        return {"journal": db_file, "filters": filters, "summary": summary}
+    date_range = (filters.get("From Date") or None, filters.get("To Date") or None)
+    store = load_journal(trades_file, db_file, keep_trades=False, date_range=date_range, search=bool(filters.get("Search")))
+    table = store.table
+    mask = filter_mask(table, store.index, filters, store.search)
+    report = {
+        "journal": db_file if isinstance(store.backend, SQLiteJournalStore) else trades_file,
+        "filters": filters,
+        "summary": aggregate(table, store.cube, filters, mask),
+    }
+    if breakdown_dims:
+        report["breakdown"] = breakdown(store.cube, breakdown_dims[0], breakdown_dims[1], filters)
+    if include_trades:
+        report["trades"] = [table.row(i) for i in table.sorted_indices(mask, sort_keys)]
+    return report
+
+
+# --- Command Line ---
+def _write_csv(reports, include_trades, out):
+    if include_trades:
+        fieldnames = ["journal", "ID"] + CATEGORICAL_FIELDS + ["Stop Loss Size", "P&L", "R:R", "Win", "Hold Time", "Trade Date", "Account Balance"]
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        writer.writeheader()
+        for report in reports:
+            for row in report["trades"]:
+                writer.writerow(dict(row, journal=report["journal"]))
+    else:
+        fieldnames = ["journal"] + list(reports[0]["summary"]) if reports else ["journal"]
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        writer.writeheader()
+        for report in reports:
+            writer.writerow(dict(report["summary"], journal=report["journal"]))
+
+
+def add_filter_arguments(parser):
+    # The Smart Filter Panel as flags; parsed_filters() turns them back into a filters dict.
+    for flag, field in FILTER_FLAGS.items():
+        parser.add_argument(f"--{flag.replace('_', '-')}", dest=flag, default="ANY", help=f"filter on {field}")
+    parser.add_argument("--min-sl", default="", help="minimum stop loss size (pips)")
+    parser.add_argument("--from", dest="from_date", default="", metavar="YYYY-MM-DD", help="first trade date")
+    parser.add_argument("--to", dest="to_date", default="", metavar="YYYY-MM-DD", help="last trade date")
+    parser.add_argument("--search", default="", metavar="QUERY",
+                        help='text search over notes and reasons: words AND, "phrase", prefix*, a OR b')
+
+
+def parsed_filters(args):
+    filters = {field: getattr(args, flag) for flag, field in FILTER_FLAGS.items()}
+    filters["Stop Loss Size"] = args.min_sl
+    filters["From Date"] = args.from_date
+    filters["To Date"] = args.to_date
+    filters["Search"] = args.search
+    return filters
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m analytics", description="Headless trading journal analytics.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats = commands.add_parser("stats", help="Filtered stats for one or more journals.")
+    stats.add_argument("journals", nargs="*", default=[TRADES_FILE], help=f"journal JSON files (default: {TRADES_FILE})")
+    stats.add_argument("--db", help="read from a SQLite journal instead of JSON")
+    add_filter_arguments(stats)
+    stats.add_argument("--breakdown", nargs=2, metavar=("ROWS", "COLUMNS"), choices=CATEGORICAL_FIELDS,
+                       help="win rate / P&L matrix over two fields")
+    stats.add_argument("--trades", action="store_true", help="include the filtered trades")
+    stats.add_argument("--sort", action="append", default=[], metavar="COLUMN[:desc]", help="sort trades (repeatable)")
+    stats.add_argument("--format", choices=["json", "csv"], default="json")
+    stats.add_argument("--workers", type=int, default=os.cpu_count(), help="processes for multiple journals")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    filters = parsed_filters(args)
+    sort_keys = tuple((key.split(":")[0], key.endswith(":desc")) for key in args.sort)
+    for field, _ in sort_keys:
+        if field not in SORT_FIELDS:
+            parser.error(f"--sort: unknown column {field!r} (choose from {', '.join(SORT_FIELDS)})")
+    jobs = [(path, args.db, filters, args.breakdown, args.trades, sort_keys) for path in (args.journals if not args.db else [TRADES_FILE])]
+    if len(jobs) > 1 and args.workers > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+            reports = list(pool.map(journal_report, *zip(*jobs)))
+    else:
+        reports = [journal_report(*job) for job in jobs]
+    if args.format == "json":
+        json.dump(reports if len(reports) > 1 else reports[0], sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        _write_csv(reports, args.trades, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-from datetime import datetime, time as dt_time, timedelta
 import pytz
 import os
-import json
+import queue
 
-try:
-    from PIL import Image, ImageTk
-except ImportError:
-    import sys
-    messagebox.showerror("Missing Dependency", "Pillow (PIL) is required for image thumbnails.\nInstall it with:\n\npip install pillow")
-    sys.exit(1)
-
-import stats  # <-- Make sure stats.py is in the same directory!
+from sqlite_store import open_journal_store
+from journal_loader import start_load
+import importer
+import text_index
+from trade_model import Trade
+from trade_store import TradeStore, trade_digest
+import profiling
+import diagnostics
 
 # --- Constants ---
-PIP_VALUE_XAUUSD = 0.1
-USD_PER_PIP_PER_LOT = 10
 DEFAULT_SL_LOGIC = ["Below Support", "ATR Stop", "Structure", "Other"]
 DEFAULT_TP_LOGIC = ["At Resistance", "RR Ratio", "Previous High", "Other"]
 DEFAULT_SETUPS = ["Breakout", "Reversal", "Pullback", "Trend Continuation", "Range", "News Play", "Other"]
@@ -26,12 +23,6 @@ DEFAULT_PARTIAL_CLOSE_REASONS = [
     "Volatility Spike", "News Event Approaching", "Time Based Exit", "Price Action Shift", "Manual Intervention", "Other"
 ]
 TIMEFRAME_ENTRIES = ["15m", "30m", "1h", "4h", "1d"]
-MARKET_SESSIONS_UTC = [
-    ("Sydney", dt_time(21, 0), dt_time(6, 0)),
-    ("Tokyo", dt_time(0, 0), dt_time(9, 0)),
-    ("London", dt_time(8, 0), dt_time(17, 0)),
-    ("New York", dt_time(13, 0), dt_time(22, 0)),
-]
 COMMON_TIMEZONES = ["UTC", "US/Eastern", "Europe/London", "Asia/Tokyo", "Australia/Sydney"]
 
 TRADES_FILE = "trades_journal.json"
@@ -41,84 +32,7 @@ ENTRY_FILE = os.path.join(PLAYBOOK_DIR, "entries.json")
 SL_REASONS_FILE = os.path.join(PLAYBOOK_DIR, "sl_reasons.json")
 TP_REASONS_FILE = os.path.join(PLAYBOOK_DIR, "tp_reasons.json")
 PARTIAL_CLOSE_REASONS_FILE = os.path.join(PLAYBOOK_DIR, "close_reasons.json")
-
-# --- Trade Class ---
-class Trade:
-    def __init__(self, symbol, timeframe, info=None, tf_screenshots=None, review=None, partial_closes=None, sl_to_be=False):
-        self.symbol = symbol
-        self.timeframe = timeframe
-        self.info = info or {}
-        self.tf_screenshots = tf_screenshots or {
-            "D1": {"before": None, "after": None},
-            "H4": {"before": None, "after": None},
-            "H1": {"before": None, "after": None}
-        }
-        self.review = review or {
-            "outcome": "",
-            "price": "",
-            "notes": "",
-            "exit_time": "",
-            "max_drawdown_pips": "",
-        }
-        self.partial_closes = partial_closes or []
-        self.sl_to_be = sl_to_be
-
-    def to_dict(self):
-        return {
-            "symbol": self.symbol,
-            "timeframe": self.timeframe,
-            "info": self.info,
-            "tf_screenshots": self.tf_screenshots,
-            "review": self.review,
-            "partial_closes": self.partial_closes,
-            "sl_to_be": self.sl_to_be
-        }
-
-    @classmethod
-    def from_dict(cls, d):
-        default_review = {
-            "outcome": "",
-            "price": "",
-            "notes": "",
-            "exit_time": "",
-            "max_drawdown_pips": "",
-        }
-        review_data = d.get("review", {})
-        review_data = {**default_review, **review_data}
-        default_tf_screenshots = {
-            "D1": {"before": None, "after": None},
-            "H4": {"before": None, "after": None},
-            "H1": {"before": None, "after": None}
-        }
-        tf_screenshots_data = d.get("tf_screenshots", {})
-        for tf in default_tf_screenshots:
-            if tf not in tf_screenshots_data:
-                tf_screenshots_data[tf] = default_tf_screenshots[tf]
-            else:
-                if "before" not in tf_screenshots_data[tf]:
-                    tf_screenshots_data[tf]["before"] = None
-                if "after" not in tf_screenshots_data[tf]:
-                    tf_screenshots_data[tf]["after"] = None
-        partial_closes_data = d.get("partial_closes", [])
-        for pc in partial_closes_data:
-            pc.setdefault("pips", 0.0)
-            if "reason_for_close" not in pc:
-                if "notes" in pc and pc["notes"] is not None:
-                    pc["reason_for_close"] = pc["notes"]
-                else:
-                    pc["reason_for_close"] = ""
-                pc.pop("notes", None)
-            pc.setdefault("pnl", 0.0)
-        sl_to_be_val = d.get("sl_to_be", False)
-        return cls(
-            d.get("symbol", ""),
-            d.get("timeframe", ""),
-            d.get("info", {}),
-            tf_screenshots_data,
-            review_data,
-            partial_closes_data,
-            sl_to_be=sl_to_be_val
-        )
+SEARCH_SAVE_DELAY_MS = 30000  # the search index is rewritten whole, so saves wait for a quiet spell
 
 # --- TradingJournalApp Class ---
 class TradingJournalApp(tk.Tk):
@@ -126,7 +40,16 @@ class TradingJournalApp(tk.Tk):
         super().__init__()
         self.title("Trading Journal")
         self.geometry("1500x780")
-        self.trades = []
+        self.journal = open_journal_store(TRADES_FILE)
+        self.trade_store = TradeStore([])
+        self.trade_store.mark_saved()
+        self.trades = self.trade_store.trades
+        self.trades_load = None
+        self.stats_pages = []
+        self._loading = False
+        self._journal_loaded = False  # no writes until a load has read the log's seq
+        self._search_save_job = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.account_balance_var = tk.DoubleVar(value=10000.00)
         self.trade_stats_var = tk.StringVar()
         self._sl_tp_is_updating = False
@@ -140,6 +63,7 @@ class TradingJournalApp(tk.Tk):
         # Statistics and Balance Display
         stats_frame = ttk.Frame(self)
         stats_frame.pack(fill="x", padx=0, pady=0)
+        self.stats_frame = stats_frame
         self.stats_label = ttk.Label(stats_frame, textvariable=self.trade_stats_var, font=("Segoe UI", 10, "bold"), foreground="#444")
         self.stats_label.pack(side="left", padx=(14, 5), pady=(5, 0))
         bal_label = ttk.Label(stats_frame, text="Account Balance:", font=("Segoe UI", 10, "bold"))
@@ -169,7 +93,8 @@ class TradingJournalApp(tk.Tk):
         menubar = tk.Menu(self)
         filemenu = tk.Menu(menubar, tearoff=0)
         filemenu.add_command(label="Save", command=self.save_trades)
-        filemenu.add_command(label="Load", command=self.load_trades)
+        filemenu.add_command(label="Load", command=self.load_trades_async)
+        filemenu.add_command(label="Import History...", command=self.import_history)
         menubar.add_cascade(label="File", menu=filemenu)
         # Add Stats menu
         menubar.add_command(label="Stats", command=self.open_stats_page)
@@ -179,9 +104,10 @@ class TradingJournalApp(tk.Tk):
         stats_btn = ttk.Button(self, text="Open Stats", command=self.open_stats_page)
         stats_btn.pack(pady=6)
 
-        # Initial load and update
-        self.load_trades()
-        self.update_stats_bar()
+        diagnostics.bind_shortcut(self)
+
+        # Initial load and update, off the Tk thread
+        self.load_trades_async()
 
     # ---- Placeholder methods (implementations should exist in your file) ----
     def build_journal_tab(self): pass
@@ -190,13 +116,235 @@ class TradingJournalApp(tk.Tk):
     def load_playbook_options(self): pass
     def update_balance_popup(self): pass
     def _on_focus_select_all(self, widget, tk_var_ref=None): pass
-    def save_trades(self): pass
-    def load_trades(self): pass
-    def update_stats_bar(self): pass
+
+    def update_stats_bar(self):
+        agg = self.trade_store.cube.query({})
+        self.trade_stats_var.set(
+            f"Trades: {agg['total_trades']}  |  Win Rate: {agg['win_rate']:.1f}%  |  "
+            f"P&L: ${agg['total_pnl']:.2f}  |  Avg. R:R: {agg['avg_rr']:.2f}"
+        )
+
+    # --- Journal Persistence ---
+    def load_trades(self):
+        self._use_store(self._read_trades(lambda done, total, stage="": None))
+
+    def _read_trades(self, progress):
+        progress(0, 0, "Reading journal")
+        signature = text_index.journal_signature(TRADES_FILE)
+        with profiling.span("journal.read"):
+            journal_dicts = self.journal.load()
+        store = TradeStore.from_journal(journal_dicts, progress)
+        store.mark_saved()
+        progress(0, 0, "Indexing notes")
+        with profiling.span("search.build"):
+            text_index.open_search_index(store, TRADES_FILE, signature)
+        return store
+
+    def _use_store(self, store):
+        # The log stops keeping its own copy; compaction serializes these trades.
+        old = self.trade_store
+        self.trade_store = store
+        self.trades = store.trades
+        self.journal.attach(store.trades)
+        self._journal_loaded = True
+        # Stats pages sharing the old store follow the new one, so their edits
+        # land in the store this window saves.
+        self.stats_pages = [page for page in self.stats_pages if page.winfo_exists()]
+        for page in self.stats_pages:
+            if page.trade_store is old:
+                page.on_data_loaded(store)
+
+    def load_trades_async(self):
+        if self._loading:
+            return  # the running load already has a progress bar and subscribers
+        self._loading = True
+        self.load_progress = ttk.Progressbar(self.stats_frame, length=160, mode="indeterminate")
+        self.load_progress.pack(side="left", padx=(10, 0), pady=(5, 0))
+        self.load_progress.start(20)
+        self.trades_load = start_load(("journal", id(self.journal)), self._read_trades, self)
+        self.trades_load.subscribe(self._on_trades_loaded, self._on_trades_progress, self._on_trades_load_error)
+
+    def _on_trades_progress(self, done, total, stage):
+        if total:
+            self.load_progress.stop()
+            self.load_progress.config(mode="determinate", maximum=total, value=done)
+        self.trade_stats_var.set(f"{stage}... {done}/{total}" if total else f"{stage}...")
+
+    def _on_trades_loaded(self, store):
+        self._use_store(store)
+        self._finish_loading()
+        self.update_stats_bar()
+
+    def _on_trades_load_error(self, error):
+        self._finish_loading()
+        messagebox.showerror("Error", f"Could not load {TRADES_FILE}:\n{error}")
+
+    def _finish_loading(self):
+        self._loading = False
+        self.load_progress.destroy()
+        self.trade_stats_var.set("")
+
+    def _busy(self):
+        # The journal is being read or imported into off the Tk thread; writing
+        # to it now would interleave with that thread's writes.
+        if self._loading:
+            messagebox.showinfo("Loading", "The journal is still loading; try again in a moment.")
+            return True
+        # Until a load succeeds the log's seq is unknown, and new records would
+        # reuse seqs already in the log.
+        if not self._journal_loaded:
+            messagebox.showerror("Error", f"{TRADES_FILE} could not be loaded, so nothing can be saved to it.\n"
+                                          "Use File > Load to try again.")
+            return True
+        return False
+
+    def save_trades(self):
+        if self._busy():
+            return
+        with profiling.span("journal.save"):
+            # Only trades whose content digest changed are appended to the log.
+            store = self.trade_store
+            for idx in range(len(store.digests) - 1, len(self.trades) - 1, -1):
+                self.journal.delete(idx)
+                store.forget(idx)
+            for idx, trade in enumerate(self.trades):
+                trade_dict = trade.to_dict()
+                digest = trade_digest(trade_dict)
+                if idx >= len(store.digests):
+                    self.journal.add(trade_dict)
+                    store.record(idx, trade_dict, digest)
+                elif digest != store.digests[idx]:
+                    self.journal.edit(idx, trade_dict)
+                    store.record(idx, trade_dict, digest)
+            self.journal.maybe_compact()
+        self.schedule_search_save()
+        self.update_stats_bar()
+
+    def schedule_search_save(self):
+        # Each change restarts the timer; on_close saves whatever is still pending.
+        if self._search_save_job is not None:
+            self.after_cancel(self._search_save_job)
+        self._search_save_job = self.after(SEARCH_SAVE_DELAY_MS, self.save_search_index)
+
+    def save_search_index(self):
+        # Written after the journal, so its signature matches the files just saved.
+        if self._search_save_job is not None:
+            self.after_cancel(self._search_save_job)
+            self._search_save_job = None
+        if self._loading:
+            return  # an import is still writing; its end schedules another save
+        search = self.trade_store.search
+        if search is not None:
+            try:
+                search.save(text_index.index_path(TRADES_FILE), text_index.journal_signature(TRADES_FILE))
+            except OSError:
+                pass  # the next start rebuilds it
+
+    def add_trade(self, trade):
+        if self._busy():
+            return
+        self.journal.add(trade.to_dict())
+        self.trade_store.add(trade)
+        self.journal.maybe_compact()
+        self.schedule_search_save()
+        self.update_stats_bar()
+
+    def update_trade(self, idx, trade):
+        if self._busy():
+            return
+        self.journal.edit(idx, trade.to_dict())
+        self.trade_store.replace(idx, trade)
+        self.journal.maybe_compact()
+        self.schedule_search_save()
+        self.update_stats_bar()
+
+    def delete_trade(self, idx):
+        if self._busy():
+            return
+        self.journal.delete(idx)
+        self.trade_store.delete(idx)
+        self.journal.maybe_compact()
+        self.schedule_search_save()
+        self.update_stats_bar()
+
+    # --- Broker History Import ---
+    def import_history(self):
+        if self._busy():
+            return
+        path = filedialog.askopenfilename(
+            title="Import MT4/MT5 account history",
+            filetypes=[("Account history", "*.htm *.html *.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        timezone = simpledialog.askstring("Broker Time Zone", "Time zone of the broker's server times:", initialvalue="UTC", parent=self)
+        if not timezone:
+            return
+        if timezone not in pytz.all_timezones_set:
+            messagebox.showerror("Import", f"Unknown time zone: {timezone}")
+            return
+        index = importer.ImportIndex(t.info for t in self.trades)
+        name = os.path.basename(path)
+        written = queue.Queue()
+
+        def run(progress):
+            # Parsing and journal writes happen here, off the Tk thread; each
+            # written batch is handed over for the store through `written`.
+            counts = {}
+            for batch, counts in importer.import_batches(path, self.journal, index, timezone):
+                written.put(batch)
+                progress(counts["imported"], counts["rows"], "Importing")
+            return counts
+
+        self._loading = True
+        load = start_load(("import", os.path.abspath(path)), run, self)
+        load.subscribe(
+            lambda counts: self._on_import_done(name, written, counts),
+            lambda done, total, stage: self._on_import_progress(name, written, done, total),
+            lambda error: self._on_import_error(name, written, error),
+        )
+
+    def _take_imported(self, written):
+        # Trades already in the journal join the store on the Tk thread, so its
+        # listeners (table, index, views) can touch widgets.
+        batch = []
+        while True:
+            try:
+                batch.extend(written.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.trade_store.extend([Trade.from_dict(d) for d in batch])
+
+    def _on_import_progress(self, name, written, imported, rows):
+        self._take_imported(written)
+        self.trade_stats_var.set(f"Importing {name}... {imported} new / {rows} rows")
+
+    def _on_import_done(self, name, written, counts):
+        self._take_imported(written)
+        self._loading = False
+        self.journal.maybe_compact()
+        self.schedule_search_save()
+        self.update_stats_bar()
+        messagebox.showinfo("Import", (
+            f"{name}: {counts['imported']} trades imported, {counts['duplicates']} already in the journal, "
+            f"{counts['skipped']} rows skipped (balance, pending or open)."))
+
+    def _on_import_error(self, name, written, error):
+        # Batches written before the error stay in the journal, so keep them here too.
+        self._take_imported(written)
+        self._loading = False
+        self.update_stats_bar()
+        messagebox.showerror("Import", f"Could not import {name}:\n{error}")
+
+    def on_close(self):
+        if self._search_save_job is not None:
+            self.save_search_index()
+        self.destroy()
 
     # --- Add this method to open stats window ---
     def open_stats_page(self):
-        stats.StatsPage(self)
+        import stats  # <-- Make sure stats.py is in the same directory!
+        self.stats_pages.append(stats.StatsPage(self))
 
 if __name__ == "__main__":
     app = TradingJournalApp()
@@ -0,0 +1,349 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pytz
+
+import analytics
+import stats
+from app import (
+    Trade, DEFAULT_SETUPS, DEFAULT_ENTRIES, DEFAULT_SL_LOGIC, DEFAULT_TP_LOGIC, DEFAULT_PARTIAL_CLOSE_REASONS,
+    COMMON_TIMEZONES, TIMEFRAME_ENTRIES, TRADES_FILE,
+)
+from constants import USD_PER_PIP_PER_LOT
+from trade_table import TradeTable, TABLE_COLUMNS
+from trade_store import TradeStore
+from filter_index import BitmapIndex
+from stats_cube import StatsCube
+from journal_log import JournalLog, write_json_atomic
+from equity import equity_curve, lttb
+from importer import session_for
+from text_index import SearchIndex, trade_text
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_SIZES = SIZES[:3]
+DEFAULT_SEED = 42
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.005  # ignore ratio swings on stages this fast
+VISIBLE_ROWS = 40
+CHART_WIDTH = 1000
+START_DATE = datetime(2019, 1, 1)
+SPAN_DAYS = 6 * 365
+OUTCOMES = [("Take Profit Hit", 0.42), ("Stop Loss Hit", 0.38), ("Break Even", 0.08), ("Manual Close", 0.12)]
+FILTER_CASES = [
+    {},
+    {"Setup": "Breakout"},
+    {"Setup": "Pullback", "Market Session": "London"},
+    {"Entry Type": "Limit", "Reason for Close": "Take Profit Hit", "Stop Loss Size": "50"},
+]
+SORT_KEYS = (("P&L", True),)
+SEARCH_CASES = ["plan", "news OR spike", '"moved sl"', "resist* candle", "volatil* OR momentum*"]
+
+
+# --- Synthetic Journal ---
+@lru_cache(maxsize=None)
+def _utc_offset(zone_name, day, hour):
+    tz = pytz.timezone(zone_name)
+    return pytz.utc.localize(START_DATE + timedelta(days=day, hours=hour)).astimezone(tz).utcoffset()
+
+
+def _partial_closes(rng, lot_size, sl_pips, outcome):
+    closes = []
+    for _ in range(rng.choice((1, 1, 2))):
+        pips = round(rng.uniform(0.3, 2.5) * sl_pips * (1 if outcome != "Stop Loss Hit" else 0.4), 1)
+        lot = round(lot_size * rng.choice((0.25, 0.5)), 2)
+        closes.append({
+            "lot": lot,
+            "pips": pips,
+            "pnl": round(pips * lot * USD_PER_PIP_PER_LOT, 2),
+            "reason_for_close": rng.choice(DEFAULT_PARTIAL_CLOSE_REASONS[1:]),
+        })
+    return closes
+
+
+def generate_trade(rng, idx, utc_dt, balance):
+    zone = rng.choice(COMMON_TIMEZONES)
+    local_dt = utc_dt + _utc_offset(zone, (utc_dt - START_DATE).days, utc_dt.hour)
+    sl_pips = float(rng.randrange(20, 300, 5))
+    lot_size = round(rng.choice((0.01, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)) * rng.uniform(0.5, 1.5), 2) or 0.01
+    risk = sl_pips * lot_size * USD_PER_PIP_PER_LOT
+    tp_pips = sl_pips * rng.choice((1.0, 1.5, 2.0, 3.0))
+    outcome = rng.choices([o for o, _ in OUTCOMES], weights=[w for _, w in OUTCOMES])[0]
+    if outcome == "Take Profit Hit":
+        pnl = risk * tp_pips / sl_pips
+    elif outcome == "Stop Loss Hit":
+        pnl = -risk
+    elif outcome == "Break Even":
+        pnl = 0.0
+    else:
+        pnl = rng.uniform(-risk, 2 * risk)
+    exit_dt = local_dt + timedelta(minutes=rng.randint(5, 3 * 24 * 60))
+    # Same-day exits are often stored as a bare time, as the entry form does.
+    exit_time = exit_dt.strftime("%H:%M") if exit_dt.date() == local_dt.date() and rng.random() < 0.5 else exit_dt.strftime("%Y-%m-%d %H:%M")
+    entry_price = round(rng.uniform(1200, 2600), 2)
+    direction = rng.choice(("Buy", "Sell"))
+    sign = 1 if direction == "Buy" else -1
+    timeframe = rng.choice(TIMEFRAME_ENTRIES)
+    shots = {
+        tf: {when: f"screenshots/{idx:07d}_{tf}_{when}.png" if rng.random() < 0.7 else None for when in ("before", "after")}
+        for tf in ("D1", "H4", "H1")
+    }
+    return {
+        "symbol": "XAUUSD",
+        "timeframe": timeframe,
+        "info": {
+            "symbol": "XAUUSD",
+            "timeframe": timeframe,
+            "entry": rng.choice(DEFAULT_ENTRIES),
+            "setup": rng.choice(DEFAULT_SETUPS),
+            "trade_type": direction,
+            "trade_date": local_dt.strftime("%Y-%m-%d"),
+            "trade_time": local_dt.strftime("%H:%M"),
+            "market_session": session_for(utc_dt.time()),
+            "timezone": zone,
+            "entry_price": entry_price,
+            "lot_size": lot_size,
+            "sl_pips": sl_pips,
+            "sl_price": round(entry_price - sign * sl_pips * 0.1, 2),
+            "tp_pips": tp_pips,
+            "tp_price": round(entry_price + sign * tp_pips * 0.1, 2),
+            "sl_reason": rng.choice(DEFAULT_SL_LOGIC),
+            "tp_reason": rng.choice(DEFAULT_TP_LOGIC),
+            "account_balance": round(balance, 2),
+        },
+        "tf_screenshots": shots,
+        "review": {
+            "outcome": outcome,
+            "price": round(pnl, 2),
+            "notes": rng.choice(("", "", "Followed plan.", "Entered early.", "Moved SL to BE after TP1.", "News spike.")),
+            "exit_time": exit_time,
+            "max_drawdown_pips": round(rng.uniform(0, sl_pips), 1),
+        },
+        "partial_closes": _partial_closes(rng, lot_size, sl_pips, outcome) if rng.random() < 0.3 else [],
+        "sl_to_be": rng.random() < 0.2,
+    }
+
+
+def generate_trades(n, seed=DEFAULT_SEED):
+    rng = random.Random(seed)
+    step = SPAN_DAYS * 24 * 60 / max(n, 1)
+    balance = 10000.0
+    trades = []
+    for idx in range(n):
+        utc_dt = START_DATE + timedelta(minutes=int(idx * step + rng.uniform(0, step)))
+        trade = generate_trade(rng, idx, utc_dt, balance)
+        balance += trade["review"]["price"]
+        trades.append(trade)
+    return trades
+
+
+def write_journal(path, n, seed=DEFAULT_SEED):
+    write_json_atomic(path, {"trades": generate_trades(n, seed), "log_seq": 0})
+    return path
+
+
+# --- Stage Timing ---
+def timed(fn, repeat):
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _filter_all(table, index):
+    table._sort_cache.clear()
+    return [table.sorted_indices(analytics.filter_mask(table, index, f), SORT_KEYS) for f in FILTER_CASES]
+
+
+def _aggregate_all(table, cube, masks):
+    return [analytics.aggregate(table, cube, f, mask) for f, mask in zip(FILTER_CASES, masks)]
+
+
+def _equity_all(table, masks):
+    # What a filter change costs the equity chart: the curve plus one downsample to canvas width.
+    table._sort_cache.clear()
+    return [lttb(equity_curve(table, mask)["equity"], CHART_WIDTH) for mask in masks]
+
+
+def _treeview_stage(table, rows, repeat):
+    import tkinter as tk
+    from virtual_table import VirtualTreeview
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        # No display: time the row formatting a render does, without the widget.
+        seconds, _ = timed(lambda: [table.table_values(int(i)) for i in rows[:VISIBLE_ROWS]], repeat)
+        return seconds, "values-only"
+    try:
+        root.withdraw()
+        view = VirtualTreeview(root, TABLE_COLUMNS, table.table_values, show="headings")
+        view.visible_count = VISIBLE_ROWS
+
+        def populate():
+            view.tree.delete(*view.tree.get_children())
+            view.set_rows(rows)
+            root.update_idletasks()
+        seconds, _ = timed(populate, repeat)
+        return seconds, "tk"
+    finally:
+        root.destroy()
+
+
+def memory_per_trade(path):
+    # Traced bytes per trade: the parsed journal dicts on their own, then the
+    # shared TradeStore (trades, table, index, cube, digests) once they are freed.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        journal_trades = JournalLog(path).read_trades()
+        n = max(len(journal_trades), 1)
+        dicts = tracemalloc.get_traced_memory()[0]
+        store = TradeStore.from_journal(journal_trades)
+        store.mark_saved()
+        del journal_trades
+        gc.collect()
+        shared = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del store
+    return {"journal_dicts": dicts / n, "trade_store": shared / n}
+
+
+def bench_size(n, workdir, seed=DEFAULT_SEED, repeat=1, memory=True):
+    size_dir = os.path.join(workdir, f"journal_{n}_{seed}")
+    os.makedirs(size_dir, exist_ok=True)
+    path = os.path.join(size_dir, TRADES_FILE)
+    timings = {}
+    if not os.path.exists(path):
+        timings["generate"], _ = timed(lambda: write_journal(path, n, seed), 1)
+    cwd = os.getcwd()
+    os.chdir(size_dir)  # load_journal_data reads TRADES_FILE from the working directory
+    try:
+        timings["load_journal_data"], journal_trades = timed(stats.load_journal_data, repeat)
+    finally:
+        os.chdir(cwd)
+    timings["trade_from_dict"], _ = timed(lambda: [Trade.from_dict(d) for d in journal_trades], repeat)
+    timings["parse_trades_for_stats"], _ = timed(lambda: stats.parse_trades_for_stats(journal_trades), repeat)
+    table = TradeTable.from_journal(journal_trades)
+    timings["build_index"], (index, cube) = timed(lambda: (BitmapIndex.from_table(table), StatsCube.from_table(table)), repeat)
+    timings["apply_filters"], rows = timed(lambda: _filter_all(table, index), repeat)
+    masks = [analytics.filter_mask(table, index, f) for f in FILTER_CASES]
+    timings["aggregates"], _ = timed(lambda: _aggregate_all(table, cube, masks), repeat)
+    timings["equity_curve"], _ = timed(lambda: _equity_all(table, masks), repeat)
+    timings["treeview"], treeview_mode = _treeview_stage(table, rows[0], repeat)
+    timings["search_build"], search = timed(lambda: SearchIndex.build(trade_text(d) for d in journal_trades), repeat)
+    timings["search_query"], _ = timed(lambda: [search.search(q) for q in SEARCH_CASES], repeat)
+    del journal_trades, table, index, cube, search
+    result = {
+        "trades": n,
+        "file_bytes": os.path.getsize(path),
+        "treeview_mode": treeview_mode,
+        "stages": timings,
+    }
+    if memory:
+        result["memory_bytes_per_trade"] = memory_per_trade(path)
+    return result
+
+
+# --- Baseline Comparison ---
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    comparison = {}
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for stage, seconds in result["stages"].items():
+            base_seconds = base["stages"].get(stage)
+            if stage == "generate" or not base_seconds:
+                continue
+            ratio = seconds / base_seconds
+            comparison.setdefault(size, {})[stage] = {"baseline": base_seconds, "current": seconds, "ratio": ratio}
+            if ratio > 1 + tolerance and seconds - base_seconds > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{size}/{stage}")
+    return comparison, regressions
+
+
+def run(sizes, workdir, seed=DEFAULT_SEED, repeat=1, progress=None, memory=True):
+    results = {}
+    for n in sizes:
+        if progress:
+            progress(f"benchmarking {n} trades")
+        results[str(n)] = bench_size(n, workdir, seed, repeat, memory)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+# --- Command Line ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Trading journal performance benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Write a synthetic journal.")
+    generate.add_argument("trades", type=int)
+    generate.add_argument("--output", default=TRADES_FILE)
+    generate.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    bench = commands.add_parser("run", help="Time each loading and filtering stage.")
+    bench.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help=f"journal sizes (up to {SIZES[-1]})")
+    bench.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    bench.add_argument("--repeat", type=int, default=3, help="best of N runs per stage")
+    bench.add_argument("--workdir", help="keep generated journals here for reuse (default: a temporary directory)")
+    bench.add_argument("--output", help="write the JSON results to a file instead of stdout")
+    bench.add_argument("--baseline", help="compare against a saved results file")
+    bench.add_argument("--save-baseline", help="also write the results as a new baseline")
+    bench.add_argument("--no-memory", action="store_true", help="skip the traced per-trade memory pass")
+    bench.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before a stage counts as a regression")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "generate":
+        write_journal(args.output, args.trades, args.seed)
+        return 0
+    workdir = args.workdir or tempfile.mkdtemp(prefix="journal_bench_")
+    try:
+        report = run(args.sizes, workdir, args.seed, max(1, args.repeat), lambda msg: print(msg, file=sys.stderr),
+                     memory=not args.no_memory)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["comparison"], regressions = compare(report["results"], json.load(f), args.tolerance)
+        report["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
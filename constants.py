@@ -0,0 +1,13 @@
+from datetime import time as dt_time
+
+# Market constants shared by the journal window, the importer and the headless
+# stats code; nothing here may import tkinter.
+
+PIP_VALUE_XAUUSD = 0.1
+USD_PER_PIP_PER_LOT = 10
+MARKET_SESSIONS_UTC = [
+    ("Sydney", dt_time(21, 0), dt_time(6, 0)),
+    ("Tokyo", dt_time(0, 0), dt_time(9, 0)),
+    ("London", dt_time(8, 0), dt_time(17, 0)),
+    ("New York", dt_time(13, 0), dt_time(22, 0)),
+]
@@ -0,0 +1,98 @@
+import tkinter as tk
+from tkinter import ttk
+
+import profiling
+
+REFRESH_MS = 500
+SHORTCUT = "<Control-Shift-D>"
+PROFILE_TARGETS = [
+    "journal.read", "trade.from_dict", "table.build", "index.build", "search.build",
+    "stats.filter", "stats.aggregate", "stats.equity", "stats.sync", "treeview.render", "image.decode",
+]
+
+_window = None
+
+
+# --- Diagnostics Window ---
+# Not on any menu: opened with Ctrl+Shift+D from the journal or stats windows.
+class DiagnosticsWindow(tk.Toplevel):
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Diagnostics")
+        self.geometry("720x520")
+
+        controls = ttk.Frame(self)
+        controls.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        self.enabled_var = tk.BooleanVar(value=profiling.ENABLED)
+        ttk.Checkbutton(controls, text="Record timings", variable=self.enabled_var,
+                        command=lambda: profiling.enable(self.enabled_var.get())).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Reset", command=profiling.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="cProfile next:").pack(side=tk.LEFT, padx=(20, 5))
+        self.profile_target = ttk.Combobox(controls, values=PROFILE_TARGETS, width=18)
+        self.profile_target.set(PROFILE_TARGETS[0])
+        self.profile_target.pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Arm", command=self.arm_profile).pack(side=tk.LEFT, padx=5)
+
+        spans_frame = ttk.LabelFrame(self, text="Timings (ms, rolling window)", padding="5")
+        spans_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
+        columns = ("Span", "Calls", "Last", "p50", "p95", "Max")
+        self.spans_tree = ttk.Treeview(spans_frame, columns=columns, show="headings", height=10)
+        for col in columns:
+            self.spans_tree.heading(col, text=col)
+            self.spans_tree.column(col, width=80, anchor=tk.E)
+        self.spans_tree.column("Span", width=180, anchor=tk.W)
+        self.spans_tree.pack(fill=tk.BOTH, expand=True)
+
+        counters_frame = ttk.LabelFrame(self, text="Counters", padding="5")
+        counters_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+        self.counters_tree = ttk.Treeview(counters_frame, columns=("Counter", "Value"), show="headings", height=5)
+        self.counters_tree.heading("Counter", text="Counter")
+        self.counters_tree.heading("Value", text="Value")
+        self.counters_tree.column("Counter", width=180, anchor=tk.W)
+        self.counters_tree.column("Value", width=100, anchor=tk.E)
+        self.counters_tree.pack(fill=tk.X)
+
+        self.profile_status = ttk.Label(self, text="", foreground="#444")
+        self.profile_status.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(0, 10))
+        self.refresh()
+
+    def arm_profile(self):
+        if not profiling.ENABLED:
+            self.enabled_var.set(True)
+            profiling.enable(True)
+        path = profiling.profile_next(self.profile_target.get())
+        self.profile_status.config(text=f"Waiting for {self.profile_target.get()} -> {path}")
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        snap = profiling.snapshot()
+        self.spans_tree.delete(*self.spans_tree.get_children())
+        for s in snap["spans"]:
+            self.spans_tree.insert("", "end", values=(
+                s["name"], s["calls"],
+                *(f"{s[key] * 1000:.2f}" for key in ("last", "p50", "p95", "max")),
+            ))
+        self.counters_tree.delete(*self.counters_tree.get_children())
+        for name, value in sorted(snap["counters"].items()):
+            self.counters_tree.insert("", "end", values=(name, value))
+        names = sorted(set(PROFILE_TARGETS) | set(profiling.span_names()))
+        if list(self.profile_target["values"]) != names:
+            self.profile_target["values"] = names
+        dumps = profiling.dumps()
+        if dumps and not profiling.armed():
+            self.profile_status.config(text=f"Last profile: {dumps[-1]}")
+        self.after(REFRESH_MS, self.refresh)
+
+
+def open_diagnostics(master):
+    global _window
+    if _window is not None and _window.winfo_exists():
+        _window.lift()
+        return _window
+    _window = DiagnosticsWindow(master)
+    return _window
+
+
+def bind_shortcut(widget):
+    widget.bind(SHORTCUT, lambda e: open_diagnostics(widget))
@@ -0,0 +1,88 @@
+import numpy as np
+
+CHRONOLOGICAL = (("Trade Date", False), ("ID", False))
+
+
+# --- Equity Curve ---
+# Works on the filtered rows in trade-date order (journal order within a day).
+# The curve starts from the account balance recorded on the first of those
+# trades, or from 0 when the journal has no balances.
+def equity_curve(table, mask=None):
+    order = table.sorted_indices(mask, CHRONOLOGICAL)
+    pnl = table.columns["P&L"][order]
+    balances = table.columns["Account Balance"][order]
+    recorded = np.flatnonzero(balances)
+    start = float(balances[recorded[0]]) if len(recorded) else 0.0
+
+    equity = start + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate(([start], equity)))[1:]
+    drawdown = equity - peak
+    # Position of the peak each point is measured from (-1: the starting balance).
+    steps = np.arange(len(equity))
+    peak_at = np.maximum.accumulate(np.where(drawdown == 0, steps, -1)) if len(equity) else steps
+    duration = steps - peak_at
+
+    dates = table.columns["Trade Date"][order]
+    result = {
+        "order": order,
+        "dates": dates,
+        "equity": equity,
+        "peak": peak,
+        "drawdown": drawdown,
+        "start_balance": start,
+        "final_balance": float(equity[-1]) if len(equity) else start,
+        "max_drawdown": 0.0,
+        "max_drawdown_pct": 0.0,
+        "max_drawdown_trades": 0,
+        "max_drawdown_days": 0,
+    }
+    if not len(equity):
+        return result
+    worst = int(np.argmin(drawdown))
+    result["max_drawdown"] = float(-drawdown[worst])
+    if peak[worst] > 0:
+        result["max_drawdown_pct"] = float(-drawdown[worst] / peak[worst] * 100)
+    longest = int(np.argmax(duration))
+    result["max_drawdown_trades"] = int(duration[longest])
+    since = dates[peak_at[longest]] if peak_at[longest] >= 0 else dates[0]
+    if not np.isnat(since) and not np.isnat(dates[longest]):
+        result["max_drawdown_days"] = int((dates[longest] - since).astype(np.int64))
+    return result
+
+
+def drawdown_summary(curve):
+    return {key: curve[key] for key in (
+        "start_balance", "final_balance", "max_drawdown", "max_drawdown_pct",
+        "max_drawdown_trades", "max_drawdown_days",
+    )}
+
+
+# --- Downsampling ---
+def lttb(y, threshold):
+    # Largest-Triangle-Three-Buckets over x = 0..n-1: keeps the points that
+    # shape the curve (peaks, troughs) and returns their positions, so drawing
+    # costs O(threshold) whatever the trade count.
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Bucket means are computed up front from prefix sums.
+    sums = np.concatenate(([0.0], np.cumsum(y)))
+    starts, ends = edges[:-1], edges[1:]
+    mean_x = (starts + ends - 1) / 2.0
+    mean_y = (sums[ends] - sums[starts]) / (ends - starts)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0] = 0
+    picked[-1] = n - 1
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = starts[b], ends[b]
+        if b + 1 < len(mean_x):
+            next_x, next_y = mean_x[b + 1], mean_y[b + 1]
+        else:
+            next_x, next_y = n - 1, y[-1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - next_x) * (y[lo:hi] - y[a]) - (a - xs) * (next_y - y[a]))
+        a = picked[b + 1] = lo + int(np.argmax(area))
+    return picked
@@ -0,0 +1,62 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from equity import equity_curve, lttb
+import profiling
+
+PAD = 8
+EQUITY_COLOR = "#1f6fb2"
+PEAK_COLOR = "#9ab"
+DRAWDOWN_COLOR = "#e8b4b4"
+
+
+# --- Equity Curve Chart ---
+# The curve is computed once per filter change; resizing only re-downsamples
+# it to the new pixel width and redraws.
+class EquityChart(ttk.Frame):
+    def __init__(self, master, height=180):
+        super().__init__(master)
+        self.curve = None
+        self.summary = ttk.Label(self, text="", foreground="#444")
+        self.summary.pack(side=tk.TOP, fill=tk.X)
+        self.canvas = tk.Canvas(self, height=height, bg="white", highlightthickness=0)
+        self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda e: self.draw())
+
+    def update_curve(self, table, mask):
+        with profiling.span("stats.equity"):
+            self.curve = equity_curve(table, mask)
+        c = self.curve
+        self.summary.config(text=(
+            f"Start ${c['start_balance']:.2f}  End ${c['final_balance']:.2f}  "
+            f"Max drawdown ${c['max_drawdown']:.2f} ({c['max_drawdown_pct']:.1f}%)  "
+            f"Longest drawdown {c['max_drawdown_trades']} trades / {c['max_drawdown_days']} days"
+        ))
+        self.draw()
+
+    def draw(self):
+        self.canvas.delete("all")
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if self.curve is None or len(self.curve["equity"]) < 2 or width <= 2 * PAD:
+            return
+        equity = self.curve["equity"]
+        peak = self.curve["peak"]
+        keep = lttb(equity, width - 2 * PAD)
+        # The peak line only moves up, so it downsamples cleanly at the same positions.
+        low = min(float(equity.min()), self.curve["start_balance"])
+        high = max(float(peak.max()), self.curve["start_balance"])
+        span = (high - low) or 1.0
+        xs = PAD + keep * (width - 2 * PAD) / (len(equity) - 1)
+        to_y = lambda v: PAD + (high - v) * (height - 2 * PAD) / span
+
+        eq_y = to_y(equity[keep])
+        peak_y = to_y(peak[keep])
+        band = np.concatenate((np.column_stack((xs, peak_y)).ravel(), np.column_stack((xs[::-1], eq_y[::-1])).ravel()))
+        self.canvas.create_polygon(*band.tolist(), fill=DRAWDOWN_COLOR, outline="")
+        self.canvas.create_line(*np.column_stack((xs, peak_y)).ravel().tolist(), fill=PEAK_COLOR, dash=(2, 2))
+        self.canvas.create_line(*np.column_stack((xs, eq_y)).ravel().tolist(), fill=EQUITY_COLOR, width=2)
+        self.canvas.create_text(PAD, PAD, text=f"${high:,.0f}", anchor=tk.NW, fill="#666", font=("Arial", 8))
+        self.canvas.create_text(PAD, height - PAD, text=f"${low:,.0f}", anchor=tk.SW, fill="#666", font=("Arial", 8))
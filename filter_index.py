@@ -0,0 +1,124 @@
+import numpy as np
+
+from trade_table import CATEGORICAL_FIELDS, category_value
+
+ANY = "ANY"
+
+
+def bits_from_mask(mask):
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def mask_from_bits(bits, size):
+    nbytes = (size + 7) // 8
+    raw = np.frombuffer(bits.to_bytes(nbytes, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, count=size, bitorder="little").astype(bool)
+
+
+# --- Bitmap Index ---
+# One arbitrary-precision int per (field, value); bit i is set when the trade
+# at table position i has that value.
+class BitmapIndex:
+    def __init__(self, fields=CATEGORICAL_FIELDS):
+        self.fields = list(fields)
+        self.bitmaps = {field: {} for field in self.fields}
+        self.size = 0
+        self.all_bits = 0
+        self._row_values = [[] for _ in self.fields]
+
+    @classmethod
+    def from_table(cls, table):
+        index = cls(CATEGORICAL_FIELDS)
+        index.size = len(table)
+        index.all_bits = (1 << index.size) - 1
+        for field in index.fields:
+            codes = table.codes[field]
+            for code, value in enumerate(table.categories[field]):
+                bits = bits_from_mask(codes == code)
+                if bits:
+                    index.bitmaps[field][value] = bits
+        index._row_values = [
+            [table.categories[field][c] for c in table.codes[field].tolist()] for field in index.fields
+        ]
+        return index
+
+    def add(self, values):
+        pos = self.size
+        self.size += 1
+        self.all_bits |= 1 << pos
+        for k, field in enumerate(self.fields):
+            value = category_value(values.get(field))
+            bitmaps = self.bitmaps[field]
+            bitmaps[value] = bitmaps.get(value, 0) | (1 << pos)
+            self._row_values[k].append(value)
+        return pos
+
+    def extend(self, table, start):
+        # Index rows start.. of `table` in one pass per value instead of per row.
+        size = len(table)
+        for k, field in enumerate(self.fields):
+            codes = table.codes[field][start:]
+            bitmaps = self.bitmaps[field]
+            for code in np.unique(codes).tolist():
+                value = table.categories[field][code]
+                bitmaps[value] = bitmaps.get(value, 0) | (bits_from_mask(codes == code) << start)
+            self._row_values[k].extend(table.categories[field][c] for c in codes.tolist())
+        self.size = size
+        self.all_bits = (1 << size) - 1
+
+    def update(self, pos, values):
+        bit = 1 << pos
+        for k, field in enumerate(self.fields):
+            old = self._row_values[k][pos]
+            new = category_value(values.get(field))
+            if old == new:
+                continue
+            bitmaps = self.bitmaps[field]
+            remaining = bitmaps[old] & ~bit
+            if remaining:
+                bitmaps[old] = remaining
+            else:
+                del bitmaps[old]
+            bitmaps[new] = bitmaps.get(new, 0) | bit
+            self._row_values[k][pos] = new
+
+    def delete(self, pos):
+        # Every bitmap loses bit `pos` and shifts the bits above it down by one.
+        low = (1 << pos) - 1
+        for k, field in enumerate(self.fields):
+            self._row_values[k].pop(pos)
+            bitmaps = self.bitmaps[field]
+            for value, bits in list(bitmaps.items()):
+                bits = (bits & low) | ((bits >> (pos + 1)) << pos)
+                if bits:
+                    bitmaps[value] = bits
+                else:
+                    del bitmaps[value]
+        self.size -= 1
+        self.all_bits = (1 << self.size) - 1
+
+    def distinct(self, field):
+        return sorted(self.bitmaps[field])
+
+    # --- Queries ---
+    def select(self, filters, exclude=None):
+        bits = self.all_bits
+        for field, value in filters.items():
+            if field == exclude or field not in self.bitmaps or value == ANY:
+                continue
+            bits &= self.bitmaps[field].get(value, 0)
+            if not bits:
+                break
+        return bits
+
+    def count(self, filters):
+        return self.select(filters).bit_count()
+
+    def option_counts(self, field, filters, within=None):
+        base = self.select(filters, exclude=field)
+        if within is not None:
+            base &= within
+        return {value: (bits & base).bit_count() for value, bits in self.bitmaps[field].items()}
+
+    def to_mask(self, bits):
+        return mask_from_bits(bits, self.size)
@@ -0,0 +1,314 @@
+import argparse
+import csv
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import pytz
+
+from sqlite_store import open_journal_store, JOURNAL_DB_FILE
+from trade_metrics import to_float
+from constants import PIP_VALUE_XAUUSD, MARKET_SESSIONS_UTC
+
+TRADES_FILE = "trades_journal.json"
+CHUNK_BYTES = 256 * 1024
+BATCH_SIZE = 1000
+KEY_SIZE = 8
+BROKER_TIME_RE = re.compile(r"(\d{4})[.\-/](\d{1,2})[.\-/](\d{1,2})\s+(\d{1,2}):(\d{2})(?::(\d{2}))?$")
+ROW_RE = re.compile(r"<tr\b[^>]*>(.*?)</tr\s*>", re.I | re.S)
+CELL_RE = re.compile(r"<t[dh]\b([^>]*)>(.*?)</t[dh]\s*>", re.I | re.S)
+COLSPAN_RE = re.compile(r"colspan\s*=\s*[\"']?(\d+)", re.I)
+TAG_RE = re.compile(r"<[^>]+>")
+
+# Broker column headings (lower-cased) -> importer fields.
+# MT5 reports repeat "Time" and "Price" for open and close, in that order.
+HEADER_ALIASES = {
+    "ticket": ("ticket",), "position": ("ticket",), "order": ("ticket",),
+    "open time": ("open_time",), "time": ("open_time", "close_time"),
+    "type": ("type",),
+    "size": ("volume",), "volume": ("volume",), "lots": ("volume",),
+    "item": ("symbol",), "symbol": ("symbol",),
+    "open price": ("open_price",), "price": ("open_price", "close_price"),
+    "s/l": ("sl",), "s / l": ("sl",), "sl": ("sl",), "stop loss": ("sl",),
+    "t/p": ("tp",), "t / p": ("tp",), "tp": ("tp",), "take profit": ("tp",),
+    "close time": ("close_time",), "close price": ("close_price",),
+    "commission": ("commission",), "taxes": ("taxes",), "fee": ("taxes",),
+    "swap": ("swap",), "profit": ("profit",),
+}
+REQUIRED_FIELDS = frozenset(["ticket", "open_time", "type", "volume", "symbol", "open_price", "close_time", "close_price", "profit"])
+MIN_HEADER_MATCHES = 4
+DIRECTIONS = {"buy": "Buy", "sell": "Sell"}
+
+
+def session_for(utc_time):
+    for name, start, end in MARKET_SESSIONS_UTC:
+        if (start <= utc_time < end) if start < end else (utc_time >= start or utc_time < end):
+            return name
+    return ""
+
+
+def pip_size(symbol):
+    symbol = symbol.upper()
+    if symbol.startswith("XAU"):
+        return PIP_VALUE_XAUUSD
+    if "JPY" in symbol:
+        return 0.01
+    return 0.0001
+
+
+# --- Reading Broker Exports ---
+def header_map(cells):
+    # Column position per importer field, or None when the row is not a heading.
+    names = [cell.strip().lower() for cell in cells]
+    if sum(name in HEADER_ALIASES for name in names) < MIN_HEADER_MATCHES:
+        return None
+    fields = {}
+    for i, name in enumerate(names):
+        for field in HEADER_ALIASES.get(name, ()):
+            if field not in fields:
+                fields[field] = i
+                break
+    return fields if len(fields) >= MIN_HEADER_MATCHES else None
+
+
+def mapped_rows(rows):
+    # Rows under a heading that has every trade column; any other heading
+    # (MT5 orders/deals, MT4 working orders) switches mapping off until the next.
+    columns = None
+    for cells in rows:
+        fields = header_map(cells)
+        if fields is not None:
+            columns = fields if REQUIRED_FIELDS <= fields.keys() else None
+            continue
+        if columns is None or len(cells) <= max(columns.values()):
+            continue
+        yield {field: cells[i].strip() for field, i in columns.items()}
+
+
+def table_cells(row_html):
+    cells = []
+    for attrs, inner in CELL_RE.findall(row_html):
+        if "<" in inner or "&" in inner:
+            inner = html.unescape(TAG_RE.sub("", inner))
+        cells.append(" ".join(inner.split()))
+        # colspan cells are padded so positions line up with the heading row.
+        span = COLSPAN_RE.search(attrs)
+        cells.extend([""] * (int(span.group(1)) - 1 if span else 0))
+    return cells
+
+
+def _read_text(path):
+    # MT4/MT5 reports are often UTF-16; the BOM says so.
+    with open(path, "rb") as f:
+        head = f.read(4)
+    encoding = "utf-16" if head[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8-sig"
+    return open(path, "r", encoding=encoding, errors="replace", newline="")
+
+
+def html_rows(path):
+    # Statements are machine-written flat tables, so rows are cut out with a
+    # regex chunk by chunk; an unfinished row waits for the next chunk.
+    buffer = ""
+    with _read_text(path) as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            buffer += chunk
+            end = 0
+            for match in ROW_RE.finditer(buffer):
+                yield table_cells(match.group(1))
+                end = match.end()
+            buffer = buffer[end:]
+            if not chunk:
+                break
+
+
+def csv_rows(path):
+    with _read_text(path) as f:
+        sample = f.read(CHUNK_BYTES // 16)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def read_rows(path):
+    if os.path.splitext(path)[1].lower() in (".htm", ".html"):
+        return mapped_rows(html_rows(path))
+    return mapped_rows(csv_rows(path))
+
+
+# --- Mapping to Journal Trades ---
+def broker_number(value):
+    # Statements group thousands with spaces ("1 234.50").
+    return to_float((value or "").replace(" ", "").replace("\xa0", ""))
+
+
+def broker_time(value):
+    # "2024.01.05 10:31:22" (MT4/MT5), also with "-" or "/" and without seconds.
+    match = BROKER_TIME_RE.match(value.strip())
+    if match is None:
+        return None
+    try:
+        return datetime(*(int(part or 0) for part in match.groups()))
+    except ValueError:
+        return None
+
+
+def import_key(ticket, open_time, symbol):
+    raw = f"{ticket}|{open_time}|{symbol}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=KEY_SIZE).digest()
+
+
+def trade_from_row(row, timezone):
+    # None for anything that is not a closed buy/sell (balance, pending orders, open positions).
+    direction = DIRECTIONS.get(row.get("type", "").lower())
+    opened = broker_time(row.get("open_time", ""))
+    closed = broker_time(row.get("close_time", ""))
+    if direction is None or opened is None or closed is None or not row.get("ticket"):
+        return None
+    symbol = row["symbol"].upper()
+    pip = pip_size(symbol)
+    entry_price = broker_number(row["open_price"])
+    close_price = broker_number(row["close_price"])
+    sl_price = broker_number(row.get("sl"))
+    tp_price = broker_number(row.get("tp"))
+    lot_size = broker_number(row["volume"])
+    pnl = sum(broker_number(row.get(f)) for f in ("profit", "commission", "swap", "taxes"))
+    # In journal pips, so R:R (P&L over sl_pips * lot * USD_PER_PIP_PER_LOT) works as for hand-entered trades.
+    sl_pips = round(abs(entry_price - sl_price) / pip, 1) if sl_price else 0.0
+    tp_pips = round(abs(tp_price - entry_price) / pip, 1) if tp_price else 0.0
+    sl_to_be = bool(sl_price) and sl_pips < 1
+
+    if tp_price and abs(close_price - tp_price) <= pip:
+        outcome = "Take Profit Hit"
+    elif sl_price and abs(close_price - sl_price) <= pip:
+        outcome = "Break Even" if sl_to_be else "Stop Loss Hit"
+    elif round(pnl, 2) == 0:
+        outcome = "Break Even"
+    else:
+        outcome = "Manual Close"
+
+    utc_open = pytz.timezone(timezone).localize(opened).astimezone(pytz.utc)
+    open_time = opened.strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "symbol": symbol,
+        "timeframe": "",
+        "info": {
+            "symbol": symbol,
+            "timeframe": "",
+            "trade_type": direction,
+            "trade_date": opened.strftime("%Y-%m-%d"),
+            "trade_time": opened.strftime("%H:%M"),
+            "market_session": session_for(utc_open.time()),
+            "timezone": timezone,
+            "entry_price": entry_price,
+            "lot_size": lot_size,
+            "sl_pips": sl_pips,
+            "sl_price": sl_price or "",
+            "tp_pips": tp_pips,
+            "tp_price": tp_price or "",
+            "broker_ticket": row["ticket"],
+            "broker_open_time": open_time,
+        },
+        "tf_screenshots": {},
+        "review": {
+            "outcome": outcome,
+            "price": round(pnl, 2),
+            "notes": "",
+            "exit_time": closed.strftime("%Y-%m-%d %H:%M"),
+            "max_drawdown_pips": "",
+        },
+        "partial_closes": [],
+        "sl_to_be": sl_to_be,
+    }
+
+
+# --- Dedup Index ---
+# 8-byte hashes of (ticket, open time, symbol) for every imported trade in the
+# journal, so re-running an import (or importing overlapping exports) only
+# adds what is new.
+class ImportIndex:
+    def __init__(self, infos=()):
+        self.keys = set()
+        for info in infos:
+            ticket = info.get("broker_ticket")
+            if ticket:
+                self.keys.add(import_key(ticket, info.get("broker_open_time", ""), info.get("symbol", "")))
+
+    def claim(self, trade):
+        info = trade["info"]
+        key = import_key(info["broker_ticket"], info["broker_open_time"], info["symbol"])
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+
+def import_batches(path, journal, index, timezone="UTC", batch_size=BATCH_SIZE):
+    # Yields (new trade dicts, counts) after each batch is written, so callers
+    # can update their own copies and report progress between batches.
+    counts = {"rows": 0, "imported": 0, "duplicates": 0, "skipped": 0}
+    batch = []
+    for row in read_rows(path):
+        counts["rows"] += 1
+        trade = trade_from_row(row, timezone)
+        if trade is None:
+            counts["skipped"] += 1
+        elif not index.claim(trade):
+            counts["duplicates"] += 1
+        else:
+            batch.append(trade)
+            if len(batch) >= batch_size:
+                journal.add_many(batch)
+                counts["imported"] += len(batch)
+                yield batch, dict(counts)
+                batch = []
+    if batch:
+        journal.add_many(batch)
+        counts["imported"] += len(batch)
+    yield batch, dict(counts)
+
+
+def import_history(path, trades_file=TRADES_FILE, db_file=JOURNAL_DB_FILE, timezone="UTC", batch_size=BATCH_SIZE, progress=None):
+    journal = open_journal_store(trades_file, db_file)
+    trades = journal.load()
+    index = ImportIndex(t.get("info", {}) for t in trades)
+    # Attached, the batches only append to the log; folding them into the
+    # snapshot is left to the next save, as for trades entered by hand.
+    journal.attach(trades)
+    counts = {}
+    for batch, counts in import_batches(path, journal, index, timezone, batch_size):
+        trades.extend(batch)
+        if progress:
+            progress(counts["imported"], counts["rows"], "Importing")
+    return counts
+
+
+# --- Command Line ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m importer", description="Import MT4/MT5 account history into the journal.")
+    parser.add_argument("history", help="account history export (.htm/.html statement or .csv)")
+    parser.add_argument("--journal", default=TRADES_FILE, help=f"journal JSON file (default: {TRADES_FILE})")
+    parser.add_argument("--db", default=JOURNAL_DB_FILE, help=f"SQLite journal, used when it exists (default: {JOURNAL_DB_FILE})")
+    parser.add_argument("--timezone", default="UTC", choices=pytz.all_timezones, metavar="TZ",
+                        help="time zone of the broker's server times (default: UTC)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    counts = import_history(args.history, args.journal, args.db, args.timezone, args.batch_size)
+    json.dump(counts, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
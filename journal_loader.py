@@ -0,0 +1,79 @@
+import queue
+import threading
+
+POLL_MS = 50
+
+_in_flight = {}
+_lock = threading.Lock()
+
+
+# --- Background Journal Load ---
+# The load function runs on a worker thread and reports through a queue; the
+# queue is drained on the Tk thread with after(), so listeners may touch widgets.
+class BackgroundLoad:
+    def __init__(self, key, load_fn, master):
+        self.key = key
+        self.master = master
+        self.listeners = []
+        self.progress = (0, 0, "")
+        self.outcome = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(load_fn,), name=f"load-{key}", daemon=True)
+        self._thread.start()
+        self.master.after(POLL_MS, self._poll)
+
+    def _run(self, load_fn):
+        try:
+            result = load_fn(lambda done, total, stage="": self._queue.put(("progress", (done, total, stage))))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
+
+    def subscribe(self, on_done, on_progress=None, on_error=None):
+        if self.outcome is not None:
+            # Joined after the load finished: deliver the result straight away.
+            kind, payload = self.outcome
+            if kind == "done":
+                on_done(payload)
+            elif on_error:
+                on_error(payload)
+            return
+        self.listeners.append((on_done, on_progress, on_error))
+        if on_progress:
+            on_progress(*self.progress)
+
+    def _poll(self):
+        finished = None
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.progress = payload
+                for _, on_progress, _ in self.listeners:
+                    if on_progress:
+                        on_progress(*payload)
+            else:
+                finished = (kind, payload)
+        if finished is None:
+            self.master.after(POLL_MS, self._poll)
+            return
+        with _lock:
+            _in_flight.pop(self.key, None)
+        self.outcome = kind, payload = finished
+        for on_done, _, on_error in self.listeners:
+            if kind == "done":
+                on_done(payload)
+            elif on_error:
+                on_error(payload)
+
+
+def start_load(key, load_fn, master):
+    # A second request for the same key joins the load already running.
+    with _lock:
+        load = _in_flight.get(key)
+        if load is None:
+            load = _in_flight[key] = BackgroundLoad(key, load_fn, master)
+    return load
@@ -0,0 +1,206 @@
+import json
+import os
+
+TRADES_FILE = "trades_journal.json"
+LOG_SUFFIX = ".log"
+COMPACT_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+
+def _fsync_dir(path):
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def file_stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def apply_record(trades, record):
+    op = record["op"]
+    if op == "add":
+        trades.append(record["trade"])
+    elif op == "edit":
+        trades[record["index"]] = record["trade"]
+    elif op == "delete":
+        del trades[record["index"]]
+    else:
+        raise ValueError(f"Unknown journal log operation: {op!r}")
+
+
+# --- Append-only Journal Log ---
+# The snapshot keeps the existing {"trades": [...]} layout plus the sequence
+# number of the last log record folded into it, so a crash between writing a
+# new snapshot and truncating the log never replays a record twice.
+class JournalLog:
+    def __init__(self, snapshot_path=TRADES_FILE, log_path=None, compact_threshold=COMPACT_THRESHOLD_BYTES):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path or snapshot_path + LOG_SUFFIX
+        self.compact_threshold = compact_threshold
+        self.trades = []
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.attached = False
+        self.snapshot_stat = None
+        self.log_offset = 0
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.log_path)
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {"trades": [], "log_seq": 0}
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _read_log(self, after_seq):
+        records = []
+        good_offset = 0
+        if not os.path.exists(self.log_path):
+            return records, good_offset
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write from an interrupted append
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_offset += len(line)
+                if record["seq"] > after_seq:
+                    records.append(record)
+        return records, good_offset
+
+    def _replay(self, snapshot):
+        trades = snapshot.get("trades", [])
+        snapshot_seq = snapshot.get("log_seq", 0)
+        records, good_offset = self._read_log(snapshot_seq)
+        for record in records:
+            apply_record(trades, record)
+        seq = records[-1]["seq"] if records else snapshot_seq
+        return trades, snapshot_seq, seq, good_offset
+
+    def read_trades(self):
+        # Also remembers where the read ended, so read_new_records can pick up
+        # from there.
+        self.snapshot_stat = file_stat(self.snapshot_path)
+        trades, self.snapshot_seq, self.seq, self.log_offset = self._replay(self._read_snapshot())
+        return trades
+
+    def read_new_records(self):
+        # Log records appended (by another JournalLog) since the last read;
+        # None when the snapshot was rewritten or the log truncated, i.e.
+        # after a compaction, which only a full read can follow.
+        if file_stat(self.snapshot_path) != self.snapshot_stat:
+            return None
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if size < self.log_offset:
+            return None
+        records = []
+        if size == self.log_offset:
+            return records
+        with open(self.log_path, "rb") as f:
+            f.seek(self.log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.log_offset += len(line)
+                if record["seq"] > self.seq:
+                    records.append(record)
+                    self.seq = record["seq"]
+        return records
+
+    def load(self):
+        snapshot = self._read_snapshot()
+        trades, self.snapshot_seq, self.seq, good_offset = self._replay(snapshot)
+        if os.path.exists(self.snapshot_path) and "log_seq" not in snapshot:
+            # Journal written before the log existed: stamp it as snapshot 0.
+            write_json_atomic(self.snapshot_path, {"trades": trades, "log_seq": 0})
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > good_offset:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(good_offset)
+                os.fsync(f.fileno())
+        self.trades = trades
+        return trades
+
+    def attach(self, trades):
+        # Hand the in-memory copy over to the caller: `trades` (dicts or objects
+        # with to_dict) is kept in step with the log by the caller, and compaction
+        # only happens through maybe_compact once the two agree.
+        self.trades = trades
+        self.attached = True
+
+    def maybe_compact(self):
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) >= self.compact_threshold:
+            self.compact()
+
+    # --- Writes ---
+    def append(self, op, index=None, trade=None):
+        return self.append_many([(op, index, trade)])[0]
+
+    def append_many(self, ops):
+        # One write and one fsync for the whole batch; a torn tail is dropped on
+        # the next load, so an interrupted batch keeps its complete records.
+        records = []
+        lines = []
+        for op, index, trade in ops:
+            record = {"seq": self.seq + len(records) + 1, "op": op}
+            if index is not None:
+                record["index"] = index
+            if trade is not None:
+                record["trade"] = trade
+            records.append(record)
+            lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+        if not records:
+            return records
+        with open(self.log_path, "ab") as f:
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        self.seq = records[-1]["seq"]
+        if not self.attached:
+            for line in lines:
+                apply_record(self.trades, json.loads(line))
+            self.maybe_compact()
+        return records
+
+    def add(self, trade):
+        return self.append("add", trade=trade)
+
+    def add_many(self, trades):
+        return self.append_many([("add", None, trade) for trade in trades])
+
+    def edit(self, index, trade):
+        return self.append("edit", index=index, trade=trade)
+
+    def delete(self, index):
+        return self.append("delete", index=index)
+
+    def compact(self):
+        trades = [t if isinstance(t, dict) else t.to_dict() for t in self.trades]
+        write_json_atomic(self.snapshot_path, {"trades": trades, "log_seq": self.seq})
+        self.snapshot_seq = self.seq
+        with open(self.log_path, "wb") as f:
+            os.fsync(f.fileno())
@@ -0,0 +1,93 @@
+import difflib
+
+from journal_log import JournalLog
+from sqlite_store import SQLiteJournalStore, JOURNAL_DB_FILE
+from trade_store import trade_digest
+from text_index import journal_signature
+
+TRADES_FILE = "trades_journal.json"
+POLL_MS = 500
+
+
+def log_changes(records):
+    # Log records already are positional edits in the order they were made.
+    return [(r["op"], r.get("index"), r.get("trade")) for r in records]
+
+
+def digest_changes(old, trade_dicts):
+    # (kind, index, dict, digest) steps turning the trades behind the `old`
+    # digests into `trade_dicts`; adds carry no index as they always append.
+    # Journals only ever edit, delete or append, so runs of unchanged trades
+    # can only move towards the front: matches that would need an insert are
+    # dropped and their trades count as edited instead.
+    new = [trade_digest(d) for d in trade_dicts]
+    kept = []
+    shift = 0
+    for i, j, size in difflib.SequenceMatcher(None, old, new, autojunk=False).get_matching_blocks():
+        if size and i - j >= shift:
+            kept.append((i, j, size))
+            shift = i - j
+    gaps = []
+    end_i = end_j = 0
+    for i, j, size in kept:
+        gaps.append((end_i, i, end_j, j))
+        end_i, end_j = i + size, j + size
+    gaps.append((end_i, len(old), end_j, len(new)))
+
+    changes = []
+    # Back to front, so each step's old positions are still valid when it runs.
+    for i1, i2, j1, j2 in reversed(gaps):
+        shared = min(i2 - i1, j2 - j1)
+        for k in range(shared):
+            if old[i1 + k] != new[j1 + k]:
+                changes.append(("edit", i1 + k, trade_dicts[j1 + k], new[j1 + k]))
+        for i in range(i2 - 1, i1 + shared - 1, -1):
+            changes.append(("delete", i, None, None))
+    # Only the last gap can hold more new trades than old; they go on the end
+    # after the deletes above.
+    i1, i2, j1, j2 = gaps[-1]
+    return changes + [("add", None, trade_dicts[j], new[j]) for j in range(j1 + i2 - i1, j2)]
+
+
+# --- Journal Watcher ---
+# Polled from the Tk thread: has_changed() is a few os.stat calls against the
+# signature taken when the store was read. read_changes() (run off the Tk
+# thread) works out what changed, and apply() replays it through the store,
+# whose listeners update the table, index, cube, search index and views.
+class JournalWatcher:
+    def __init__(self, store, trades_file=TRADES_FILE, db_file=JOURNAL_DB_FILE):
+        self.store = store
+        self.trades_file = trades_file
+        self.db_file = db_file
+        self.signature = store.signature
+
+    def has_changed(self):
+        signature = journal_signature(self.trades_file, self.db_file)
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+    def read_changes(self):
+        # A list of (kind, index, journal dict, digest), or None when only a
+        # full reload can catch up (partitioned journals, no saved digests).
+        source = self.store.source
+        if isinstance(source, JournalLog):
+            records = source.read_new_records()
+            if records is not None:
+                return [(kind, idx, d, None) for kind, idx, d in log_changes(records)]
+            trade_dicts = source.read_trades()
+        elif isinstance(source, SQLiteJournalStore):
+            trade_dicts = source.stats_trades()
+        else:
+            return None
+        if self.store.digests is None:
+            return None
+        return digest_changes(self.store.digests, trade_dicts)
+
+    def apply(self, changes):
+        store = self.store
+        for kind, idx, trade_dict, digest in changes:
+            if kind == "add":
+                idx = len(store)
+            store.apply_change(kind, idx, trade_dict, digest)
@@ -0,0 +1,161 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import analytics
+from equity import CHRONOLOGICAL
+
+TRADES_FILE = "trades_journal.json"
+DEFAULT_BALANCE = 10000.0
+DEFAULT_PATHS = 10_000
+DEFAULT_RISK_PCT = 1.0
+RUIN_DRAWDOWN_PCT = 50.0
+CHUNK_PATHS = 1000
+PARALLEL_MIN_CELLS = 2_000_000  # paths x trades below this run in-process
+PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 40
+MODES = ("pnl", "rr")
+
+
+# --- Resampling ---
+def block_bootstrap(rng, n, paths, horizon, block=1):
+    # Positions into the n trades: random blocks of `block` consecutive trades
+    # (wrapping at the end) strung together; block=1 is the plain bootstrap.
+    blocks = -(-horizon // block)
+    starts = rng.integers(0, n, size=(paths, blocks, 1))
+    return ((starts + np.arange(block)) % n).reshape(paths, blocks * block)[:, :horizon]
+
+
+def equity_paths(samples, start_balance, mode="pnl", risk_pct=DEFAULT_RISK_PCT):
+    # pnl: resampled dollar P&L added to the balance. rr: resampled R multiples
+    # compounded at a fixed risk of risk_pct of the running balance.
+    if mode == "rr":
+        # A loss bigger than the balance ends the path at zero rather than flipping its sign.
+        return start_balance * np.cumprod(np.maximum(1.0 + samples * (risk_pct / 100.0), 0.0), axis=1)
+    return start_balance + np.cumsum(samples, axis=1)
+
+
+def simulate_chunk(values, paths, horizon, start_balance, mode, risk_pct, block, ruin_balance, seed):
+    rng = np.random.default_rng(seed)
+    samples = values[block_bootstrap(rng, len(values), paths, horizon, block)]
+    equity = equity_paths(samples, start_balance, mode, risk_pct)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), start_balance)
+    drawdown = peak - equity
+    worst = np.argmax(drawdown, axis=1)
+    rows = np.arange(paths)
+    worst_peak = peak[rows, worst]
+    return {
+        "final": equity[:, -1],
+        "max_drawdown": drawdown[rows, worst],
+        "max_drawdown_pct": np.divide(drawdown[rows, worst] * 100, worst_peak, out=np.zeros(paths), where=worst_peak > 0),
+        "ruined": (equity <= ruin_balance).any(axis=1),
+    }
+
+
+# --- Simulation ---
+def distribution(values):
+    return {
+        "mean": float(values.mean()),
+        **{f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+    }
+
+
+def simulate(values, start_balance=DEFAULT_BALANCE, paths=DEFAULT_PATHS, horizon=None, mode="pnl",
+             risk_pct=DEFAULT_RISK_PCT, block=1, ruin_pct=RUIN_DRAWDOWN_PCT, seed=None, workers=None, progress=None):
+    # `values` are the filtered trades' P&L (mode "pnl") or R:R (mode "rr") in
+    # trade order. Chunks draw from their own child seeds, so a seed gives the
+    # same result whether the chunks run here or across a process pool.
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        raise ValueError("No trades to resample.")
+    horizon = horizon or len(values)
+    block = max(1, min(block, len(values)))
+    ruin_balance = start_balance * (1 - ruin_pct / 100.0)
+    sizes = [min(CHUNK_PATHS, paths - start) for start in range(0, paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(values, size, horizon, start_balance, mode, risk_pct, block, ruin_balance, child)
+            for size, child in zip(sizes, seeds)]
+    results = [None] * len(jobs)
+    done = 0
+    if paths * horizon >= PARALLEL_MIN_CELLS and (workers or os.cpu_count() or 1) > 1 and len(jobs) > 1:
+        # Spawned, not forked: the stats page runs this on a loader thread.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(jobs)), mp_context=context) as pool:
+            futures = {pool.submit(simulate_chunk, *job): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                done += jobs[futures[future]][1]
+                if progress:
+                    progress(done, paths, "Simulating")
+    else:
+        for i, job in enumerate(jobs):
+            results[i] = simulate_chunk(*job)
+            done += job[1]
+            if progress:
+                progress(done, paths, "Simulating")
+
+    final = np.concatenate([r["final"] for r in results])
+    counts, edges = np.histogram(final, bins=HISTOGRAM_BINS)
+    return {
+        "paths": paths,
+        "trades_per_path": horizon,
+        "sampled_trades": len(values),
+        "mode": mode,
+        "block": block,
+        "seed": seed,
+        "start_balance": start_balance,
+        "ruin_balance": ruin_balance,
+        "final_balance": distribution(final),
+        "max_drawdown": distribution(np.concatenate([r["max_drawdown"] for r in results])),
+        "max_drawdown_pct": distribution(np.concatenate([r["max_drawdown_pct"] for r in results])),
+        "prob_profit": float((final > start_balance).mean() * 100),
+        "risk_of_ruin": float(np.concatenate([r["ruined"] for r in results]).mean() * 100),
+        "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+    }
+
+
+def sample_values(table, mask, mode="pnl"):
+    order = table.sorted_indices(mask, CHRONOLOGICAL)
+    return table.columns["P&L" if mode == "pnl" else "R:R"][order]
+
+
+# --- Command Line ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m monte_carlo", description="Bootstrap equity paths from journal trades.")
+    parser.add_argument("journal", nargs="?", default=TRADES_FILE, help=f"journal JSON file (default: {TRADES_FILE})")
+    parser.add_argument("--db", help="read from a SQLite journal instead of JSON")
+    analytics.add_filter_arguments(parser)
+    parser.add_argument("--balance", type=float, default=DEFAULT_BALANCE, help="starting balance")
+    parser.add_argument("--paths", type=int, default=DEFAULT_PATHS)
+    parser.add_argument("--trades", type=int, help="trades per path (default: the number of filtered trades)")
+    parser.add_argument("--mode", choices=MODES, default="pnl", help="resample dollar P&L or R multiples")
+    parser.add_argument("--risk", type=float, default=DEFAULT_RISK_PCT, help="risk per trade in %% of balance (rr mode)")
+    parser.add_argument("--block", type=int, default=1, help="block length for a block bootstrap")
+    parser.add_argument("--ruin", type=float, default=RUIN_DRAWDOWN_PCT, help="drawdown %% from the start that counts as ruin")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    filters = analytics.parsed_filters(args)
+    date_range = (filters["From Date"] or None, filters["To Date"] or None)
+    store = analytics.load_journal(args.journal, args.db, keep_trades=False, date_range=date_range,
+                                   search=bool(filters["Search"].strip()))
+    mask = analytics.filter_mask(store.table, store.index, filters, store.search)
+    report = simulate(
+        sample_values(store.table, mask, args.mode), args.balance, args.paths, args.trades, args.mode,
+        args.risk, args.block, args.ruin, args.seed, args.workers)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
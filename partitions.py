@@ -0,0 +1,395 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from journal_log import JournalLog, write_json_atomic
+from trade_table import TradeTable, parse_day, to_column, NUMERIC_FIELDS
+from stats_cube import StatsCube, summarize
+
+TRADES_FILE = "trades_journal.json"
+PARTITION_SUFFIX = ".parts"
+MANIFEST_FILE = "manifest.json"
+SUMMARY_SUFFIX = ".summary.json"
+UNDATED = "undated"
+GRANULARITIES = ("month", "quarter")
+PARALLEL_MIN_PARTITIONS = 3
+
+
+def partition_dir(trades_file=TRADES_FILE):
+    return os.path.splitext(trades_file)[0] + PARTITION_SUFFIX
+
+
+def partition_keys(trades, granularity="month"):
+    days = to_column([(t.get("info") or {}).get("trade_date") for t in trades], NUMERIC_FIELDS["Trade Date"])
+    months = days.astype("datetime64[M]")
+    keys = []
+    for day, month in zip(np.isnat(days).tolist(), months.astype(np.int64).tolist()):
+        if day:
+            keys.append(UNDATED)
+            continue
+        year, month = divmod(month, 12)
+        if granularity == "quarter":
+            keys.append(f"{1970 + year:04d}-Q{month // 3 + 1}")
+        else:
+            keys.append(f"{1970 + year:04d}-{month + 1:02d}")
+    return keys
+
+
+def key_range(key):
+    # First day and the day after the last day a partition can hold.
+    if key == UNDATED:
+        return None
+    year, part = key.split("-")
+    if part.startswith("Q"):
+        first = int(year) * 12 + (int(part[1:]) - 1) * 3
+        months = 3
+    else:
+        first = int(year) * 12 + int(part) - 1
+        months = 1
+    start = np.datetime64(f"{first // 12:04d}-{first % 12 + 1:02d}", "M")
+    return start.astype("datetime64[D]"), (start + months).astype("datetime64[D]")
+
+
+def keys_for_range(keys, start=None, end=None):
+    start = parse_day(start) if start else np.datetime64("NaT", "D")
+    end = parse_day(end) if end else np.datetime64("NaT", "D")
+    if np.isnat(start) and np.isnat(end):
+        return list(keys)
+    selected = []
+    for key in keys:
+        bounds = key_range(key)
+        if bounds is None:
+            continue
+        if (np.isnat(start) or bounds[1] > start) and (np.isnat(end) or bounds[0] <= end):
+            selected.append(key)
+    return selected
+
+
+def file_signature(path, with_hash=True):
+    st = os.stat(path)
+    signature = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if with_hash:
+        with open(path, "rb") as f:
+            signature["sha1"] = hashlib.sha1(f.read()).hexdigest()
+    return signature
+
+
+def read_partition_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    trades = data.get("trades", [])
+    return trades, data.get("positions") or list(range(len(trades)))
+
+
+def build_summary(key, table, signature):
+    cube = StatsCube.from_table(table)
+    dates = table.columns["Trade Date"][~np.isnat(table.columns["Trade Date"])]
+    totals = summarize(cube.totals({}))
+    return {
+        "partition": key,
+        "source": signature,
+        "count": totals["total_trades"],
+        "wins": totals["wins"],
+        "total_pnl": totals["total_pnl"],
+        "first_date": str(dates.min()) if len(dates) else None,
+        "last_date": str(dates.max()) if len(dates) else None,
+        "distinct": {d: sorted(cube.categories[d]) for d in cube.dimensions},
+        "cube": cube.to_dict(),
+    }
+
+
+def load_partition_table(key, path):
+    # Runs in a worker process: only the compact table and positions travel back.
+    trades, positions = read_partition_file(path)
+    return key, positions, TradeTable.from_journal(trades)
+
+
+# --- Partitioned Journal ---
+# One {"trades": [...], "positions": [...]} file per month (or quarter) of
+# info.trade_date, each with a sidecar summary holding its stats cube. Positions
+# keep the journal order across partitions, so indexes mean what they mean for
+# JournalLog; a write rewrites only the partitions it touches.
+class PartitionedJournal:
+    def __init__(self, directory, granularity="month"):
+        self.directory = directory
+        self.granularity = granularity
+        self.next_position = 0
+        self._order = []
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.granularity = manifest.get("granularity", granularity)
+            self.next_position = manifest.get("next_position", 0)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def partition_path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def summary_path(self, key):
+        return os.path.join(self.directory, key + SUMMARY_SUFFIX)
+
+    def keys(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[:-len(".json")] for name in os.listdir(self.directory)
+            if name.endswith(".json") and not name.endswith(SUMMARY_SUFFIX) and name != MANIFEST_FILE
+        )
+
+    def _write_manifest(self):
+        write_json_atomic(self.manifest_path, {"granularity": self.granularity, "next_position": self.next_position})
+
+    def _write_partition(self, key, trades, positions):
+        path = self.partition_path(key)
+        if not trades:
+            for stale in (path, self.summary_path(key)):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            return
+        write_json_atomic(path, {"trades": trades, "positions": positions})
+        write_json_atomic(self.summary_path(key), build_summary(key, TradeTable.from_journal(trades), file_signature(path)))
+
+    # --- Reads ---
+    def read_trades(self):
+        located = []
+        for key in self.keys():
+            trades, positions = read_partition_file(self.partition_path(key))
+            located.extend(zip(positions, [key] * len(trades), trades))
+        located.sort(key=lambda item: item[0])
+        return located
+
+    def load(self):
+        located = self.read_trades()
+        self._order = [(position, key) for position, key, _ in located]
+        if located:
+            self.next_position = max(self.next_position, located[-1][0] + 1)
+        return [trade for _, _, trade in located]
+
+    def get_trade(self, index):
+        position, key = self._order[index]
+        trades, positions = read_partition_file(self.partition_path(key))
+        return trades[positions.index(position)]
+
+    # --- Writes ---
+    def _read_or_empty(self, key):
+        path = self.partition_path(key)
+        return read_partition_file(path) if os.path.exists(path) else ([], [])
+
+    def _insert(self, key, position, trade):
+        trades, positions = self._read_or_empty(key)
+        at = bisect_left(positions, position)
+        trades.insert(at, trade)
+        positions.insert(at, position)
+        self._write_partition(key, trades, positions)
+
+    def _remove(self, key, position):
+        trades, positions = self._read_or_empty(key)
+        at = positions.index(position)
+        del trades[at]
+        del positions[at]
+        self._write_partition(key, trades, positions)
+
+    def add(self, trade):
+        key = partition_keys([trade], self.granularity)[0]
+        position = self.next_position
+        self.next_position += 1
+        self._write_manifest()
+        self._insert(key, position, trade)
+        self._order.append((position, key))
+
+    def add_many(self, trades):
+        # One rewrite per touched partition rather than per trade.
+        grouped = {}
+        for key, trade in zip(partition_keys(trades, self.granularity), trades):
+            bucket = grouped.setdefault(key, ([], []))
+            bucket[0].append(trade)
+            bucket[1].append(self.next_position)
+            self._order.append((self.next_position, key))
+            self.next_position += 1
+        self._write_manifest()
+        for key, (new_trades, new_positions) in grouped.items():
+            trades_in, positions = self._read_or_empty(key)
+            self._write_partition(key, trades_in + new_trades, positions + new_positions)
+
+    def edit(self, index, trade):
+        position, old_key = self._order[index]
+        key = partition_keys([trade], self.granularity)[0]
+        if key == old_key:
+            trades, positions = self._read_or_empty(key)
+            trades[positions.index(position)] = trade
+            self._write_partition(key, trades, positions)
+        else:
+            self._insert(key, position, trade)
+            self._remove(old_key, position)
+        self._order[index] = (position, key)
+
+    def delete(self, index):
+        position, key = self._order.pop(index)
+        self._remove(key, position)
+
+    def attach(self, trades):
+        pass  # every write goes straight to its partition file
+
+    def maybe_compact(self):
+        pass
+
+    def compact(self):
+        pass
+
+    # --- Sidecar Summaries ---
+    def summary(self, key):
+        # Trusts the sidecar while the partition's mtime/size match; after that
+        # the content hash decides, and only a real change re-parses the file.
+        path = self.partition_path(key)
+        summary = None
+        if os.path.exists(self.summary_path(key)):
+            with open(self.summary_path(key), "r", encoding="utf-8") as f:
+                summary = json.load(f)
+            current = file_signature(path, with_hash=False)
+            source = summary.get("source", {})
+            if (source.get("mtime_ns"), source.get("size")) == (current["mtime_ns"], current["size"]):
+                return summary
+            current = file_signature(path)
+            if source.get("sha1") == current["sha1"]:
+                summary["source"] = current
+                write_json_atomic(self.summary_path(key), summary)
+                return summary
+        trades, _ = read_partition_file(path)
+        summary = build_summary(key, TradeTable.from_journal(trades), file_signature(path))
+        write_json_atomic(self.summary_path(key), summary)
+        return summary
+
+    def summary_cube(self, keys):
+        cube = StatsCube()
+        for key in keys:
+            cube.merge(StatsCube.from_dict(self.summary(key)["cube"]))
+        return cube
+
+    # --- Stats Loading ---
+    def load_tables(self, keys, workers=None, progress=None):
+        jobs = [(key, self.partition_path(key)) for key in keys]
+        results = []
+        if len(jobs) >= PARALLEL_MIN_PARTITIONS and (workers or os.cpu_count() or 1) > 1:
+            # Spawned, not forked: this runs on a loader thread of the Tk app, and a
+            # forked child would inherit Tk and the other threads' held locks.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(jobs)), mp_context=context) as pool:
+                futures = [pool.submit(load_partition_table, key, path) for key, path in jobs]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results.append(future.result())
+                    if progress:
+                        progress(done, len(jobs), "Loading partitions")
+        else:
+            for done, (key, path) in enumerate(jobs, start=1):
+                results.append(load_partition_table(key, path))
+                if progress:
+                    progress(done, len(jobs), "Loading partitions")
+        return results
+
+    def load_range(self, start=None, end=None, workers=None, progress=None):
+        keys = self.keys()
+        selected = keys_for_range(keys, start, end)
+        results = self.load_tables(selected, workers, progress)
+        table = TradeTable.concat([table for _, _, table in results])
+        located = [(position, key) for key, positions, _ in results for position in positions]
+        order = np.argsort(np.array([position for position, _ in located], dtype=np.int64), kind="stable")
+        table.take(order)
+        view = PartitionView(self, [located[i] for i in order.tolist()], selected)
+        unloaded = self.summary_cube([key for key in keys if key not in selected])
+        return table, view, unloaded
+
+
+class PartitionView:
+    # The slice of a partitioned journal one stats load covers, in journal order.
+    def __init__(self, journal, order, keys):
+        self.journal = journal
+        self.order = order
+        self.keys = set(keys)
+
+    def get_trade(self, index):
+        position, key = self.order[index]
+        trades, positions = read_partition_file(self.journal.partition_path(key))
+        return trades[positions.index(position)]
+
+    def read_trades(self):
+        by_position = {}
+        for key in self.keys:
+            trades, positions = read_partition_file(self.journal.partition_path(key))
+            by_position.update(zip(positions, trades))
+        return [by_position[position] for position, _ in self.order]
+
+    def covers(self, start=None, end=None):
+        return set(keys_for_range(self.journal.keys(), start, end)) <= self.keys
+
+
+# --- Splitting and Joining ---
+def split_journal(trades_file=TRADES_FILE, directory=None, granularity="month"):
+    directory = directory or partition_dir(trades_file)
+    trades = JournalLog(trades_file).read_trades()
+    os.makedirs(directory, exist_ok=True)
+    journal = PartitionedJournal(directory, granularity)
+    journal.granularity = granularity
+    grouped = {}
+    for position, (key, trade) in enumerate(zip(partition_keys(trades, granularity), trades)):
+        bucket = grouped.setdefault(key, ([], []))
+        bucket[0].append(trade)
+        bucket[1].append(position)
+    for key, (bucket_trades, positions) in grouped.items():
+        journal._write_partition(key, bucket_trades, positions)
+    journal.next_position = len(trades)
+    journal._write_manifest()
+    return journal
+
+
+def join_journal(trades_file=TRADES_FILE, directory=None):
+    journal = PartitionedJournal(directory or partition_dir(trades_file))
+    write_json_atomic(trades_file, {"trades": journal.load(), "log_seq": 0})
+    log_path = trades_file + ".log"
+    if os.path.exists(log_path):
+        os.remove(log_path)  # the snapshot above supersedes anything in the old log
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m partitions", description="Date-partitioned trading journal.")
+    parser.add_argument("--journal", default=TRADES_FILE, help=f"journal JSON file (default: {TRADES_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split = commands.add_parser("split", help="Shard the journal into date partitions.")
+    split.add_argument("--by", choices=GRANULARITIES, default="month")
+    commands.add_parser("join", help="Write the partitions back into one journal file.")
+    commands.add_parser("summary", help="Per-partition counts and P&L from the sidecar summaries.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    directory = partition_dir(args.journal)
+    if args.command == "split":
+        journal = split_journal(args.journal, directory, args.by)
+        print(f"Wrote {len(journal.keys())} partitions to {directory}; {args.journal} is left in place as a backup.")
+    elif args.command == "join":
+        join_journal(args.journal, directory)
+        print(f"Wrote {args.journal}; remove {directory} to switch back to the single-file journal.")
+    else:
+        journal = PartitionedJournal(directory)
+        summaries = [journal.summary(key) for key in journal.keys()]
+        json.dump([{k: s[k] for k in ("partition", "count", "wins", "total_pnl", "first_date", "last_date")} for s in summaries],
+                  sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import cProfile
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+# Timing spans and counters for the hot paths. Everything is a no-op until
+# enable() is called (or JOURNAL_PROFILE=1 is set), so call sites stay in place.
+
+ROLLING_WINDOW = 200
+PROFILE_DIR = "profiles"
+
+ENABLED = os.environ.get("JOURNAL_PROFILE", "") not in ("", "0")
+_lock = threading.Lock()
+_samples = {}
+_last = {}
+_calls = Counter()
+_counters = Counter()
+_armed = {}
+_dumps = deque(maxlen=20)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "profiler", "dump_path")
+
+    def __init__(self, name):
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        with _lock:
+            self.dump_path = _armed.pop(self.name, None)
+        if self.dump_path is not None:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:  # another profiler is already running on this thread
+                self.profiler = None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            try:
+                os.makedirs(os.path.dirname(self.dump_path) or ".", exist_ok=True)
+                self.profiler.dump_stats(self.dump_path)
+                _dumps.append(self.dump_path)
+            except OSError:
+                pass  # a failed dump must not break the operation being profiled
+        record(self.name, elapsed)
+        return False
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def span(name):
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def record(name, seconds):
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=ROLLING_WINDOW)
+        samples.append(seconds)
+        _last[name] = seconds
+        _calls[name] += 1
+
+
+def count(name, n=1):
+    if ENABLED:
+        with _lock:
+            _counters[name] += n
+
+
+# --- cProfile Dumps ---
+def profile_next(name, profile_dir=PROFILE_DIR):
+    # The next run of span `name` is profiled and dumped as a .prof file.
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(profile_dir, f"{name.replace('/', '_')}-{stamp}.prof")
+    with _lock:
+        _armed[name] = path
+    return path
+
+
+def armed():
+    with _lock:
+        return dict(_armed)
+
+
+def dumps():
+    return list(_dumps)
+
+
+# --- Reporting ---
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def snapshot():
+    with _lock:
+        samples = {name: sorted(values) for name, values in _samples.items()}
+        last = dict(_last)
+        calls = dict(_calls)
+        counters = dict(_counters)
+    spans = [
+        {
+            "name": name,
+            "calls": calls[name],
+            "last": last[name],
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "max": ordered[-1],
+        }
+        for name, ordered in sorted(samples.items())
+    ]
+    return {"spans": spans, "counters": counters}
+
+
+def span_names():
+    with _lock:
+        return sorted(_samples)
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _last.clear()
+        _calls.clear()
+        _counters.clear()
@@ -0,0 +1,384 @@
+import json
+import os
+import sqlite3
+
+from journal_log import JournalLog, write_json_atomic
+from partitions import PartitionedJournal, partition_dir
+from trade_table import TradeTable, parse_day
+from stats_cube import summarize
+from trade_model import INFO_COLUMNS, REVIEW_COLUMNS, PARTIAL_CLOSE_COLUMNS, TIMEFRAMES, MOMENTS, migrate_partial_closes
+
+JOURNAL_DB_FILE = "trades_journal.db"
+PLAYBOOK_FILES = {
+    "setups": "setups.json",
+    "entries": "entries.json",
+    "sl_reasons": "sl_reasons.json",
+    "tp_reasons": "tp_reasons.json",
+    "close_reasons": "close_reasons.json",
+}
+# Stats the trade table derives in Python (R:R and hold time need the time zone
+# code), stored per trade when it is written so filters and aggregates can run in SQL.
+DERIVED_COLUMNS = {"pnl": "REAL", "rr": "REAL", "hold_time": "REAL", "win": "INTEGER", "trade_day": "TEXT"}
+DERIVED_VERSION = 2  # PRAGMA user_version; bump when their math changes so migrate() refills them
+FILTER_COLUMNS = {
+    "Setup": "i.setup",
+    "Entry Type": "i.entry",
+    "Market Session": "i.market_session",
+    "Stop Loss Reason": "i.sl_reason",
+    "Reason for Close": "r.outcome",
+    "Take Profit Reason": "i.tp_reason",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    symbol TEXT,
+    timeframe TEXT,
+    sl_to_be INTEGER NOT NULL DEFAULT 0,
+    {derived_columns}
+);
+CREATE TABLE IF NOT EXISTS trade_info (
+    trade_id INTEGER PRIMARY KEY REFERENCES trades(id) ON DELETE CASCADE,
+    {info_columns},
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS trade_review (
+    trade_id INTEGER PRIMARY KEY REFERENCES trades(id) ON DELETE CASCADE,
+    {review_columns},
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS partial_closes (
+    trade_id INTEGER NOT NULL REFERENCES trades(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    pips, pnl, reason_for_close,
+    extra TEXT,
+    PRIMARY KEY (trade_id, seq)
+);
+CREATE TABLE IF NOT EXISTS screenshots (
+    trade_id INTEGER NOT NULL REFERENCES trades(id) ON DELETE CASCADE,
+    timeframe TEXT NOT NULL,
+    moment TEXT NOT NULL,
+    path TEXT,
+    PRIMARY KEY (trade_id, timeframe, moment)
+);
+CREATE TABLE IF NOT EXISTS playbook_options (
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, position)
+);
+CREATE INDEX IF NOT EXISTS idx_trades_position ON trades(position);
+CREATE INDEX IF NOT EXISTS idx_info_setup ON trade_info(setup);
+CREATE INDEX IF NOT EXISTS idx_info_entry ON trade_info(entry);
+CREATE INDEX IF NOT EXISTS idx_info_market_session ON trade_info(market_session);
+CREATE INDEX IF NOT EXISTS idx_info_trade_date ON trade_info(trade_date);
+CREATE INDEX IF NOT EXISTS idx_review_outcome ON trade_review(outcome);
+""".format(
+    info_columns=",\n    ".join(INFO_COLUMNS),
+    review_columns=",\n    ".join(REVIEW_COLUMNS),
+    derived_columns=",\n    ".join(f"{column} {kind}" for column, kind in DERIVED_COLUMNS.items()),
+)
+# Created after migrate(), since older databases gain these columns there.
+DERIVED_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_trades_trade_day ON trades(trade_day);
+"""
+
+
+def open_journal_store(trades_file, db_file=JOURNAL_DB_FILE):
+    if os.path.exists(db_file):
+        return SQLiteJournalStore(db_file)
+    partitioned = PartitionedJournal(partition_dir(trades_file))
+    if partitioned.exists():
+        return partitioned
+    return JournalLog(trades_file)
+
+
+def _split(d, columns):
+    known = [d.get(c) for c in columns]
+    extra = {k: v for k, v in d.items() if k not in columns}
+    return known, json.dumps(extra) if extra else None
+
+
+def _join(columns, values, extra):
+    d = {c: v for c, v in zip(columns, values) if v is not None}
+    if extra:
+        d.update(json.loads(extra))
+    return d
+
+
+def derived_values(trades):
+    # One batch through the same code the stats table uses, so SQL totals match it.
+    table = TradeTable.from_journal(trades)
+    columns = table.columns
+    days = columns["Trade Date"].astype(str)
+    return [
+        (float(pnl), float(rr), float(hold), int(win), None if day == "NaT" else day)
+        for pnl, rr, hold, win, day in zip(columns["P&L"], columns["R:R"], columns["Hold Time"], columns["Win"], days)
+    ]
+
+
+def filter_clause(filters):
+    clauses, params = [], []
+    for field, value in filters.items():
+        if field == "Stop Loss Size":
+            try:
+                min_sl_size = float(value)
+            except (TypeError, ValueError):
+                continue
+            clauses.append("CAST(i.sl_pips AS REAL) >= ?")
+            params.append(min_sl_size)
+        elif field in ("From Date", "To Date"):
+            day = parse_day(value) if value else None
+            if day is None or str(day) == "NaT":
+                continue
+            clauses.append("t.trade_day >= ?" if field == "From Date" else "t.trade_day <= ?")
+            params.append(str(day))
+        elif field in FILTER_COLUMNS and value != "ANY":
+            column = FILTER_COLUMNS[field]
+            if value == "":
+                clauses.append(f"({column} = '' OR {column} IS NULL)")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+# --- SQLite Journal Store ---
+# Same add/edit/delete/load surface as JournalLog, indexed by journal position.
+class SQLiteJournalStore:
+    def __init__(self, db_path=JOURNAL_DB_FILE):
+        self.db_path = db_path
+        # Opened by the background loader and then used from the Tk thread.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+        self.conn.executescript(DERIVED_SCHEMA)
+
+    def migrate(self):
+        # Databases from before the derived columns (or their current math) get
+        # them filled in; positions are renumbered to 0..n-1 so a journal index
+        # is an indexed lookup.
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(trades)")}
+        missing = [column for column in DERIVED_COLUMNS if column not in columns]
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        with self.conn:
+            for column in missing:
+                self.conn.execute(f"ALTER TABLE trades ADD COLUMN {column} {DERIVED_COLUMNS[column]}")
+            count, low, high = self.conn.execute("SELECT COUNT(*), MIN(position), MAX(position) FROM trades").fetchone()
+            if count and (low != 0 or high != count - 1):
+                self.conn.execute(
+                    "WITH numbered AS (SELECT id, ROW_NUMBER() OVER (ORDER BY position, id) - 1 AS rn FROM trades) "
+                    "UPDATE trades SET position = (SELECT rn FROM numbered WHERE numbered.id = trades.id)")
+            if (missing or version < DERIVED_VERSION) and count:
+                ids, trades = self._stats_rows()
+                self.conn.executemany(
+                    f"UPDATE trades SET {', '.join(f'{c} = ?' for c in DERIVED_COLUMNS)} WHERE id = ?",
+                    [(*values, trade_id) for trade_id, values in zip(ids, derived_values(trades))])
+            if version != DERIVED_VERSION:
+                self.conn.execute(f"PRAGMA user_version = {DERIVED_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    # --- Trades ---
+    def _trade_id_at(self, index):
+        row = self.conn.execute("SELECT id FROM trades WHERE position = ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError(f"No trade at journal position {index}")
+        return row[0]
+
+    def _insert(self, trade, position, derived, trade_id=None):
+        cur = self.conn.execute(
+            f"INSERT INTO trades (id, position, symbol, timeframe, sl_to_be, {', '.join(DERIVED_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (len(DERIVED_COLUMNS) + 5))})",
+            (trade_id, position, trade.get("symbol", ""), trade.get("timeframe", ""), int(bool(trade.get("sl_to_be", False))),
+             *derived))
+        trade_id = cur.lastrowid
+        info, info_extra = _split(trade.get("info", {}), INFO_COLUMNS)
+        self.conn.execute(
+            f"INSERT INTO trade_info (trade_id, {', '.join(INFO_COLUMNS)}, extra) "
+            f"VALUES ({', '.join('?' * (len(INFO_COLUMNS) + 2))})",
+            (trade_id, *info, info_extra))
+        review, review_extra = _split(trade.get("review", {}), REVIEW_COLUMNS)
+        self.conn.execute(
+            f"INSERT INTO trade_review (trade_id, {', '.join(REVIEW_COLUMNS)}, extra) "
+            f"VALUES ({', '.join('?' * (len(REVIEW_COLUMNS) + 2))})",
+            (trade_id, *review, review_extra))
+        for seq, pc in enumerate(migrate_partial_closes(trade.get("partial_closes", []))):
+            values, extra = _split(pc, PARTIAL_CLOSE_COLUMNS)
+            self.conn.execute(
+                "INSERT INTO partial_closes (trade_id, seq, pips, pnl, reason_for_close, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                (trade_id, seq, *values, extra))
+        for tf, shots in (trade.get("tf_screenshots") or {}).items():
+            for moment, path in (shots or {}).items():
+                if path:
+                    self.conn.execute(
+                        "INSERT INTO screenshots (trade_id, timeframe, moment, path) VALUES (?, ?, ?, ?)",
+                        (trade_id, tf, moment, path))
+        return trade_id
+
+    def _fetch(self, where="", params=()):
+        trades = {}
+        order = []
+        for trade_id, symbol, timeframe, sl_to_be in self.conn.execute(
+                f"SELECT id, symbol, timeframe, sl_to_be FROM trades t {where} ORDER BY position", params):
+            trades[trade_id] = {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "info": {},
+                "tf_screenshots": {tf: {m: None for m in MOMENTS} for tf in TIMEFRAMES},
+                "review": {},
+                "partial_closes": [],
+                "sl_to_be": bool(sl_to_be),
+            }
+            order.append(trade_id)
+        if not trades:
+            return []
+        scope = f"WHERE trade_id IN (SELECT id FROM trades t {where})"
+        for trade_id, *values, extra in self.conn.execute(
+                f"SELECT trade_id, {', '.join(INFO_COLUMNS)}, extra FROM trade_info {scope}", params):
+            trades[trade_id]["info"] = _join(INFO_COLUMNS, values, extra)
+        for trade_id, *values, extra in self.conn.execute(
+                f"SELECT trade_id, {', '.join(REVIEW_COLUMNS)}, extra FROM trade_review {scope}", params):
+            trades[trade_id]["review"] = _join(REVIEW_COLUMNS, values, extra)
+        for trade_id, *values, extra in self.conn.execute(
+                f"SELECT trade_id, pips, pnl, reason_for_close, extra FROM partial_closes {scope} ORDER BY trade_id, seq",
+                params):
+            trades[trade_id]["partial_closes"].append(_join(PARTIAL_CLOSE_COLUMNS, values, extra))
+        for trade_id, tf, moment, path in self.conn.execute(
+                f"SELECT trade_id, timeframe, moment, path FROM screenshots {scope}", params):
+            trades[trade_id]["tf_screenshots"].setdefault(tf, {})[moment] = path
+        return [trades[trade_id] for trade_id in order]
+
+    def read_trades(self):
+        return self._fetch()
+
+    def load(self):
+        return self.read_trades()
+
+    def attach(self, trades):
+        pass  # nothing is kept in memory
+
+    def maybe_compact(self):
+        pass
+
+    def get_trade(self, index):
+        trade_id = self._trade_id_at(index)
+        return self._fetch("WHERE t.id = ?", (trade_id,))[0]
+
+    def add(self, trade):
+        self.add_many([trade])
+
+    def add_many(self, trades):
+        derived = derived_values(trades)
+        with self.conn:
+            start = self.conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+            for position, (trade, values) in enumerate(zip(trades, derived), start=start):
+                self._insert(trade, position, values)
+
+    def edit(self, index, trade):
+        derived = derived_values([trade])[0]
+        with self.conn:
+            trade_id = self._trade_id_at(index)
+            self.conn.execute("DELETE FROM trades WHERE id = ?", (trade_id,))
+            self._insert(trade, index, derived, trade_id)
+
+    def delete(self, index):
+        with self.conn:
+            self.conn.execute("DELETE FROM trades WHERE id = ?", (self._trade_id_at(index),))
+            self.conn.execute("UPDATE trades SET position = position - 1 WHERE position > ?", (index,))
+
+    def replace_all(self, trades):
+        derived = derived_values(trades)
+        with self.conn:
+            self.conn.execute("DELETE FROM trades")
+            for position, (trade, values) in enumerate(zip(trades, derived)):
+                self._insert(trade, position, values)
+
+    def compact(self):
+        self.conn.execute("VACUUM")
+
+    # --- Playbook Options ---
+    def load_playbook_options(self, kind):
+        return [value for (value,) in self.conn.execute(
+            "SELECT value FROM playbook_options WHERE kind = ? ORDER BY position", (kind,))]
+
+    def save_playbook_options(self, kind, values):
+        with self.conn:
+            self.conn.execute("DELETE FROM playbook_options WHERE kind = ?", (kind,))
+            self.conn.executemany(
+                "INSERT INTO playbook_options (kind, position, value) VALUES (?, ?, ?)",
+                [(kind, pos, value) for pos, value in enumerate(values)])
+
+    # --- JSON Import/Export ---
+    def import_json(self, trades_file, playbook_dir=None):
+        self.replace_all(JournalLog(trades_file).read_trades())
+        if playbook_dir:
+            for kind, filename in PLAYBOOK_FILES.items():
+                path = os.path.join(playbook_dir, filename)
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        self.save_playbook_options(kind, json.load(f))
+
+    def export_json(self, trades_file, playbook_dir=None):
+        write_json_atomic(trades_file, {"trades": self.read_trades()})
+        if playbook_dir:
+            os.makedirs(playbook_dir, exist_ok=True)
+            for kind, filename in PLAYBOOK_FILES.items():
+                write_json_atomic(os.path.join(playbook_dir, filename), self.load_playbook_options(kind))
+
+    # --- Stats Push-down ---
+    def stats_trades(self):
+        return self._stats_rows()[1]
+
+    def _stats_rows(self):
+        # The fields the stats table and the text index read, without screenshots
+        # or extras. Change detection digests these rows, so anything a listener
+        # shows (notes and reasons included) has to be in them.
+        rows = self.conn.execute(
+            "SELECT t.id, i.setup, i.entry, i.market_session, i.sl_reason, i.tp_reason, i.sl_pips, "
+            "i.lot_size, i.trade_date, i.trade_time, i.timezone, i.account_balance, r.outcome, r.price, r.exit_time, "
+            "r.notes FROM trades t JOIN trade_info i ON i.trade_id = t.id JOIN trade_review r ON r.trade_id = t.id "
+            "ORDER BY t.position")
+        ids = []
+        trades = []
+        by_id = {}
+        for (trade_id, setup, entry, session, sl_reason, tp_reason, sl_pips, lot_size, trade_date, trade_time,
+             timezone, account_balance, outcome, price, exit_time, notes) in rows:
+            ids.append(trade_id)
+            trade = by_id[trade_id] = {
+                "info": {"setup": setup, "entry": entry, "market_session": session,
+                         "sl_reason": sl_reason, "tp_reason": tp_reason, "sl_pips": sl_pips,
+                         "lot_size": lot_size, "trade_date": trade_date, "trade_time": trade_time,
+                         "timezone": timezone, "account_balance": account_balance},
+                "review": {"outcome": outcome, "price": price, "exit_time": exit_time, "notes": notes},
+                "partial_closes": [],
+            }
+            trades.append(trade)
+        for trade_id, *values, extra in self.conn.execute(
+                "SELECT trade_id, pips, pnl, reason_for_close, extra FROM partial_closes ORDER BY trade_id, seq"):
+            by_id[trade_id]["partial_closes"].append(_join(PARTIAL_CLOSE_COLUMNS, values, extra))
+        return ids, trades
+
+    def distinct(self, field):
+        column = FILTER_COLUMNS[field]
+        return [value for (value,) in self.conn.execute(
+            f"SELECT DISTINCT COALESCE({column}, '') FROM trades t "
+            "JOIN trade_info i ON i.trade_id = t.id JOIN trade_review r ON r.trade_id = t.id ORDER BY 1")]
+
+    def aggregates(self, filters):
+        # Same measures as a StatsCube cell, so the result has the same keys
+        # (and math) as cube.query / TradeTable.aggregates.
+        where, params = filter_clause(filters)
+        totals = self.conn.execute(
+            "SELECT COUNT(*), SUM(t.win), SUM(t.pnl), SUM(t.pnl * t.pnl), SUM(t.rr), SUM(t.rr * t.rr), "
+            "SUM(t.hold_time), SUM(t.hold_time * t.hold_time) "
+            "FROM trades t JOIN trade_info i ON i.trade_id = t.id JOIN trade_review r ON r.trade_id = t.id"
+            f"{where}", params).fetchone()
+        return summarize([value or 0 for value in totals])
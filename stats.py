@@ -1,45 +1,53 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import os
 import subprocess
 import sys
-from PIL import Image, ImageTk
+import numpy as np
+from datetime import date, timedelta
+
+import analytics
+import monte_carlo
+from trade_table import TradeTable, CATEGORICAL_FIELDS, TABLE_COLUMNS, DATE_FILTERS
+from trade_model import Trade
+from trade_store import TradeStore
+from journal_log import JournalLog
+from virtual_table import VirtualTreeview
+from equity_chart import EquityChart
+from sqlite_store import JOURNAL_DB_FILE
+from partitions import PartitionedJournal, partition_dir
+from journal_loader import start_load
+from journal_watch import JournalWatcher, POLL_MS
+import profiling
+import diagnostics
 
 TRADES_FILE = "trades_journal.json"
+PREFETCH_NEIGHBOURS = 2
+DEFAULT_RANGE_DAYS = 365  # a standalone page over a partitioned journal opens on the last year
 
 def load_journal_data():
-    if not os.path.exists(TRADES_FILE):
+    journal = JournalLog(TRADES_FILE)
+    if not journal.exists():
         messagebox.showerror("Error", f"{TRADES_FILE} not found.")
         return []
-    with open(TRADES_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("trades", [])
+    return journal.read_trades()
 
 def parse_trades_for_stats(journal_trades):
-    stats_trades = []
-    for idx, t in enumerate(journal_trades):
-        info = t.get("info", {})
-        review = t.get("review", {})
-        try:
-            pnl = float(review.get("price", 0.0)) if review.get("price") else 0.0
-        except Exception:
-            pnl = 0.0
-        stats_trades.append({
-            "ID": idx + 1,
-            "Setup": info.get("setup", ""),
-            "Entry Type": info.get("entry", ""),
-            "Market Session": info.get("market_session", ""),
-            "Stop Loss Reason": info.get("sl_reason", ""),
-            "Reason for Close": review.get("outcome", ""),
-            "Take Profit Reason": info.get("tp_reason", ""),
-            "Stop Loss Size": info.get("sl_pips", 0.0),
-            "P&L": pnl,
-            "R:R": 0.0,
-            "Win": review.get("outcome", "").lower() == "take profit hit",
-            "Hold Time": 0
-        })
-    return stats_trades
+    table = TradeTable.from_journal(journal_trades)
+    return [table.row(i) for i in range(len(table))]
+
+def screenshot_paths(trade):
+    tf_screenshots = trade.get("tf_screenshots") or {}
+    return [shots.get(when) for shots in tf_screenshots.values() if shots for when in ("before", "after")]
+
+def set_label_image(label, photo):
+    if not label.winfo_exists():
+        return
+    if photo is None:
+        label.config(text="(image error)")
+    else:
+        label.config(image=photo, text="")
+        label.image = photo
 
 def open_image_in_default_app(img_path):
     try:
@@ -54,41 +62,189 @@ def open_image_in_default_app(img_path):
     except Exception as e:
         messagebox.showerror("Error", f"Could not open image:\n{e}")
 
-class StatsPage(tk.Tk):
-    def __init__(self):
-        super().__init__()
+class StatsPage(tk.Toplevel):
+    def __init__(self, master=None):
+        try:
+            import thumbnails  # Pillow is only needed once a stats window opens
+        except ImportError:
+            messagebox.showerror("Missing Dependency", "Pillow (PIL) is required for image thumbnails.\nInstall it with:\n\npip install pillow", parent=master)
+            raise
+        standalone = master is None
+        if standalone:
+            master = tk.Tk()
+            master.withdraw()
+        super().__init__(master)
         self.title("Playbook Stats Page")
         self.geometry("1200x800")
-        self.protocol("WM_DELETE_WINDOW", self.quit)
+        self.protocol("WM_DELETE_WINDOW", master.destroy if standalone else self.destroy)
 
-        journal_trades = load_journal_data()
-        self.journal_trades = journal_trades
-        self.data = parse_trades_for_stats(journal_trades)
-        self.filtered_data = self.data[:]
+        self.trade_store = None
+        self.use_store(TradeStore([]))
+        self._refresh_pending = False
+        self.watcher = None
+        self._syncing = False
+        self.active_filters = {}
+        self.filtered_mask = None
+        self.filtered_idx = self.table.indices()
+        self.sort_keys = []
+        self.thumbnails = thumbnails.ThumbnailCache(self)
         self.create_widgets()
+        diagnostics.bind_shortcut(self)
+        self.refresh_filter_options()
+        self.apply_filters()
+
+        self.bind("<Destroy>", self.on_destroy)
+        # Opened from the journal window: share its trades instead of loading a copy.
+        load = getattr(master, "trades_load", None)
+        if load is None:
+            if os.path.exists(JOURNAL_DB_FILE):
+                self.preview_database()
+            elif PartitionedJournal(partition_dir(TRADES_FILE)).exists():
+                self.filter_vars["From Date"].insert(0, (date.today() - timedelta(days=DEFAULT_RANGE_DAYS)).isoformat())
+            self.load_range(self.current_date_range())
+        else:
+            load.subscribe(self.on_data_loaded, self.on_load_progress, self.on_load_error)
+
+    def current_date_range(self):
+        return tuple(self.filter_vars[field].get().strip() or None for field in DATE_FILTERS)
+
+    def load_range(self, date_range):
+        source = JOURNAL_DB_FILE if os.path.exists(JOURNAL_DB_FILE) else TRADES_FILE
+        load = start_load(
+            ("stats", os.path.abspath(source), date_range),
+            lambda progress: analytics.load_journal(TRADES_FILE, JOURNAL_DB_FILE, progress, date_range=date_range, search=True, digests=True),
+            self.master,
+        )
+        self.load_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 0), before=self.filter_frame)
+        load.subscribe(self.on_data_loaded, self.on_load_progress, self.on_load_error)
+
+    def preview_database(self):
+        load = start_load(
+            ("stats_preview", os.path.abspath(JOURNAL_DB_FILE)),
+            lambda progress: analytics.database_preview(JOURNAL_DB_FILE),
+            self.master,
+        )
+        load.subscribe(self.on_preview_loaded)
+
+    def on_preview_loaded(self, preview):
+        # Only until the rows arrive; after that the in-memory table is current.
+        if not self.winfo_exists() or self.trade_store.source is not None:
+            return
+        agg, options = preview
+        self.show_aggregates(agg)
+        for field, values in options.items():
+            labels = {"ANY": "ANY"}
+            labels.update((value or "(blank)", value) for value in values)
+            self.option_values[field] = labels
+            self.filter_vars[field]["values"] = list(labels)
+
+    def use_store(self, store):
+        if self.trade_store is not None:
+            self.trade_store.unsubscribe(self.on_store_changed)
+        self.trade_store = store
+        self.table = store.table
+        self.index = store.index
+        self.cube = store.cube
+        store.subscribe(self.on_store_changed)
+
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.trade_store.unsubscribe(self.on_store_changed)
+            self.thumbnails.shutdown()
+
+    def on_store_changed(self, kind, idx, trade_dict):
+        # A save can touch many trades; redraw once after the batch.
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh_from_store)
+
+    def refresh_from_store(self):
+        self._refresh_pending = False
+        self.refresh_filter_options()
+        self.apply_filters()
+        self.table_view.refresh()
+
+    def on_load_progress(self, done, total, stage):
+        if not self.winfo_exists():
+            return
+        if total:
+            self.load_progress.stop()
+            self.load_progress.config(mode="determinate", maximum=total, value=done)
+        else:
+            self.load_progress.config(mode="indeterminate")
+            self.load_progress.start(20)
+        self.load_status.config(text=f"{stage}... {done}/{total}" if total else f"{stage}...")
+
+    def on_load_error(self, error):
+        if not self.winfo_exists():
+            return
+        self.load_frame.pack_forget()
+        messagebox.showerror("Error", str(error), parent=self)
+
+    def on_data_loaded(self, store):
+        if not self.winfo_exists():
+            return
+        self.use_store(store)
+        self.load_progress.stop()
+        self.load_frame.pack_forget()
+        self.refresh_filter_options()
         self.apply_filters()
+        if store.source is not None:
+            # Our own copy of the journal (not the journal window's store, which
+            # its saves already keep current): follow changes saved elsewhere.
+            start_watch = self.watcher is None
+            self.watcher = JournalWatcher(store, TRADES_FILE, JOURNAL_DB_FILE)
+            if start_watch:
+                self.after(POLL_MS, self.poll_journal)
+
+    # --- Live Reload ---
+    def poll_journal(self):
+        if not self.winfo_exists():
+            return
+        watcher = self.watcher
+        if not self._syncing and watcher.store is self.trade_store and watcher.has_changed():
+            self._syncing = True
+            load = start_load(("journal_changes", id(watcher)), lambda progress: watcher.read_changes(), self.master)
+            load.subscribe(lambda changes: self.on_journal_changes(watcher, changes), on_error=self.on_journal_changes_error)
+        self.after(POLL_MS, self.poll_journal)
+
+    def on_journal_changes(self, watcher, changes):
+        self._syncing = False
+        if not self.winfo_exists() or watcher is not self.watcher:
+            return
+        if changes is None:
+            self.load_range(self.current_date_range())
+            return
+        with profiling.span("stats.sync"):
+            watcher.apply(changes)
+
+    def on_journal_changes_error(self, error):
+        # Usually a read racing a write: forget the signature so the next poll retries.
+        self._syncing = False
+        self.watcher.signature = None
 
     def create_widgets(self):
-        filter_frame = ttk.LabelFrame(self, text="Smart Filter Panel", padding="10")
-        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        self.load_frame = ttk.Frame(self)
+        self.load_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 0))
+        self.load_status = ttk.Label(self.load_frame, text="Loading journal...")
+        self.load_status.pack(side=tk.LEFT, padx=5)
+        self.load_progress = ttk.Progressbar(self.load_frame, length=300, mode="indeterminate")
+        self.load_progress.pack(side=tk.LEFT, padx=5)
 
-        filter_options = {
-            "Setup": sorted(list(set(d["Setup"] for d in self.data))),
-            "Entry Type": sorted(list(set(d["Entry Type"] for d in self.data))),
-            "Market Session": sorted(list(set(d["Market Session"] for d in self.data))),
-            "Stop Loss Reason": sorted(list(set(d["Stop Loss Reason"] for d in self.data))),
-            "Reason for Close": sorted(list(set(d["Reason for Close"] for d in self.data))),
-            "Take Profit Reason": sorted(list(set(d["Take Profit Reason"] for d in self.data))),
-        }
+        filter_frame = self.filter_frame = ttk.LabelFrame(self, text="Smart Filter Panel", padding="10")
+        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
 
         self.filter_vars = {}
+        self.option_values = {}
         row = col = 0
-        for label_text, options in filter_options.items():
+        for label_text in CATEGORICAL_FIELDS:
             ttk.Label(filter_frame, text=f"{label_text}:").grid(row=row, column=col, sticky=tk.W, padx=5, pady=2)
-            var = ttk.Combobox(filter_frame, values=["ANY"] + options, state="readonly")
+            var = ttk.Combobox(filter_frame, values=["ANY"], state="readonly")
             var.set("ANY")
             var.grid(row=row, column=col+1, sticky=tk.EW, padx=5, pady=2)
+            var.bind("<<ComboboxSelected>>", lambda e: self.refresh_filter_options())
             self.filter_vars[label_text] = var
+            self.option_values[label_text] = {"ANY": "ANY"}
             col += 2
             if col >= 6:
                 row += 1
@@ -97,7 +253,18 @@ class StatsPage(tk.Tk):
         ttk.Label(filter_frame, text="Min SL Size (%):").grid(row=row, column=col, sticky=tk.W, padx=5, pady=2)
         self.filter_vars["Stop Loss Size"] = ttk.Entry(filter_frame, width=10)
         self.filter_vars["Stop Loss Size"].grid(row=row, column=col+1, sticky=tk.EW, padx=5, pady=2)
+        for i, field in enumerate(DATE_FILTERS):
+            ttk.Label(filter_frame, text=f"{field} (YYYY-MM-DD):").grid(row=row + 1, column=i * 2, sticky=tk.W, padx=5, pady=2)
+            self.filter_vars[field] = ttk.Entry(filter_frame, width=12)
+            self.filter_vars[field].grid(row=row + 1, column=i * 2 + 1, sticky=tk.EW, padx=5, pady=2)
+        ttk.Label(filter_frame, text="Search Notes:").grid(row=row + 2, column=0, sticky=tk.W, padx=5, pady=2)
+        self.filter_vars["Search"] = ttk.Entry(filter_frame)
+        self.filter_vars["Search"].grid(row=row + 2, column=1, columnspan=3, sticky=tk.EW, padx=5, pady=2)
+        self.filter_vars["Search"].bind("<Return>", lambda e: self.apply_filters())
+        ttk.Label(filter_frame, text='words, "a phrase", prefix*, OR', foreground="#666").grid(row=row + 2, column=4, columnspan=2, sticky=tk.W, padx=5, pady=2)
         ttk.Button(filter_frame, text="Apply Filters", command=self.apply_filters).grid(row=row, column=col+2, padx=10, pady=5)
+        ttk.Button(filter_frame, text="Breakdown", command=self.show_breakdown_popup).grid(row=row, column=col+3, padx=10, pady=5)
+        ttk.Button(filter_frame, text="Monte Carlo", command=self.show_monte_carlo_popup).grid(row=row, column=col+4, padx=10, pady=5)
 
         stats_frame = ttk.LabelFrame(self, text="Stats Overview (After Filtering)", padding="10")
         stats_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
@@ -118,11 +285,20 @@ class StatsPage(tk.Tk):
         self.win_rate_canvas.grid(row=2, column=1, columnspan=5, sticky=tk.W, padx=5, pady=5)
         self.win_rate_bar = self.win_rate_canvas.create_rectangle(0, 0, 0, 20, fill="red", outline="")
         self.win_rate_text = self.win_rate_canvas.create_text(100, 10, text="", fill="black", font=('Arial', 9, 'bold'))
+        self.all_time_label = ttk.Label(stats_frame, text="", foreground="#444")
+        self.all_time_label.grid(row=3, column=0, columnspan=6, sticky=tk.W, padx=5, pady=2)
+
+        equity_frame = ttk.LabelFrame(self, text="Equity Curve (After Filtering)", padding="10")
+        equity_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(0, 10))
+        self.equity_chart = EquityChart(equity_frame)
+        self.equity_chart.pack(fill=tk.X)
 
         table_frame = ttk.LabelFrame(self, text="Trades Table", padding="10")
         table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
-        columns = ("ID", "Setup", "Entry Type", "P&L", "R:R", "Win", "Hold Time")
-        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", selectmode="browse")
+        columns = TABLE_COLUMNS
+        self.table_view = VirtualTreeview(table_frame, columns, lambda i: self.table.table_values(i), show="headings", selectmode="browse")
+        self.table_view.pack(fill=tk.BOTH, expand=True)
+        self.tree = self.table_view.tree
         for col in columns:
             self.tree.heading(col, text=col, command=lambda c=col: self.sort_column(c))
             self.tree.column(col, width=100, anchor=tk.CENTER)
@@ -133,43 +309,65 @@ class StatsPage(tk.Tk):
         self.tree.column("R:R", width=60)
         self.tree.column("Win", width=50)
         self.tree.column("Hold Time", width=80)
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill="y")
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.bind("<Shift-Button-1>", self.on_heading_shift_click)
+        self.tree.bind("<<TreeviewSelect>>", self.on_row_selected)
         self.tree.bind("<Double-1>", self.on_trade_select)
         self.tree.bind("<Return>", self.on_trade_select)
 
+    def current_filters(self):
+        filters = {}
+        for key, var in self.filter_vars.items():
+            if key in self.option_values:
+                filters[key] = self.option_values[key].get(var.get(), "ANY")
+            else:
+                filters[key] = var.get()
+        return filters
+
+    def refresh_filter_options(self):
+        current_filters = self.current_filters()
+        for field in CATEGORICAL_FIELDS:
+            counts = self.index.option_counts(field, current_filters)
+            labels = {"ANY": "ANY"}
+            for value in sorted(counts):
+                labels[f"{value or '(blank)'} ({counts[value]})"] = value
+            self.option_values[field] = labels
+            var = self.filter_vars[field]
+            var["values"] = list(labels)
+            selected = current_filters[field]
+            var.set(next(label for label, value in labels.items() if value == selected) if selected in counts else "ANY")
+
     def apply_filters(self):
-        current_filters = {key: var.get() for key, var in self.filter_vars.items()}
-        self.filtered_data = []
-        for trade in self.data:
-            match = True
-            for filter_name, filter_value in current_filters.items():
-                if filter_name == "Stop Loss Size":
-                    try:
-                        min_sl_size = float(filter_value)
-                        if trade["Stop Loss Size"] < min_sl_size:
-                            match = False
-                            break
-                    except ValueError:
-                        pass
-                else:
-                    if filter_value != "ANY" and trade[filter_name] != filter_value:
-                        match = False
-                        break
-            if match:
-                self.filtered_data.append(trade)
+        # Partitions outside the loaded range are only summarized; widening the
+        # range loads them.
+        covers = getattr(self.trade_store.backend, "covers", None)
+        if covers is not None and not covers(*self.current_date_range()):
+            self.load_range(self.current_date_range())
+            return
+        current_filters = self.current_filters()
+        self.active_filters = current_filters
+        with profiling.span("stats.filter"):
+            self.filtered_mask = analytics.filter_mask(self.table, self.index, current_filters, self.trade_store.search)
+            self.filtered_idx = self.table.sorted_indices(self.filtered_mask, self.sort_keys)
         self.update_stats_and_table()
 
     def update_stats_and_table(self):
-        total_trades = len(self.filtered_data)
-        wins = sum(1 for trade in self.filtered_data if trade["Win"])
-        losses = total_trades - wins
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
-        total_pnl = sum(trade["P&L"] for trade in self.filtered_data)
-        avg_rr = sum(trade["R:R"] for trade in self.filtered_data) / total_trades if total_trades > 0 else 0.0
-        avg_hold_time = sum(trade["Hold Time"] for trade in self.filtered_data) / total_trades if total_trades > 0 else 0.0
+        with profiling.span("stats.aggregate"):
+            agg = analytics.aggregate(self.table, self.cube, self.active_filters, self.filtered_mask)
+        self.show_aggregates(agg)
+        all_time = self.trade_store.all_time_cube().query({})
+        self.all_time_label.config(text=f"All time: {all_time['total_trades']} trades, {all_time['win_rate']:.1f}% win rate, ${all_time['total_pnl']:.2f}")
+        self.equity_chart.update_curve(self.table, self.filtered_mask)
+
+        self.table_view.set_rows(self.filtered_idx)
+
+    def show_aggregates(self, agg):
+        total_trades = agg["total_trades"]
+        wins = agg["wins"]
+        losses = agg["losses"]
+        win_rate = agg["win_rate"]
+        total_pnl = agg["total_pnl"]
+        avg_rr = agg["avg_rr"]
+        avg_hold_time = agg["avg_hold_time"]
 
         self.stats_labels["Total Trades"].config(text=str(total_trades))
         self.stats_labels["Win Rate %"].config(text=f"{win_rate:.1f}%")
@@ -189,14 +387,163 @@ class StatsPage(tk.Tk):
         self.win_rate_canvas.itemconfig(self.win_rate_text, text=f"{win_rate:.1f}%")
         self.win_rate_canvas.coords(self.win_rate_text, bar_width / 2, 10)
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for trade in self.filtered_data:
-            self.tree.insert("", "end", values=(
-                trade["ID"], trade["Setup"], trade["Entry Type"],
-                f"${trade['P&L']:.2f}", f"{trade['R:R']:.2f}",
-                "\u2705" if trade["Win"] else "\u274c", f"{trade['Hold Time']} min"
-            ))
+    def get_journal_trade(self, idx):
+        return self.trade_store.trade_dict(idx)
+
+    def add_trade(self, journal_trade):
+        self.trade_store.add(Trade.from_dict(journal_trade))
+
+    def update_trade(self, trade_id, journal_trade):
+        self.trade_store.replace(int(trade_id) - 1, Trade.from_dict(journal_trade))
+
+    def show_breakdown_popup(self):
+        popup = tk.Toplevel(self)
+        popup.title("Playbook Breakdown")
+        popup.geometry("900x500")
+        controls = ttk.Frame(popup)
+        controls.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        ttk.Label(controls, text="Rows:").pack(side=tk.LEFT, padx=5)
+        row_dim = ttk.Combobox(controls, values=CATEGORICAL_FIELDS, state="readonly")
+        row_dim.set("Setup")
+        row_dim.pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="Columns:").pack(side=tk.LEFT, padx=5)
+        col_dim = ttk.Combobox(controls, values=CATEGORICAL_FIELDS, state="readonly")
+        col_dim.set("Market Session")
+        col_dim.pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="(win rate / P&L / trades, using the Smart Filter Panel)").pack(side=tk.LEFT, padx=5)
+        matrix_frame = ttk.Frame(popup)
+        matrix_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def render(event=None):
+            for child in matrix_frame.winfo_children():
+                child.destroy()
+            if row_dim.get() == col_dim.get():
+                ttk.Label(matrix_frame, text="Pick two different fields.").pack()
+                return
+            row_values, col_values, cells = self.cube.breakdown(row_dim.get(), col_dim.get(), self.active_filters)
+            columns = ["_row"] + [str(j) for j in range(len(col_values))]
+            tree = ttk.Treeview(matrix_frame, columns=columns, show="headings")
+            tree.heading("_row", text=f"{row_dim.get()} \\ {col_dim.get()}")
+            tree.column("_row", width=160, anchor=tk.W)
+            for j, value in enumerate(col_values):
+                tree.heading(str(j), text=value or "(blank)")
+                tree.column(str(j), width=150, anchor=tk.CENTER)
+            for value, row_cells in zip(row_values, cells):
+                tree.insert("", "end", values=[value or "(blank)"] + [
+                    f"{c['win_rate']:.0f}% / ${c['total_pnl']:.0f} / {c['total_trades']}" if c["total_trades"] else "-"
+                    for c in row_cells
+                ])
+            tree.pack(fill=tk.BOTH, expand=True)
+
+        row_dim.bind("<<ComboboxSelected>>", render)
+        col_dim.bind("<<ComboboxSelected>>", render)
+        render()
+
+    def starting_balance(self):
+        # The journal window's balance when opened from it, else where the equity curve ends.
+        balance_var = getattr(self.master, "account_balance_var", None)
+        if balance_var is not None:
+            return float(balance_var.get())
+        curve = self.equity_chart.curve
+        return curve["final_balance"] if curve and curve["final_balance"] > 0 else monte_carlo.DEFAULT_BALANCE
+
+    def show_monte_carlo_popup(self):
+        popup = tk.Toplevel(self)
+        popup.title("Monte Carlo Simulation")
+        popup.geometry("760x560")
+        controls = ttk.Frame(popup)
+        controls.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        fields = {}
+        for i, (label, default) in enumerate([
+            ("Start Balance", f"{self.starting_balance():.2f}"), ("Paths", str(monte_carlo.DEFAULT_PATHS)),
+            ("Trades per Path", str(int(np.count_nonzero(self.filtered_mask)))), ("Block Size", "1"),
+            ("Risk % (R:R mode)", str(monte_carlo.DEFAULT_RISK_PCT)), ("Ruin Drawdown %", str(monte_carlo.RUIN_DRAWDOWN_PCT)),
+            ("Seed", "1"),
+        ]):
+            ttk.Label(controls, text=f"{label}:").grid(row=i // 4, column=i % 4 * 2, sticky=tk.W, padx=5, pady=2)
+            fields[label] = ttk.Entry(controls, width=12)
+            fields[label].insert(0, default)
+            fields[label].grid(row=i // 4, column=i % 4 * 2 + 1, sticky=tk.W, padx=5, pady=2)
+        mode = ttk.Combobox(controls, values=["P&L", "R:R"], state="readonly", width=8)
+        mode.set("P&L")
+        ttk.Label(controls, text="Resample:").grid(row=1, column=6, sticky=tk.W, padx=5, pady=2)
+        mode.grid(row=1, column=7, sticky=tk.W, padx=5, pady=2)
+        run_button = ttk.Button(controls, text="Run")
+        run_button.grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+        progress = ttk.Progressbar(controls, length=300, mode="determinate")
+        progress.grid(row=2, column=1, columnspan=4, sticky=tk.W, padx=5)
+        ttk.Label(popup, text="(resamples the trades selected in the Smart Filter Panel)").pack(side=tk.TOP, anchor=tk.W, padx=15)
+
+        results = ttk.Treeview(popup, columns=("Measure", "Mean", *(f"p{p}" for p in monte_carlo.PERCENTILES)), show="headings", height=3)
+        for col in results["columns"]:
+            results.heading(col, text=col)
+            results.column(col, width=95, anchor=tk.E)
+        results.column("Measure", width=140, anchor=tk.W)
+        results.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+        summary = ttk.Label(popup, text="", font=('Arial', 10, 'bold'))
+        summary.pack(side=tk.TOP, anchor=tk.W, padx=15)
+        histogram = tk.Canvas(popup, height=200, bg="white", highlightthickness=0)
+        histogram.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def on_progress(done, total, stage):
+            if popup.winfo_exists() and total:
+                progress.config(maximum=total, value=done)
+
+        def on_error(error):
+            if popup.winfo_exists():
+                run_button.config(state=tk.NORMAL)
+                messagebox.showerror("Monte Carlo", str(error), parent=popup)
+
+        def on_done(report):
+            if not popup.winfo_exists():
+                return
+            run_button.config(state=tk.NORMAL)
+            results.delete(*results.get_children())
+            for label, key, fmt in (("Final Balance", "final_balance", "${:,.0f}"), ("Max Drawdown", "max_drawdown", "${:,.0f}"),
+                                    ("Max Drawdown %", "max_drawdown_pct", "{:.1f}%")):
+                dist = report[key]
+                results.insert("", "end", values=[label, fmt.format(dist["mean"]), *(fmt.format(dist[f"p{p}"]) for p in monte_carlo.PERCENTILES)])
+            summary.config(text=(
+                f"{report['paths']} paths x {report['trades_per_path']} trades  |  Profitable: {report['prob_profit']:.1f}%  |  "
+                f"Risk of ruin (below ${report['ruin_balance']:,.0f}): {report['risk_of_ruin']:.1f}%"))
+            draw_histogram(report)
+
+        def draw_histogram(report):
+            histogram.delete("all")
+            counts = report["histogram"]["counts"]
+            edges = report["histogram"]["edges"]
+            width, height = histogram.winfo_width(), histogram.winfo_height()
+            bar = (width - 20) / len(counts)
+            tallest = max(counts) or 1
+            for i, count in enumerate(counts):
+                color = "#e8b4b4" if edges[i + 1] <= report["start_balance"] else "#9cc5a1"
+                histogram.create_rectangle(10 + i * bar, height - 20 - count / tallest * (height - 40),
+                                           10 + (i + 1) * bar - 1, height - 20, fill=color, outline="")
+            histogram.create_text(10, height - 5, text=f"${edges[0]:,.0f}", anchor=tk.SW, fill="#666", font=("Arial", 8))
+            histogram.create_text(width - 10, height - 5, text=f"${edges[-1]:,.0f}", anchor=tk.SE, fill="#666", font=("Arial", 8))
+
+        def run():
+            try:
+                params = {
+                    "start_balance": float(fields["Start Balance"].get()),
+                    "paths": int(fields["Paths"].get()),
+                    "horizon": int(fields["Trades per Path"].get()),
+                    "block": int(fields["Block Size"].get()),
+                    "risk_pct": float(fields["Risk % (R:R mode)"].get()),
+                    "ruin_pct": float(fields["Ruin Drawdown %"].get()),
+                    "seed": int(fields["Seed"].get()) if fields["Seed"].get().strip() else None,
+                    "mode": "rr" if mode.get() == "R:R" else "pnl",
+                }
+            except ValueError:
+                messagebox.showerror("Monte Carlo", "Enter numbers in every field (Seed may be blank).", parent=popup)
+                return
+            values = monte_carlo.sample_values(self.table, self.filtered_mask, params["mode"])
+            run_button.config(state=tk.DISABLED)
+            progress.config(value=0)
+            load = start_load(("monte_carlo", id(popup)), lambda report_progress: monte_carlo.simulate(values, progress=report_progress, **params), self)
+            load.subscribe(on_done, on_progress, on_error)
+
+        run_button.config(command=run)
 
     def on_trade_select(self, event):
         selected_item = self.tree.focus()
@@ -204,17 +551,67 @@ class StatsPage(tk.Tk):
             trade_id = self.tree.item(selected_item, "values")[0]
             self.show_trade_details_popup(trade_id)
 
-    def sort_column(self, col):
-        messagebox.showinfo("Sorting", f"Sorting by column: {col}\n\n(Implement actual sorting logic here)")
+    def sort_column(self, col, secondary=False):
+        keys = dict(self.sort_keys)
+        if secondary and self.sort_keys:
+            if col in keys:
+                self.sort_keys = [(c, not d if c == col else d) for c, d in self.sort_keys]
+            else:
+                self.sort_keys.append((col, False))
+        elif list(keys) == [col]:
+            self.sort_keys = [(col, not keys[col])]
+        else:
+            self.sort_keys = [(col, False)]
+        keys = dict(self.sort_keys)
+        for c in TABLE_COLUMNS:
+            arrow = "" if c not in keys else (" \u25bc" if keys[c] else " \u25b2")
+            self.tree.heading(c, text=c + arrow)
+        # The permutation is cached per key tuple; only the mask is reapplied.
+        self.filtered_idx = self.table.sorted_indices(self.filtered_mask, self.sort_keys)
+        self.table_view.set_rows(self.filtered_idx)
+
+    def on_heading_shift_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        column = self.tree.identify_column(event.x)
+        self.sort_column(TABLE_COLUMNS[int(column[1:]) - 1], secondary=True)
+        return "break"
+
+    def on_row_selected(self, event):
+        selected_item = self.tree.focus()
+        if selected_item:
+            self.prefetch_neighbours(int(selected_item))
+
+    def prefetch_neighbours(self, idx):
+        hits = np.flatnonzero(self.filtered_idx == idx)
+        if not len(hits):
+            return
+        pos = int(hits[0])
+        for neighbour in self.filtered_idx[max(0, pos - PREFETCH_NEIGHBOURS):pos + PREFETCH_NEIGHBOURS + 1]:
+            self.thumbnails.prefetch(screenshot_paths(self.get_journal_trade(int(neighbour))))
+
+    def show_image_popup(self, img_path):
+        win = tk.Toplevel()
+        win.title("Screenshot Preview")
+        win.geometry("600x400")
+        win.grab_set()
+        img_label = tk.Label(win, text="Loading...")
+        img_label.pack(pady=10)
+        self.thumbnails.request_preview(img_path, lambda photo: set_label_image(img_label, photo))
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(pady=8)
+        open_btn = ttk.Button(btn_frame, text="Open in Default App", command=lambda: open_image_in_default_app(img_path))
+        open_btn.pack(side="left", padx=10)
+        close_btn = ttk.Button(btn_frame, text="Close", command=win.destroy)
+        close_btn.pack(side="left", padx=10)
 
     def show_trade_details_popup(self, trade_id):
-        journal_trades = self.journal_trades
         try:
             idx = int(trade_id) - 1
-            if not (0 <= idx < len(journal_trades)):
+            if not (0 <= idx < len(self.table)):
                 messagebox.showerror("Not found", "Trade not found in journal.")
                 return
-            trade = journal_trades[idx]
+            trade = self.get_journal_trade(idx)
         except Exception:
             messagebox.showerror("Not found", "Trade not found in journal.")
             return
@@ -266,42 +663,17 @@ class StatsPage(tk.Tk):
                     label = ttk.Label(frame, text=f"{tf} {when.title()}")
                     label.grid(row=img_row, column=col, padx=5, pady=5)
                     if img_path and os.path.exists(img_path):
-                        try:
-                            pil_img = Image.open(img_path)
-                            pil_img.thumbnail((120, 75))
-                            tk_img = ImageTk.PhotoImage(pil_img)
-                            img_lbl = tk.Label(frame, image=tk_img)
-                            img_lbl.image = tk_img
-                            img_lbl.grid(row=img_row+1, column=col, padx=5, pady=5)
-
-                            def show_image_popup(img_path=img_path):
-                                win = tk.Toplevel()
-                                win.title("Screenshot Preview")
-                                win.geometry("600x400")
-                                win.grab_set()
-                                img = Image.open(img_path)
-                                img.thumbnail((580, 340))
-                                tkimg = ImageTk.PhotoImage(img)
-                                img_label = tk.Label(win, image=tkimg)
-                                img_label.image = tkimg
-                                img_label.pack(pady=10)
-                                btn_frame = ttk.Frame(win)
-                                btn_frame.pack(pady=8)
-                                open_btn = ttk.Button(btn_frame, text="Open in Default App", command=lambda: open_image_in_default_app(img_path))
-                                open_btn.pack(side="left", padx=10)
-                                close_btn = ttk.Button(btn_frame, text="Close", command=win.destroy)
-                                close_btn.pack(side="left", padx=10)
-
-                            img_lbl.bind("<Button-1>", lambda e, p=img_path: show_image_popup(p))
-                        except Exception:
-                            err_lbl = tk.Label(frame, text="(image error)")
-                            err_lbl.grid(row=img_row+1, column=col)
+                        img_lbl = tk.Label(frame, text="(loading)")
+                        img_lbl.grid(row=img_row+1, column=col, padx=5, pady=5)
+                        img_lbl.bind("<Button-1>", lambda e, p=img_path: self.show_image_popup(p))
+                        self.thumbnails.request(img_path, callback=lambda photo, lbl=img_lbl: set_label_image(lbl, photo))
                     else:
                         empty = ttk.Label(frame, text="(none)")
                         empty.grid(row=img_row+1, column=col)
                     col += 1
 
         ttk.Button(frame, text="Close", command=popup.destroy).grid(row=img_row+3, column=0, columnspan=col, pady=20)
+        self.prefetch_neighbours(idx)
 
 if __name__ == "__main__":
     app = StatsPage()
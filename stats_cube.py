@@ -0,0 +1,167 @@
+import numpy as np
+
+from trade_table import CATEGORICAL_FIELDS, category_value
+
+MEASURES = ["count", "wins", "pnl", "pnl_sq", "rr", "rr_sq", "hold", "hold_sq"]
+ANY = "ANY"
+
+
+def measure_vector(pnl, rr, hold, win):
+    return np.array([1.0, float(win), pnl, pnl * pnl, rr, rr * rr, hold, hold * hold])
+
+
+def summarize(totals):
+    count, wins, pnl, pnl_sq, rr, _, hold, _ = totals
+    total_trades = int(round(count))
+    wins = int(round(wins))
+    if total_trades:
+        mean_pnl = pnl / total_trades
+        pnl_std = float(np.sqrt(max(pnl_sq / total_trades - mean_pnl * mean_pnl, 0.0)))
+        win_rate = wins / total_trades * 100
+        avg_rr = rr / total_trades
+        avg_hold_time = hold / total_trades
+    else:
+        pnl_std = win_rate = avg_rr = avg_hold_time = 0.0
+    return {
+        "total_trades": total_trades,
+        "wins": wins,
+        "losses": total_trades - wins,
+        "win_rate": win_rate,
+        "total_pnl": float(pnl),
+        "avg_rr": float(avg_rr),
+        "avg_hold_time": float(avg_hold_time),
+        "pnl_std": pnl_std,
+    }
+
+
+# --- Stats Cube ---
+# One cell of running sums per distinct combination of the playbook dimensions.
+# A filter selects cells, not trades, so queries cost O(cells).
+class StatsCube:
+    def __init__(self, dimensions=CATEGORICAL_FIELDS):
+        self.dimensions = list(dimensions)
+        self.categories = {d: [] for d in self.dimensions}
+        self._codes = {d: {} for d in self.dimensions}
+        self.keys = np.empty((0, len(self.dimensions)), dtype=np.int32)
+        self.cells = np.empty((0, len(MEASURES)), dtype=np.float64)
+        self._cell_of = {}
+
+    @classmethod
+    def from_table(cls, table):
+        cube = cls(CATEGORICAL_FIELDS)
+        for d in cube.dimensions:
+            cube.categories[d] = list(table.categories[d])
+            cube._codes[d] = {value: code for code, value in enumerate(cube.categories[d])}
+        if not len(table):
+            return cube
+        # Mixed-radix encode each trade's codes into one int64 so np.unique stays 1-D.
+        packed = np.zeros(len(table), dtype=np.int64)
+        radices = [max(len(cube.categories[d]), 1) for d in cube.dimensions]
+        for d, radix in zip(cube.dimensions, radices):
+            packed = packed * radix + table.codes[d]
+        unique_packed, inverse = np.unique(packed, return_inverse=True)
+        keys = np.empty((len(unique_packed), len(radices)), dtype=np.int64)
+        rest = unique_packed
+        for k in range(len(radices) - 1, -1, -1):
+            keys[:, k] = rest % radices[k]
+            rest = rest // radices[k]
+        pnl = table.columns["P&L"]
+        rr = table.columns["R:R"]
+        hold = table.columns["Hold Time"]
+        per_trade = [np.ones_like(pnl), table.columns["Win"].astype(np.float64), pnl, pnl * pnl, rr, rr * rr, hold, hold * hold]
+        cube.keys = keys.astype(np.int32)
+        cube.cells = np.stack([np.bincount(inverse, weights=m, minlength=len(keys)) for m in per_trade], axis=1)
+        cube._cell_of = {tuple(k): i for i, k in enumerate(cube.keys.tolist())}
+        return cube
+
+    def _intern(self, dimension, value):
+        value = category_value(value)
+        code = self._codes[dimension].get(value)
+        if code is None:
+            code = self._codes[dimension][value] = len(self.categories[dimension])
+            self.categories[dimension].append(value)
+        return code
+
+    def _cell(self, values):
+        key = tuple(self._intern(d, v) for d, v in zip(self.dimensions, values))
+        i = self._cell_of.get(key)
+        if i is None:
+            i = self._cell_of[key] = len(self.keys)
+            self.keys = np.vstack((self.keys, np.array([key], dtype=np.int32)))
+            self.cells = np.vstack((self.cells, np.zeros((1, len(MEASURES)))))
+        return i
+
+    # --- Incremental Updates ---
+    def add(self, row, sign=1):
+        i = self._cell([row[d] for d in self.dimensions])
+        self.cells[i] += sign * measure_vector(row["P&L"], row["R:R"], row["Hold Time"], row["Win"])
+
+    def remove(self, row):
+        self.add(row, sign=-1)
+
+    def replace(self, old_row, new_row):
+        self.remove(old_row)
+        self.add(new_row)
+
+    def merge(self, other):
+        for key, cell in zip(other.keys.tolist(), other.cells):
+            values = [other.categories[d][k] for d, k in zip(other.dimensions, key)]
+            i = self._cell(values)  # may grow self.cells, so index it afterwards
+            self.cells[i] += cell
+
+    # --- Serialization ---
+    def to_dict(self):
+        return {
+            "dimensions": self.dimensions,
+            "categories": self.categories,
+            "keys": self.keys.tolist(),
+            "cells": self.cells.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        cube = cls(d["dimensions"])
+        for dim in cube.dimensions:
+            cube.categories[dim] = list(d["categories"][dim])
+            cube._codes[dim] = {value: code for code, value in enumerate(cube.categories[dim])}
+        cube.keys = np.array(d["keys"], dtype=np.int32).reshape(-1, len(cube.dimensions))
+        cube.cells = np.array(d["cells"], dtype=np.float64).reshape(-1, len(MEASURES))
+        cube._cell_of = {tuple(k): i for i, k in enumerate(cube.keys.tolist())}
+        return cube
+
+    # --- Queries ---
+    def _cell_mask(self, filters, exclude=()):
+        mask = np.ones(len(self.keys), dtype=bool)
+        for k, d in enumerate(self.dimensions):
+            value = filters.get(d, ANY)
+            if value == ANY or d in exclude:
+                continue
+            code = self._codes[d].get(value)
+            if code is None:
+                return np.zeros(len(self.keys), dtype=bool)
+            mask &= self.keys[:, k] == code
+        return mask
+
+    def totals(self, filters):
+        return self.cells[self._cell_mask(filters)].sum(axis=0)
+
+    def query(self, filters):
+        return summarize(self.totals(filters))
+
+    def breakdown(self, row_dim, col_dim, filters):
+        mask = self._cell_mask(filters)
+        r = self.dimensions.index(row_dim)
+        c = self.dimensions.index(col_dim)
+        keys = self.keys[mask]
+        cells = self.cells[mask]
+        matrix = np.zeros((len(self.categories[row_dim]), len(self.categories[col_dim]), len(MEASURES)))
+        np.add.at(matrix, (keys[:, r], keys[:, c]), cells)
+        rows = [i for i in range(matrix.shape[0]) if matrix[i, :, 0].sum() > 0.5]
+        cols = [j for j in range(matrix.shape[1]) if matrix[:, j, 0].sum() > 0.5]
+        rows.sort(key=self.categories[row_dim].__getitem__)
+        cols.sort(key=self.categories[col_dim].__getitem__)
+        return (
+            [self.categories[row_dim][i] for i in rows],
+            [self.categories[col_dim][j] for j in cols],
+            [[summarize(matrix[i, j]) for j in cols] for i in rows],
+        )
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+
+def _trade(setup="Breakout", entry="Market", session="London", outcome="Take Profit Hit", price=100.0,
+           sl_pips=50.0, lot_size=0.2, trade_date="2024-03-04", trade_time="10:00", exit_time="12:30",
+           timezone="UTC", notes="", sl_reason="Structure", tp_reason="RR Ratio", partial_closes=None):
+    return {
+        "symbol": "XAUUSD",
+        "timeframe": "1h",
+        "info": {
+            "symbol": "XAUUSD", "timeframe": "1h", "trade_type": "Buy", "setup": setup, "entry": entry,
+            "market_session": session, "timezone": timezone, "trade_date": trade_date, "trade_time": trade_time,
+            "entry_price": 2000.0, "lot_size": lot_size, "sl_pips": sl_pips, "sl_price": 1995.0,
+            "tp_pips": 100.0, "tp_price": 2010.0, "sl_reason": sl_reason, "tp_reason": tp_reason,
+            "account_balance": 10000.0,
+        },
+        "tf_screenshots": {tf: {"before": None, "after": None} for tf in ("D1", "H4", "H1")},
+        "review": {"outcome": outcome, "price": price, "notes": notes, "exit_time": exit_time, "max_drawdown_pips": 10.0},
+        "partial_closes": partial_closes or [],
+        "sl_to_be": False,
+    }
+
+
+@pytest.fixture
+def tk_root():
+    # Widget tests need a display; they are skipped on headless machines.
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"no display: {e}")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+@pytest.fixture
+def make_trade():
+    # make_trade(**fields) -> a journal dict in the layout the app saves.
+    return _trade
+
+
+@pytest.fixture
+def sample_trades():
+    return [
+        _trade(),
+        _trade(setup="Reversal", outcome="Stop Loss Hit", price=-100.0, trade_date="2024-03-05", notes="Moved SL to BE too early."),
+        _trade(session="New York", price=250.0, sl_pips=20.0, trade_date="2024-04-01", exit_time="2024-04-02 09:00",
+               notes="News spike after the open."),
+        _trade(setup="Reversal", entry="Limit", outcome="Break Even", price=0.0, trade_date="2024-05-10",
+               partial_closes=[{"pips": 30.0, "pnl": 60.0, "reason_for_close": "Reached Partial TP 1"}]),
+        _trade(session="Tokyo", outcome="Stop Loss Hit", price=-50.0, sl_pips=80.0, trade_date="2024-05-11",
+               notes="moved sl then stopped out"),
+    ]
+
+
+@pytest.fixture
+def journal_file(tmp_path, sample_trades):
+    path = tmp_path / "trades_journal.json"
+    path.write_text(json.dumps({"trades": sample_trades, "log_seq": 0}), encoding="utf-8")
+    return str(path)
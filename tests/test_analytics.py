@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+
+import pytest
+
+import analytics
+from sqlite_store import SQLiteJournalStore
+from trade_table import TradeTable
+
+
+def run_cli(capsys, *argv):
+    assert analytics.main(["stats", *argv]) == 0
+    return capsys.readouterr().out
+
+
+@pytest.fixture
+def db_file(tmp_path, sample_trades):
+    path = str(tmp_path / "journal.db")
+    store = SQLiteJournalStore(path)
+    store.replace_all(sample_trades)
+    store.close()
+    return path
+
+
+def test_filter_mask_combines_index_rows_and_search(journal_file):
+    store = analytics.load_journal(journal_file, db_file=None, search=True)
+    table = store.table
+    ids = lambda mask: table.columns["ID"][mask].tolist()
+    assert ids(analytics.filter_mask(table, store.index, {"Setup": "Breakout"})) == [1, 3, 5]
+    assert ids(analytics.filter_mask(table, store.index, {"Setup": "Breakout", "Stop Loss Size": "50"})) == [1, 5]
+    assert ids(analytics.filter_mask(table, store.index, {"From Date": "2024-04-01", "To Date": "2024-05-10"})) == [3, 4]
+    assert ids(analytics.filter_mask(table, store.index, {"Search": "moved"}, store.search)) == [2, 5]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"Setup": "Reversal"},
+    {"Setup": "Breakout", "Stop Loss Size": "40"},
+    {"From Date": "2024-03-05", "To Date": "2024-04-30"},
+])
+def test_aggregate_agrees_with_the_trade_rows(journal_file, filters):
+    store = analytics.load_journal(journal_file, db_file=None)
+    mask = analytics.filter_mask(store.table, store.index, filters)
+    expected = store.table.aggregates(mask)
+    actual = analytics.aggregate(store.table, store.cube, filters, mask)
+    assert actual == pytest.approx(expected)
+
+
+def test_breakdown_lists_only_populated_cells(journal_file):
+    store = analytics.load_journal(journal_file, db_file=None)
+    result = analytics.breakdown(store.cube, "Setup", "Market Session", {})
+    cells = {(c["Setup"], c["Market Session"]): c["total_trades"] for c in result["cells"]}
+    assert cells == {("Breakout", "London"): 1, ("Breakout", "New York"): 1, ("Breakout", "Tokyo"): 1, ("Reversal", "London"): 2}
+
+
+def test_cli_json_summary_and_sorted_trades(journal_file, capsys):
+    report = json.loads(run_cli(capsys, journal_file, "--setup", "Breakout", "--trades", "--sort", "P&L:desc"))
+    assert report["summary"]["total_trades"] == 3
+    assert report["summary"]["total_pnl"] == pytest.approx(300.0)
+    assert [t["ID"] for t in report["trades"]] == [3, 1, 5]
+
+
+def test_cli_csv_has_one_row_per_journal(journal_file, tmp_path, make_trade, capsys):
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps({"trades": [make_trade(price=40.0)]}), encoding="utf-8")
+    rows = list(csv.DictReader(io.StringIO(run_cli(capsys, journal_file, str(other), "--format", "csv", "--workers", "1"))))
+    assert [r["journal"] for r in rows] == [journal_file, str(other)]
+    assert [int(r["total_trades"]) for r in rows] == [5, 1]
+    assert float(rows[1]["total_pnl"]) == pytest.approx(40.0)
+
+
+def test_cli_rejects_unknown_sort_columns(journal_file, capsys):
+    with pytest.raises(SystemExit) as exc:
+        analytics.main(["stats", journal_file, "--trades", "--sort", "Profit"])
+    assert exc.value.code == 2
+    assert "unknown column 'Profit'" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("flags, filters", [
+    ([], {}),
+    (["--session", "London"], {"Market Session": "London"}),
+    (["--from", "2024-04-01"], {"From Date": "2024-04-01"}),
+])
+def test_db_summary_comes_straight_from_sql(db_file, sample_trades, capsys, monkeypatch, flags, filters):
+    # The plain-summary path must not load the journal at all.
+    monkeypatch.setattr(analytics, "load_journal", None)
+    report = json.loads(run_cli(capsys, "--db", db_file, *flags))
+    table = TradeTable.from_journal(sample_trades)
+    assert report["journal"] == db_file
+    assert report["summary"] == pytest.approx(table.aggregates(table.mask(filters)))
+
+
+def test_db_trades_are_read_from_the_store(db_file, capsys):
+    report = json.loads(run_cli(capsys, "--db", db_file, "--close-reason", "Stop Loss Hit", "--trades"))
+    assert report["summary"]["total_trades"] == 2
+    assert [t["ID"] for t in report["trades"]] == [2, 5]
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+app = pytest.importorskip("app")
+
+from journal_log import JournalLog
+from trade_store import TradeStore
+
+# The journal window's bookkeeping, driven without a display: methods are
+# called on a stand-in for the Tk window.
+
+
+class FakePage:
+    def __init__(self, store, alive=True):
+        self.trade_store = store
+        self.alive = alive
+
+    def winfo_exists(self):
+        return self.alive
+
+    def on_data_loaded(self, store):
+        self.trade_store = store
+
+
+def fake_window(journal_file, store):
+    return SimpleNamespace(journal=JournalLog(journal_file), trade_store=store, trades=store.trades, stats_pages=[])
+
+
+def test_open_stats_pages_follow_a_reloaded_store(journal_file):
+    old = TradeStore([])
+    window = fake_window(journal_file, old)
+    sharing, own, closed = FakePage(old), FakePage(TradeStore([])), FakePage(old, alive=False)
+    window.stats_pages = [sharing, own, closed]
+    new = TradeStore([])
+    app.TradingJournalApp._use_store(window, new)
+    assert window.trade_store is new
+    assert sharing.trade_store is new
+    assert own.trade_store is not new
+    assert window.stats_pages == [sharing, own]
+
+
+def test_no_journal_writes_until_a_load_succeeds(journal_file, sample_trades, make_trade, monkeypatch):
+    writer = JournalLog(journal_file)
+    trades = writer.load()
+    writer.attach(trades)
+    for trade in (make_trade(setup="Range"), make_trade(setup="Pullback")):
+        writer.add(trade)
+        trades.append(trade)
+
+    errors = []
+    monkeypatch.setattr(app.messagebox, "showerror", lambda *args, **kwargs: errors.append(args))
+    window = fake_window(journal_file, TradeStore([]))
+    window._loading = False
+    window._journal_loaded = False
+    window._busy = lambda: app.TradingJournalApp._busy(window)
+    window.schedule_search_save = window.update_stats_bar = lambda: None
+
+    # The first load failed: nothing may be appended with seqs the log already has.
+    app.TradingJournalApp.add_trade(window, app.Trade.from_dict(make_trade(setup="News Play")))
+    assert len(errors) == 1
+    assert JournalLog(journal_file).read_trades() == trades
+
+    store = TradeStore.from_journal(window.journal.load())
+    store.mark_saved()
+    app.TradingJournalApp._use_store(window, store)
+    added = make_trade(setup="News Play")
+    app.TradingJournalApp.add_trade(window, app.Trade.from_dict(added))
+    window.journal.compact()
+    assert JournalLog(journal_file).read_trades() == trades + [added]
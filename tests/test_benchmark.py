@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+benchmark = pytest.importorskip("benchmark")
+
+from trade_model import Trade
+
+
+def test_generated_journals_are_seeded():
+    assert benchmark.generate_trades(50, seed=3) == benchmark.generate_trades(50, seed=3)
+    assert benchmark.generate_trades(50, seed=3) != benchmark.generate_trades(50, seed=4)
+
+
+def test_generated_trades_load_like_saved_ones():
+    trades = benchmark.generate_trades(200)
+    assert [Trade.from_dict(d).to_dict() for d in trades] == trades
+    dates = [t["info"]["trade_date"] for t in trades]
+    assert dates == sorted(dates)
+
+
+def test_compare_flags_slow_stages_only():
+    baseline = {"results": {"1000": {"stages": {"apply_filters": 0.10, "aggregates": 0.001, "generate": 1.0}}}}
+    results = {"1000": {"stages": {"apply_filters": 0.20, "aggregates": 0.003, "generate": 5.0}}}
+    comparison, regressions = benchmark.compare(results, baseline)
+    assert regressions == ["1000/apply_filters"]  # aggregates is slower but below the noise floor
+    assert comparison["1000"]["apply_filters"]["ratio"] == pytest.approx(2.0)
+    assert "generate" not in comparison["1000"]
+    assert benchmark.compare(results, baseline, tolerance=1.5)[1] == []
+
+
+def test_run_times_every_stage(tmp_path):
+    report = benchmark.run([200], str(tmp_path), memory=False)
+    result = report["results"]["200"]
+    assert result["trades"] == 200
+    assert {"load_journal_data", "apply_filters", "aggregates", "equity_curve", "treeview", "search_query"} <= set(result["stages"])
+    assert all(seconds >= 0 for seconds in result["stages"].values())
+    json.dumps(report)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from equity import drawdown_summary, equity_curve, lttb
+from trade_table import TradeTable
+
+
+def test_curve_and_drawdown(sample_trades):
+    curve = equity_curve(TradeTable.from_journal(sample_trades))
+    assert curve["equity"].tolist() == [10100.0, 10000.0, 10250.0, 10250.0, 10200.0]
+    assert curve["drawdown"].tolist() == [0.0, -100.0, 0.0, 0.0, -50.0]
+    assert drawdown_summary(curve) == pytest.approx({
+        "start_balance": 10000.0,
+        "final_balance": 10200.0,
+        "max_drawdown": 100.0,
+        "max_drawdown_pct": 100 / 10100 * 100,
+        "max_drawdown_trades": 1,
+        "max_drawdown_days": 1,
+    })
+
+
+def test_curve_follows_trade_dates_not_journal_order(sample_trades):
+    table = TradeTable.from_journal(list(reversed(sample_trades)))
+    curve = equity_curve(table)
+    assert table.columns["ID"][curve["order"]].tolist() == [5, 4, 3, 2, 1]
+    assert curve["equity"].tolist() == [10100.0, 10000.0, 10250.0, 10250.0, 10200.0]
+
+
+def test_losing_from_the_start_counts_from_the_balance(make_trade):
+    trades = [make_trade(price=-100.0, trade_date="2024-03-01"), make_trade(price=-50.0, trade_date="2024-03-08")]
+    curve = equity_curve(TradeTable.from_journal(trades))
+    assert curve["max_drawdown"] == 150.0
+    assert curve["max_drawdown_trades"] == 2
+    assert curve["max_drawdown_days"] == 7
+
+
+def test_empty_selection(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    curve = equity_curve(table, np.zeros(len(table), dtype=bool))
+    assert len(curve["equity"]) == 0
+    assert curve["final_balance"] == curve["start_balance"] == 0.0
+    assert curve["max_drawdown"] == 0.0
+
+
+def test_lttb_keeps_the_ends_and_the_spikes():
+    rng = np.random.default_rng(1)
+    y = np.cumsum(rng.normal(size=10_000))
+    y[6_543] += 500.0
+    picked = lttb(y, 200)
+    assert len(picked) == 200
+    assert picked[0] == 0 and picked[-1] == len(y) - 1
+    assert np.all(np.diff(picked) > 0)
+    assert 6_543 in picked
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 10), (10, 50), (10, 2), (0, 100)])
+def test_lttb_leaves_short_series_alone(n, threshold):
+    assert lttb(np.arange(n, dtype=float), threshold).tolist() == list(range(n))
@@ -0,0 +1,52 @@
+import numpy as np
+
+from filter_index import BitmapIndex, bits_from_mask, mask_from_bits
+from trade_table import TradeTable, journal_trade_fields
+
+
+def brute_force(table, filters):
+    return table.mask({field: value for field, value in filters.items() if field in table.codes})
+
+
+def test_bits_and_masks_round_trip():
+    mask = np.array([True, False, False, True, True, False, False, False, True])
+    assert bits_from_mask(mask) == 0b100011001
+    assert mask_from_bits(bits_from_mask(mask), len(mask)).tolist() == mask.tolist()
+
+
+def test_select_matches_the_table_mask(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    index = BitmapIndex.from_table(table)
+    for filters in ({}, {"Setup": "Reversal"}, {"Setup": "Breakout", "Market Session": "London"},
+                    {"Setup": "ANY", "Entry Type": "Limit"}, {"Setup": "Nope"}):
+        assert index.to_mask(index.select(filters)).tolist() == brute_force(table, filters).tolist()
+
+
+def test_option_counts_ignore_the_fields_own_filter(sample_trades):
+    index = BitmapIndex.from_table(TradeTable.from_journal(sample_trades))
+    counts = index.option_counts("Setup", {"Setup": "Reversal", "Market Session": "London"})
+    assert counts == {"Breakout": 1, "Reversal": 2}
+    assert index.count({"Reason for Close": "Stop Loss Hit"}) == 2
+
+
+def test_incremental_updates_match_a_rebuild(sample_trades, make_trade):
+    trades = list(sample_trades)
+    table = TradeTable.from_journal(trades)
+    index = BitmapIndex.from_table(table)
+
+    trades.append(make_trade(setup="Range", session="Sydney"))
+    index.add(journal_trade_fields(trades[-1]))
+    trades[1] = make_trade(setup="Breakout", session="Tokyo")
+    index.update(1, journal_trade_fields(trades[1]))
+    del trades[0]
+    index.delete(0)
+    extra = TradeTable.from_journal([make_trade(setup="Range"), make_trade(setup="Pullback")])
+    trades += [make_trade(setup="Range"), make_trade(setup="Pullback")]
+    table = TradeTable.from_journal(trades[:-2])
+    start = table.extend(extra)
+    index.extend(table, start)
+
+    rebuilt = BitmapIndex.from_table(TradeTable.from_journal(trades))
+    assert index.size == rebuilt.size == len(trades)
+    assert index.bitmaps == rebuilt.bitmaps
+    assert index.distinct("Setup") == ["Breakout", "Pullback", "Range", "Reversal"]
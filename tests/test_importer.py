@@ -0,0 +1,101 @@
+from datetime import time as dt_time
+
+import pytest
+
+import importer
+from importer import ImportIndex, import_history, read_rows, session_for, trade_from_row
+from journal_log import JournalLog
+
+MT4_STATEMENT = """<html><body><table>
+<tr><td colspan=14><b>Closed Transactions:</b></td></tr>
+<tr align=center><td>Ticket</td><td nowrap>Open Time</td><td>Type</td><td>Size</td><td>Item</td><td>Price</td>
+<td>S / L</td><td>T / P</td><td nowrap>Close Time</td><td>Price</td><td>Commission</td><td>Taxes</td><td>Swap</td><td>Profit</td></tr>
+<tr><td>1001</td><td>2024.03.04 10:00:00</td><td>buy</td><td>0.20</td><td>xauusd</td><td>2000.00</td>
+<td>1995.00</td><td>2010.00</td><td>2024.03.04 12:30:00</td><td>2010.00</td><td>-1.00</td><td>0.00</td><td>0.00</td><td>201.00</td></tr>
+<tr><td>1002</td><td>2024.03.05 15:00:00</td><td>sell</td><td>0.10</td><td>eurusd</td><td>1.0850</td>
+<td>1.0870</td><td>0.0000</td><td>2024.03.05 16:00:00</td><td>1.0870</td><td>0.00</td><td>0.00</td><td>0.00</td><td>-20.00</td></tr>
+<tr><td>1003</td><td>2024.03.06 09:00:00</td><td>balance</td><td colspan=10>Deposit</td><td>1&nbsp;000.00</td></tr>
+<tr><td>1004</td><td>2024.03.07 20:00:00</td><td>buy</td><td>1.00</td><td>usdjpy</td><td>150.00</td>
+<td>149.50</td><td>0.00</td><td>2024.03.07 21:00:00</td><td>150.20</td><td>0.00</td><td>0.00</td><td>-2.00</td><td>1 335.00</td></tr>
+<tr><td colspan=14><b>Open Trades:</b></td></tr>
+<tr align=center><td>Ticket</td><td>Open Time</td><td>Type</td><td>Size</td><td>Item</td><td>Price</td><td>S / L</td><td>T / P</td>
+<td></td><td>Price</td><td>Commission</td><td>Taxes</td><td>Swap</td><td>Profit</td></tr>
+<tr><td>1005</td><td>2024.03.08 10:00:00</td><td>buy</td><td>0.10</td><td>xauusd</td><td>2100.00</td><td>0</td><td>0</td>
+<td></td><td>2101.00</td><td>0.00</td><td>0.00</td><td>0.00</td><td>10.00</td></tr>
+</table></body></html>
+"""
+
+MT5_CSV = """Time;Position;Symbol;Type;Volume;Price;S / L;T / P;Time;Price;Commission;Swap;Profit
+2024.05.10 08:30:00;2001;XAUUSD;sell;0.5;2300.00;2305.00;2290.00;2024.05.10 09:00:00;2300.00;0;0;0.00
+2024.05.11 01:00:00;2002;XAUUSD;buy;0.5;2300.00;2295.00;;2024.05.11 03:00:00;2295.00;-3.5;0;-250.00
+"""
+
+
+@pytest.fixture
+def statement(tmp_path):
+    path = tmp_path / "statement.htm"
+    path.write_bytes(MT4_STATEMENT.encode("utf-16"))
+    return str(path)
+
+
+@pytest.fixture
+def mt5_csv(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(MT5_CSV, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("hour, minute, session", [
+    (1, 0, "Sydney"), (8, 30, "Tokyo"), (10, 0, "London"), (16, 0, "London"), (20, 0, "New York"), (22, 30, "Sydney"),
+])
+def test_session_for(hour, minute, session):
+    assert session_for(dt_time(hour, minute)) == session
+
+
+def test_mt4_statement_rows(statement):
+    trades = [trade_from_row(row, "UTC") for row in read_rows(statement)]
+    # The deposit and the "Open Trades:" title row are read but skipped.
+    assert [t and t["info"]["broker_ticket"] for t in trades] == ["1001", "1002", None, "1004", None]
+    gold, fiber, _, yen, _ = trades
+    assert gold["symbol"] == "XAUUSD" and gold["info"]["trade_type"] == "Buy"
+    assert (gold["info"]["sl_pips"], gold["info"]["tp_pips"]) == (50.0, 100.0)
+    assert gold["review"]["outcome"] == "Take Profit Hit" and gold["review"]["price"] == 200.0
+    assert gold["review"]["exit_time"] == "2024-03-04 12:30"
+    assert gold["info"]["market_session"] == "London"
+    assert fiber["info"]["sl_pips"] == 20.0 and fiber["review"]["outcome"] == "Stop Loss Hit"
+    assert yen["info"]["sl_pips"] == 50.0 and yen["review"]["outcome"] == "Manual Close"
+    assert yen["review"]["price"] == 1333.0
+
+
+def test_mt5_csv_rows(mt5_csv):
+    trades = [trade_from_row(row, "Europe/London") for row in read_rows(mt5_csv)]
+    assert [t["info"]["broker_ticket"] for t in trades] == ["2001", "2002"]
+    assert trades[0]["review"]["outcome"] == "Break Even"
+    assert trades[0]["info"]["market_session"] == "Tokyo"  # 08:30 BST is 07:30 UTC
+    assert trades[1]["review"]["outcome"] == "Stop Loss Hit" and trades[1]["review"]["price"] == -253.5
+    assert trades[1]["info"]["tp_price"] == ""
+
+
+def test_import_index_claims_each_trade_once(statement, make_trade):
+    trades = [t for t in (trade_from_row(row, "UTC") for row in read_rows(statement)) if t]
+    index = ImportIndex([make_trade()["info"], trades[0]["info"]])
+    assert [index.claim(t) for t in trades] == [False, True, True]
+    assert [index.claim(t) for t in trades] == [False, False, False]
+
+
+def test_import_history_counts_and_dedups(statement, mt5_csv, journal_file, tmp_path, sample_trades):
+    db_file = str(tmp_path / "missing.db")
+    progress = []
+    counts = import_history(statement, journal_file, db_file, batch_size=1, progress=lambda *p: progress.append(p))
+    assert counts == {"rows": 5, "imported": 3, "duplicates": 0, "skipped": 2}
+    assert progress[-1] == (3, 5, "Importing")
+    assert import_history(statement, journal_file, db_file)["duplicates"] == 3
+    assert import_history(mt5_csv, journal_file, db_file)["imported"] == 2
+    trades = JournalLog(journal_file).read_trades()
+    assert trades[:5] == sample_trades
+    assert [t["info"].get("broker_ticket") for t in trades[5:]] == ["1001", "1002", "1004", "2001", "2002"]
+
+
+def test_rows_split_across_read_chunks(statement, monkeypatch):
+    monkeypatch.setattr(importer, "CHUNK_BYTES", 64)
+    assert [row["ticket"] for row in read_rows(statement)][:4] == ["1001", "1002", "1003", "1004"]
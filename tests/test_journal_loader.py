@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from journal_loader import start_load
+
+
+class FakeMaster:
+    # Stands in for a Tk widget: after() callbacks run when run_until_idle pumps them.
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn, *args):
+        self.scheduled.append((fn, args))
+
+    def run_until_idle(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.scheduled:
+            assert time.monotonic() < deadline, "load did not finish"
+            fn, args = self.scheduled.pop(0)
+            fn(*args)
+            time.sleep(0.001)
+
+
+@pytest.fixture
+def master():
+    return FakeMaster()
+
+
+def test_result_and_progress_are_delivered(master):
+    seen = []
+
+    def load(progress):
+        progress(1, 2, "Reading")
+        progress(2, 2, "Reading")
+        return "store"
+
+    load_ = start_load(("test", "result"), load, master)
+    load_.subscribe(lambda result: seen.append(("done", result)), lambda *p: seen.append(("progress", p)))
+    master.run_until_idle()
+    assert seen[0] == ("progress", (0, 0, ""))
+    assert ("progress", (2, 2, "Reading")) in seen
+    assert seen[-1] == ("done", "store")
+
+
+def test_same_key_joins_the_running_load(master):
+    release = threading.Event()
+    calls = []
+
+    def load(progress):
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+
+    first = start_load(("test", "shared"), load, master)
+    second = start_load(("test", "shared"), load, master)
+    assert first is second
+    results = []
+    first.subscribe(results.append)
+    second.subscribe(results.append)
+    release.set()
+    master.run_until_idle()
+    assert results == [1, 1]
+    late = []
+    first.subscribe(late.append)  # joined after it finished
+    assert late == [1]
+    assert start_load(("test", "shared"), load, master) is not first
+
+
+def test_errors_reach_on_error(master):
+    def load(progress):
+        raise ValueError("bad journal")
+
+    errors = []
+    start_load(("test", "error"), load, master).subscribe(lambda result: None, on_error=errors.append)
+    master.run_until_idle()
+    assert len(errors) == 1 and str(errors[0]) == "bad journal"
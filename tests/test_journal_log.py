@@ -0,0 +1,108 @@
+import json
+import os
+
+from journal_log import JournalLog
+
+
+def read_snapshot(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_log_replays_over_the_snapshot(journal_file, sample_trades, make_trade):
+    journal = JournalLog(journal_file)
+    journal.load()
+    journal.add(make_trade(setup="Range"))
+    journal.edit(0, make_trade(setup="Pullback"))
+    journal.delete(1)
+    journal.add_many([make_trade(setup="A"), make_trade(setup="B")])
+
+    trades = JournalLog(journal_file).load()
+    setups = [t["info"]["setup"] for t in trades]
+    assert setups == ["Pullback", "Breakout", "Reversal", "Breakout", "Range", "A", "B"]
+    assert read_snapshot(journal_file)["trades"] == sample_trades  # only the log was written
+
+
+def test_compaction_folds_the_log_into_the_snapshot(journal_file, make_trade):
+    journal = JournalLog(journal_file)
+    trades = journal.load()
+    journal.attach(trades)
+    for setup in ("A", "B"):
+        trade = make_trade(setup=setup)
+        journal.add(trade)
+        trades.append(trade)
+    journal.compact()
+
+    snapshot = read_snapshot(journal_file)
+    assert snapshot["log_seq"] == 2
+    assert [t["info"]["setup"] for t in snapshot["trades"]][-2:] == ["A", "B"]
+    assert os.path.getsize(journal_file + ".log") == 0
+    assert JournalLog(journal_file).load() == trades
+
+
+def test_maybe_compact_waits_for_the_threshold(journal_file, make_trade):
+    journal = JournalLog(journal_file, compact_threshold=10 ** 9)
+    journal.attach(journal.load())
+    journal.add(make_trade())
+    journal.maybe_compact()
+    assert os.path.getsize(journal_file + ".log") > 0
+    journal.compact_threshold = 1
+    journal.maybe_compact()
+    assert os.path.getsize(journal_file + ".log") == 0
+
+
+def test_records_already_in_the_snapshot_are_not_replayed(journal_file, make_trade):
+    # A crash after the snapshot was rewritten but before the log was truncated.
+    journal = JournalLog(journal_file)
+    trades = journal.load()
+    journal.attach(trades)
+    trade = make_trade(setup="Once")
+    journal.add(trade)
+    trades.append(trade)
+    with open(journal_file + ".log", "rb") as f:
+        log = f.read()
+    journal.compact()
+    with open(journal_file + ".log", "wb") as f:
+        f.write(log)
+    setups = [t["info"]["setup"] for t in JournalLog(journal_file).load()]
+    assert setups.count("Once") == 1
+
+
+def test_torn_tail_is_dropped_and_truncated(journal_file, sample_trades, make_trade):
+    journal = JournalLog(journal_file)
+    journal.load()
+    journal.add(make_trade(setup="Kept"))
+    good_size = os.path.getsize(journal_file + ".log")
+    with open(journal_file + ".log", "ab") as f:
+        f.write(b'{"seq": 2, "op": "add", "trade": {"inf')
+
+    reader = JournalLog(journal_file)
+    assert len(reader.read_trades()) == len(sample_trades) + 1
+    assert os.path.getsize(journal_file + ".log") > good_size  # reads leave the file alone
+    trades = reader.load()
+    assert trades[-1]["info"]["setup"] == "Kept"
+    assert os.path.getsize(journal_file + ".log") == good_size
+    reader.add(make_trade(setup="After"))
+    assert JournalLog(journal_file).load()[-1]["info"]["setup"] == "After"
+
+
+def test_legacy_snapshot_is_stamped(tmp_path, sample_trades):
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"trades": sample_trades}), encoding="utf-8")
+    assert JournalLog(str(path)).load() == sample_trades
+    assert read_snapshot(str(path))["log_seq"] == 0
+
+
+def test_read_new_records_follows_another_writer(journal_file, make_trade):
+    reader = JournalLog(journal_file)
+    reader.read_trades()
+    writer = JournalLog(journal_file)
+    writer.attach(writer.load())
+    assert reader.read_new_records() == []
+    writer.add(make_trade(setup="New"))
+    writer.delete(0)
+    records = reader.read_new_records()
+    assert [r["op"] for r in records] == ["add", "delete"]
+    assert reader.read_new_records() == []
+    writer.compact()
+    assert reader.read_new_records() is None
@@ -0,0 +1,163 @@
+import random
+
+import pytest
+
+import analytics
+from journal_log import JournalLog
+from journal_watch import JournalWatcher, digest_changes, log_changes
+from sqlite_store import SQLiteJournalStore
+from trade_store import trade_digest
+from trade_table import TradeTable
+
+
+def replay(trades, changes):
+    trades = list(trades)
+    for kind, idx, trade_dict, _ in changes:
+        if kind == "add":
+            trades.append(trade_dict)
+        elif kind == "delete":
+            del trades[idx]
+        else:
+            trades[idx] = trade_dict
+    return trades
+
+
+def digests(trades):
+    return [trade_digest(t) for t in trades]
+
+
+def kinds(changes):
+    return [(kind, idx) for kind, idx, _, _ in changes]
+
+
+def test_digest_changes_for_each_kind_of_write(sample_trades, make_trade):
+    edited = list(sample_trades)
+    edited[2] = make_trade(price=1.0)
+    assert kinds(digest_changes(digests(sample_trades), edited)) == [("edit", 2)]
+    removed = sample_trades[:1] + sample_trades[2:]
+    assert kinds(digest_changes(digests(sample_trades), removed)) == [("delete", 1)]
+    appended = sample_trades + [make_trade(price=2.0)]
+    assert kinds(digest_changes(digests(sample_trades), appended)) == [("add", None)]
+    assert digest_changes(digests(sample_trades), list(sample_trades)) == []
+
+
+def test_an_insert_in_the_middle_becomes_edits_and_an_add(sample_trades, make_trade):
+    inserted = sample_trades[:2] + [make_trade(price=3.0)] + sample_trades[2:]
+    changes = digest_changes(digests(sample_trades), inserted)
+    assert replay(sample_trades, changes) == inserted
+    assert {kind for kind, _ in kinds(changes)} == {"edit", "add"}
+
+
+def test_random_rewrites_replay_exactly(make_trade):
+    rng = random.Random(5)
+    for _ in range(200):
+        old = [make_trade(price=float(rng.randrange(6))) for _ in range(rng.randrange(12))]
+        new = list(old)
+        for _ in range(rng.randrange(5)):
+            op = rng.choice(["add", "delete", "edit"]) if new else "add"
+            if op == "add":
+                new.append(make_trade(price=float(rng.randrange(6))))
+            elif op == "delete":
+                del new[rng.randrange(len(new))]
+            else:
+                new[rng.randrange(len(new))] = make_trade(price=float(rng.randrange(6)))
+        assert replay(old, digest_changes(digests(old), new)) == new
+
+
+def test_log_changes_keep_the_order_they_were_made(make_trade):
+    trade = make_trade()
+    records = [{"seq": 1, "op": "add", "trade": trade}, {"seq": 2, "op": "delete", "index": 0}]
+    assert log_changes(records) == [("add", None, trade), ("delete", 0, None)]
+
+
+def assert_matches_journal(store, trades):
+    rebuilt = TradeTable.from_journal(trades)
+    assert len(store) == len(trades)
+    assert store.table.aggregates() == pytest.approx(rebuilt.aggregates())
+    assert [store.table.row(i)["P&L"] for i in range(len(trades))] == [rebuilt.row(i)["P&L"] for i in range(len(trades))]
+    assert store.cube.query({"Setup": "Breakout"}) == pytest.approx(rebuilt.aggregates(rebuilt.mask({"Setup": "Breakout"})))
+
+
+def catch_up(watcher):
+    assert watcher.has_changed()
+    changes = watcher.read_changes()
+    assert changes is not None
+    watcher.apply(changes)
+    assert not watcher.has_changed()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_watcher_follows_another_writer(journal_file, tmp_path, sample_trades, make_trade, compact):
+    store = analytics.load_journal(journal_file, db_file=None, digests=True)
+    watcher = JournalWatcher(store, journal_file, str(tmp_path / "missing.db"))
+    assert not watcher.has_changed()
+
+    writer = JournalLog(journal_file)
+    trades = writer.load()
+    writer.attach(trades)
+    for trade in (make_trade(setup="Range", price=30.0), make_trade(price=-20.0)):
+        writer.add(trade)
+        trades.append(trade)
+    trades[1] = make_trade(setup="Breakout", price=500.0)
+    writer.edit(1, trades[1])
+    writer.delete(0)
+    del trades[0]
+    if compact:
+        writer.compact()  # the log is gone, so the digests decide
+    catch_up(watcher)
+    assert_matches_journal(store, trades)
+
+
+def test_watcher_follows_a_sqlite_journal(tmp_path, sample_trades, make_trade):
+    db_file = str(tmp_path / "journal.db")
+    writer = SQLiteJournalStore(db_file)
+    writer.replace_all(sample_trades)
+    store = analytics.load_journal(str(tmp_path / "missing.json"), db_file, keep_trades=False, digests=True)
+    watcher = JournalWatcher(store, str(tmp_path / "missing.json"), db_file)
+    trades = list(sample_trades)
+    writer.delete(2)
+    del trades[2]
+    trades[0] = make_trade(price=-75.0, outcome="Stop Loss Hit")
+    writer.edit(0, trades[0])
+    writer.add(make_trade(setup="Range"))
+    trades.append(make_trade(setup="Range"))
+    writer.close()
+    catch_up(watcher)
+    assert_matches_journal(store, trades)
+
+
+def test_search_follows_a_delete_and_an_edit_in_sqlite(tmp_path, sample_trades, make_trade):
+    db_file = str(tmp_path / "journal.db")
+    writer = SQLiteJournalStore(db_file)
+    writer.replace_all(sample_trades[:4])
+    store = analytics.load_journal(str(tmp_path / "missing.json"), db_file, keep_trades=False, search=True, digests=True)
+    watcher = JournalWatcher(store, str(tmp_path / "missing.json"), db_file)
+    trades = sample_trades[:4]
+    writer.delete(1)
+    del trades[1]
+    trades[2] = make_trade(price=80.0, sl_reason="Liquidity sweep")
+    writer.edit(2, trades[2])
+    writer.close()
+    catch_up(watcher)
+    assert_matches_journal(store, trades)
+    assert store.search.search("sweep").tolist() == [False, False, True]
+    assert store.search.search("moved").tolist() == [False, False, False]
+
+
+def test_a_notes_only_edit_in_sqlite_is_picked_up(tmp_path, sample_trades):
+    db_file = str(tmp_path / "journal.db")
+    writer = SQLiteJournalStore(db_file)
+    writer.replace_all(sample_trades)
+    store = analytics.load_journal(str(tmp_path / "missing.json"), db_file, keep_trades=False, search=True, digests=True)
+    watcher = JournalWatcher(store, str(tmp_path / "missing.json"), db_file)
+    edited = writer.get_trade(2)
+    edited["review"]["notes"] = "Scaled out into resistance."
+    edited["partial_closes"] = [{"pips": 10.0, "pnl": 20.0, "reason_for_close": "Candle Closed Against Me"}]
+    writer.edit(2, edited)
+    writer.close()
+    assert watcher.has_changed()
+    changes = watcher.read_changes()
+    assert kinds(changes) == [("edit", 2)]
+    watcher.apply(changes)
+    assert store.search.search("resistance").tolist() == [False, False, True, False, False]
+    assert store.search.search('"closed against"').tolist() == [False, False, True, False, False]
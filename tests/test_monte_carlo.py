@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+
+import monte_carlo
+from monte_carlo import block_bootstrap, sample_values, simulate
+from trade_table import TradeTable
+
+
+def test_block_bootstrap_draws_consecutive_trades():
+    picks = block_bootstrap(np.random.default_rng(0), n=10, paths=50, horizon=12, block=4)
+    assert picks.shape == (50, 12)
+    blocks = picks.reshape(50, 3, 4)
+    assert np.all((blocks[:, :, 1:] - blocks[:, :, :-1]) % 10 == 1)
+
+
+def test_a_seed_repeats_the_run():
+    values = [120.0, -80.0, 40.0, -100.0, 250.0]
+    first = simulate(values, paths=2500, seed=7)
+    assert simulate(values, paths=2500, seed=7) == first
+    assert simulate(values, paths=2500, seed=8) != first
+    assert first["paths"] == 2500 and first["trades_per_path"] == 5
+    assert sum(first["histogram"]["counts"]) == 2500
+
+
+def test_the_process_pool_gives_the_same_result(monkeypatch):
+    values = np.linspace(-100.0, 150.0, 20)
+    serial = simulate(values, paths=3000, seed=11, workers=1)
+    monkeypatch.setattr(monte_carlo, "PARALLEL_MIN_CELLS", 0)
+    assert simulate(values, paths=3000, seed=11, workers=2) == serial
+
+
+def test_ruin_and_profit_probabilities():
+    losing = simulate([-100.0], start_balance=1000.0, paths=200, horizon=6, ruin_pct=50.0, seed=1)
+    assert losing["ruin_balance"] == 500.0
+    assert losing["risk_of_ruin"] == 100.0 and losing["prob_profit"] == 0.0
+    assert losing["max_drawdown"]["p50"] == 600.0 and losing["max_drawdown_pct"]["p50"] == pytest.approx(60.0)
+    winning = simulate([50.0], start_balance=1000.0, paths=200, horizon=6, seed=1)
+    assert winning["risk_of_ruin"] == 0.0 and winning["prob_profit"] == 100.0
+    assert winning["final_balance"]["mean"] == 1300.0 and winning["max_drawdown"]["p95"] == 0.0
+
+
+def test_rr_mode_compounds_at_fixed_risk():
+    report = simulate([2.0], start_balance=10000.0, paths=10, horizon=10, mode="rr", risk_pct=1.0, seed=1)
+    assert report["final_balance"]["mean"] == pytest.approx(10000.0 * 1.02 ** 10)
+    wiped = simulate([-200.0], start_balance=10000.0, paths=10, horizon=3, mode="rr", risk_pct=1.0, seed=1)
+    assert wiped["final_balance"]["p95"] == 0.0 and wiped["risk_of_ruin"] == 100.0
+
+
+def test_no_trades_is_an_error():
+    with pytest.raises(ValueError):
+        simulate([])
+
+
+def test_sample_values_follow_trade_dates(sample_trades):
+    table = TradeTable.from_journal(list(reversed(sample_trades)))
+    mask = table.mask({"Setup": "Breakout"})
+    assert sample_values(table, mask).tolist() == [100.0, 250.0, -50.0]
+    assert sample_values(table, mask, "rr").tolist() == pytest.approx([1.0, 6.25, -0.3125])
+
+
+@pytest.mark.parametrize("flags, sampled", [
+    ([], 5),
+    (["--setup", "Breakout"], 3),
+    (["--from", "2024-04-01", "--to", "2024-05-10"], 2),
+    (["--search", "moved"], 2),
+    (["--setup", "Breakout", "--search", "moved"], 1),
+])
+def test_cli_applies_every_filter(journal_file, capsys, flags, sampled):
+    assert monte_carlo.main([journal_file, "--paths", "200", "--seed", "3", "--workers", "1", *flags]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["sampled_trades"] == sampled and report["seed"] == 3
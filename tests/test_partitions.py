@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from journal_log import JournalLog
+from partitions import (
+    PartitionedJournal, UNDATED, join_journal, keys_for_range, partition_dir, partition_keys, split_journal,
+)
+from stats_cube import summarize
+from trade_table import TradeTable
+
+
+@pytest.fixture
+def journal(journal_file):
+    return split_journal(journal_file)
+
+
+def test_partition_keys(make_trade):
+    trades = [make_trade(trade_date="2024-03-04"), make_trade(trade_date="2024-12-31"), make_trade(trade_date="")]
+    assert partition_keys(trades) == ["2024-03", "2024-12", UNDATED]
+    assert partition_keys(trades, "quarter") == ["2024-Q1", "2024-Q4", UNDATED]
+
+
+def test_keys_for_range():
+    keys = ["2024-03", "2024-04", "2024-05", UNDATED]
+    assert keys_for_range(keys) == keys
+    assert keys_for_range(keys, "2024-04-01") == ["2024-04", "2024-05"]
+    assert keys_for_range(keys, "2024-03-31", "2024-04-01") == ["2024-03", "2024-04"]
+    assert keys_for_range(["2024-Q1", "2024-Q2"], end="2024-03-31") == ["2024-Q1"]
+
+
+def test_split_keeps_the_journal_order(journal, journal_file, sample_trades):
+    assert journal.keys() == ["2024-03", "2024-04", "2024-05"]
+    assert PartitionedJournal(partition_dir(journal_file)).load() == sample_trades
+
+
+def test_writes_touch_only_their_partitions(journal, journal_file, sample_trades, make_trade):
+    reopened = PartitionedJournal(partition_dir(journal_file))
+    trades = reopened.load()
+    untouched = os.stat(reopened.partition_path("2024-04")).st_mtime_ns
+    moved = make_trade(trade_date="2024-06-02", price=10.0)
+    reopened.edit(0, moved)
+    trades[0] = moved
+    reopened.delete(4)
+    del trades[4]
+    more = [make_trade(trade_date="2024-03-20"), make_trade(trade_date="2024-06-03")]
+    reopened.add_many(more)
+    trades += more
+    reopened.add(make_trade(trade_date=""))
+    trades.append(make_trade(trade_date=""))
+    assert os.stat(reopened.partition_path("2024-04")).st_mtime_ns == untouched
+    assert PartitionedJournal(partition_dir(journal_file)).load() == trades
+    assert reopened.get_trade(0) == moved
+
+
+def test_load_range_keeps_the_rest_as_summary_cubes(journal, sample_trades):
+    table, view, unloaded = journal.load_range("2024-04-01")
+    assert table.columns["ID"].tolist() == [1, 2, 3]
+    assert view.read_trades() == sample_trades[2:]
+    assert view.get_trade(1) == sample_trades[3]
+    assert summarize(unloaded.totals({}))["total_trades"] == 2
+    assert view.covers("2024-05-01") and not view.covers("2024-03-01")
+
+
+def test_parallel_load_matches_the_serial_one(journal):
+    serial, _, _ = journal.load_range(workers=1)
+    parallel, _, _ = journal.load_range(workers=2)
+    for field, column in serial.columns.items():
+        assert np.array_equal(parallel.columns[field], column, equal_nan=column.dtype.kind == "f"), field
+
+
+def test_summaries_are_reused_until_the_partition_changes(journal, make_trade):
+    first = journal.summary("2024-03")
+    assert (first["count"], first["total_pnl"]) == (2, 0.0)
+    with open(journal.summary_path("2024-03"), "r", encoding="utf-8") as f:
+        assert json.load(f) == first
+    journal.load()
+    journal.add(make_trade(trade_date="2024-03-30", price=40.0))
+    again = journal.summary("2024-03")
+    assert (again["count"], again["total_pnl"]) == (3, 40.0)
+    table = TradeTable.from_journal([t for t in journal.load() if t["info"]["trade_date"].startswith("2024-03")])
+    assert again["wins"] == table.aggregates()["wins"]
+
+
+def test_join_writes_one_journal_again(journal, journal_file, make_trade, sample_trades):
+    journal.load()
+    journal.add(make_trade(trade_date="2024-07-01"))
+    with open(journal_file + ".log", "w", encoding="utf-8") as f:
+        f.write("stale\n")
+    join_journal(journal_file)
+    assert JournalLog(journal_file).read_trades() == sample_trades + [make_trade(trade_date="2024-07-01")]
+    assert not os.path.exists(journal_file + ".log")
@@ -0,0 +1,77 @@
+import os
+import pstats
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture(autouse=True)
+def enabled():
+    was = profiling.ENABLED
+    profiling.reset()
+    profiling.enable()
+    yield
+    profiling.enable(was)
+    profiling.reset()
+
+
+def spans_by_name():
+    return {s["name"]: s for s in profiling.snapshot()["spans"]}
+
+
+def test_disabled_spans_and_counters_record_nothing():
+    profiling.enable(False)
+    with profiling.span("quiet"):
+        pass
+    profiling.count("quiet")
+    assert profiling.snapshot() == {"spans": [], "counters": {}}
+
+
+def test_snapshot_percentiles_and_counters():
+    for ms in range(1, 101):
+        profiling.record("filter", ms / 1000)
+    with profiling.span("load"):
+        pass
+    profiling.count("rows", 3)
+    profiling.count("rows")
+    spans = spans_by_name()
+    assert spans["filter"]["calls"] == 100
+    assert spans["filter"]["last"] == pytest.approx(0.100)
+    assert spans["filter"]["p50"] == pytest.approx(0.050, abs=0.001)
+    assert spans["filter"]["p95"] == pytest.approx(0.095, abs=0.001)
+    assert spans["filter"]["max"] == pytest.approx(0.100)
+    assert spans["load"]["calls"] == 1
+    assert profiling.snapshot()["counters"] == {"rows": 4}
+    assert profiling.span_names() == ["filter", "load"]
+
+
+def test_percentiles_cover_only_the_rolling_window():
+    for i in range(profiling.ROLLING_WINDOW + 50):
+        profiling.record("render", 1.0 if i < 50 else 0.01)
+    span = spans_by_name()["render"]
+    assert span["calls"] == profiling.ROLLING_WINDOW + 50
+    assert span["max"] == pytest.approx(0.01)
+
+
+def test_profile_next_dumps_one_run(tmp_path):
+    path = profiling.profile_next("stats/filter", str(tmp_path))
+    assert os.path.basename(path).startswith("stats_filter-")
+    assert profiling.armed() == {"stats/filter": path}
+    with profiling.span("stats/filter"):
+        sum(range(1000))
+    assert profiling.armed() == {}
+    assert path in profiling.dumps()
+    assert pstats.Stats(path).total_calls > 0
+    with profiling.span("stats/filter"):
+        pass
+    assert profiling.dumps().count(path) == 1
+
+
+def test_spans_still_record_when_the_dump_fails(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    profiling.profile_next("save", str(blocker / "sub"))
+    with profiling.span("save"):
+        pass
+    assert spans_by_name()["save"]["calls"] == 1
@@ -0,0 +1,44 @@
+import numpy as np
+
+from trade_table import TradeTable, journal_trade_fields
+
+
+def ids(table, indices):
+    return table.columns["ID"][indices].tolist()
+
+
+def test_sort_by_one_column(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    assert ids(table, table.sorted_indices(sort_keys=(("P&L", False),))) == [2, 5, 4, 1, 3]
+    assert ids(table, table.sorted_indices(sort_keys=(("P&L", True),))) == [3, 1, 4, 5, 2]
+    assert ids(table, table.sorted_indices(sort_keys=(("Trade Date", True),))) == [5, 4, 3, 2, 1]
+
+
+def test_categories_sort_by_name_and_ties_keep_journal_order(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    assert ids(table, table.sorted_indices(sort_keys=(("Market Session", False),))) == [1, 2, 4, 3, 5]
+
+
+def test_secondary_key_breaks_ties(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    keys = (("Setup", False), ("P&L", True))
+    assert ids(table, table.sorted_indices(sort_keys=keys)) == [3, 1, 5, 4, 2]
+
+
+def test_sorting_respects_the_filter_mask(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    mask = table.mask({"Setup": "Reversal"})
+    assert ids(table, table.sorted_indices(mask, (("P&L", True),))) == [4, 2]
+    assert ids(table, table.sorted_indices(mask)) == [2, 4]
+
+
+def test_permutations_are_cached_until_the_table_changes(sample_trades, make_trade):
+    table = TradeTable.from_journal(sample_trades)
+    keys = (("P&L", False),)
+    perm = table.sort_permutation(keys)
+    assert table.sort_permutation(keys) is perm
+    table.append_row(dict(journal_trade_fields(make_trade(price=-500.0)), ID=6))
+    resorted = table.sort_permutation(keys)
+    assert resorted is not perm
+    assert resorted[0] == 5
+    assert np.array_equal(np.sort(resorted), np.arange(6))
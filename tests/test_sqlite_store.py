@@ -0,0 +1,152 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from sqlite_store import SQLiteJournalStore, DERIVED_COLUMNS, DERIVED_VERSION
+from trade_table import TradeTable
+
+
+@pytest.fixture
+def db(tmp_path):
+    store = SQLiteJournalStore(str(tmp_path / "journal.db"))
+    yield store
+    store.close()
+
+
+def table_aggregates(trades, filters):
+    table = TradeTable.from_journal(trades)
+    return table.aggregates(table.mask(filters))
+
+
+def assert_same_aggregates(actual, expected):
+    assert set(actual) == set(expected)
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value), key
+
+
+def positions(db):
+    return [p for (p,) in db.conn.execute("SELECT position FROM trades ORDER BY position")]
+
+
+def test_round_trip_keeps_unknown_keys(db, sample_trades, make_trade):
+    odd = make_trade()
+    odd["info"]["broker_ticket"] = "12345"
+    odd["review"]["mood"] = "calm"
+    odd["partial_closes"] = [{"pips": 5.0, "pnl": 10.0, "reason_for_close": "Other", "lot": 0.1}]
+    db.replace_all(sample_trades + [odd])
+    assert db.read_trades() == sample_trades + [odd]
+    assert db.get_trade(5) == odd
+
+
+def test_positions_follow_journal_indices(db, sample_trades, make_trade):
+    trades = list(sample_trades)
+    db.replace_all(trades)
+    db.add(make_trade(setup="Added"))
+    trades.append(make_trade(setup="Added"))
+    db.add_many([make_trade(setup="Bulk1"), make_trade(setup="Bulk2")])
+    trades += [make_trade(setup="Bulk1"), make_trade(setup="Bulk2")]
+    db.delete(1)
+    del trades[1]
+    db.edit(2, make_trade(setup="Edited"))
+    trades[2] = make_trade(setup="Edited")
+    assert positions(db) == list(range(len(trades)))
+    assert db.read_trades() == trades
+    assert db.get_trade(len(trades) - 1)["info"]["setup"] == "Bulk2"
+    with pytest.raises(IndexError):
+        db.get_trade(len(trades))
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"Setup": "Reversal"},
+    {"Setup": "ANY", "Market Session": "London", "Reason for Close": "Stop Loss Hit"},
+    {"Stop Loss Size": "50"},
+    {"From Date": "2024-04-01", "To Date": "2024-05-10"},
+    {"Setup": "Nope"},
+])
+def test_aggregates_match_the_trade_table(db, sample_trades, filters):
+    db.replace_all(sample_trades)
+    assert_same_aggregates(db.aggregates(filters), table_aggregates(sample_trades, filters))
+
+
+def test_aggregates_follow_edits(db, sample_trades, make_trade):
+    trades = list(sample_trades)
+    db.replace_all(trades)
+    db.edit(0, make_trade(price=-30.0, outcome="Manual Close"))
+    trades[0] = make_trade(price=-30.0, outcome="Manual Close")
+    db.delete(2)
+    del trades[2]
+    assert_same_aggregates(db.aggregates({}), table_aggregates(trades, {}))
+
+
+def test_distinct_values(db, sample_trades):
+    db.replace_all(sample_trades)
+    assert db.distinct("Setup") == ["Breakout", "Reversal"]
+    assert db.distinct("Market Session") == ["London", "New York", "Tokyo"]
+
+
+def test_migrates_databases_without_derived_columns(tmp_path, sample_trades):
+    path = str(tmp_path / "old.db")
+    store = SQLiteJournalStore(path)
+    store.replace_all(sample_trades)
+    store.close()
+    # The earlier layout: no derived columns and 1-based positions with a gap.
+    conn = sqlite3.connect(path)
+    conn.execute("DROP INDEX idx_trades_trade_day")
+    for column in DERIVED_COLUMNS:
+        conn.execute(f"ALTER TABLE trades DROP COLUMN {column}")
+    conn.execute("UPDATE trades SET position = position * 2 + 1")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteJournalStore(path)
+    try:
+        assert positions(store) == list(range(len(sample_trades)))
+        assert store.read_trades() == sample_trades
+        assert_same_aggregates(store.aggregates({"Setup": "Reversal"}), table_aggregates(sample_trades, {"Setup": "Reversal"}))
+    finally:
+        store.close()
+
+
+def test_refills_derived_columns_written_by_older_math(tmp_path, sample_trades):
+    path = str(tmp_path / "old.db")
+    store = SQLiteJournalStore(path)
+    store.replace_all(sample_trades)
+    store.close()
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE trades SET rr = 99")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteJournalStore(path)
+    try:
+        assert store.conn.execute("PRAGMA user_version").fetchone()[0] == DERIVED_VERSION
+        assert_same_aggregates(store.aggregates({}), table_aggregates(sample_trades, {}))
+    finally:
+        store.close()
+
+
+def test_stats_trades_give_the_same_table(db, sample_trades):
+    db.replace_all(sample_trades)
+    expected = TradeTable.from_journal(sample_trades)
+    table = TradeTable.from_journal(db.stats_trades())
+    for field in ("P&L", "R:R", "Hold Time", "Stop Loss Size"):
+        assert np.allclose(table.columns[field], expected.columns[field])
+    assert [table.row(i)["Setup"] for i in range(len(table))] == [expected.row(i)["Setup"] for i in range(len(expected))]
+
+
+def test_playbook_options_and_json_round_trip(db, journal_file, tmp_path):
+    db.save_playbook_options("setups", ["Breakout", "Range"])
+    assert db.load_playbook_options("setups") == ["Breakout", "Range"]
+    db.import_json(journal_file)
+    out = str(tmp_path / "export.json")
+    db.export_json(out, str(tmp_path / "playbook"))
+    other = SQLiteJournalStore(str(tmp_path / "other.db"))
+    try:
+        other.import_json(out, str(tmp_path / "playbook"))
+        assert other.read_trades() == db.read_trades()
+        assert other.load_playbook_options("setups") == ["Breakout", "Range"]
+    finally:
+        other.close()
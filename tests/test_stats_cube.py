@@ -0,0 +1,68 @@
+import pytest
+
+from stats_cube import StatsCube
+from trade_table import TradeTable, journal_trade_fields
+
+FILTERS = [
+    {},
+    {"Setup": "Reversal"},
+    {"Setup": "Breakout", "Market Session": "London"},
+    {"Setup": "ANY", "Reason for Close": "Stop Loss Hit"},
+    {"Setup": "Nope"},
+]
+
+
+def assert_same(actual, expected):
+    assert set(actual) == set(expected)
+    for key, value in expected.items():
+        assert actual[key] == pytest.approx(value, abs=1e-9), key
+
+
+def table_query(trades, filters):
+    table = TradeTable.from_journal(trades)
+    return table.aggregates(table.mask(filters))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_query_matches_the_trade_table(sample_trades, filters):
+    cube = StatsCube.from_table(TradeTable.from_journal(sample_trades))
+    assert_same(cube.query(filters), table_query(sample_trades, filters))
+
+
+def test_deltas_match_a_rebuilt_cube(sample_trades, make_trade):
+    trades = list(sample_trades)
+    cube = StatsCube.from_table(TradeTable.from_journal(trades))
+
+    added = make_trade(setup="Range", price=75.0)
+    cube.add(journal_trade_fields(added))
+    trades.append(added)
+    edited = make_trade(setup="Reversal", outcome="Take Profit Hit", price=300.0)
+    cube.replace(journal_trade_fields(trades[1]), journal_trade_fields(edited))
+    trades[1] = edited
+    cube.remove(journal_trade_fields(trades[0]))
+    del trades[0]
+    more = [make_trade(setup="Pullback"), make_trade(setup="Range", price=-20.0, outcome="Stop Loss Hit")]
+    cube.merge(StatsCube.from_table(TradeTable.from_journal(more)))
+    trades += more
+
+    rebuilt = StatsCube.from_table(TradeTable.from_journal(trades))
+    for filters in FILTERS + [{"Setup": "Range"}, {"Setup": "Pullback"}]:
+        assert_same(cube.query(filters), rebuilt.query(filters))
+
+
+def test_breakdown_cells(sample_trades):
+    cube = StatsCube.from_table(TradeTable.from_journal(sample_trades))
+    rows, cols, cells = cube.breakdown("Setup", "Market Session", {})
+    assert rows == ["Breakout", "Reversal"]
+    assert cols == ["London", "New York", "Tokyo"]
+    assert cells[0][0]["total_trades"] == 1 and cells[0][1]["total_pnl"] == pytest.approx(250.0)
+    assert cells[1][0]["total_trades"] == 2 and cells[1][2]["total_trades"] == 0
+    rows, cols, _ = cube.breakdown("Setup", "Market Session", {"Market Session": "Tokyo"})
+    assert rows == ["Breakout"] and cols == ["Tokyo"]
+
+
+def test_dict_round_trip(sample_trades):
+    cube = StatsCube.from_table(TradeTable.from_journal(sample_trades))
+    copy = StatsCube.from_dict(cube.to_dict())
+    for filters in FILTERS:
+        assert_same(copy.query(filters), cube.query(filters))
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+
+import analytics
+from text_index import SearchIndex, tokenize, trade_text, index_path, journal_signature
+
+
+def matches(index, query):
+    found = index.search(query)
+    return None if found is None else np.flatnonzero(found).tolist()
+
+
+def test_tokenize_lowercases_and_splits_on_punctuation():
+    assert tokenize("Moved SL to B/E, re-entry!") == ["moved", "sl", "to", "b", "e", "re", "entry"]
+
+
+def test_trade_text_includes_notes_reasons_and_partial_closes(make_trade):
+    trade = make_trade(notes="Late entry", partial_closes=[{"reason_for_close": "News Event Approaching"}])
+    text = trade_text(trade)
+    for part in ("Late entry", "Breakout", "Structure", "News Event Approaching"):
+        assert part in text
+
+
+def test_query_syntax():
+    index = SearchIndex.build(["moved sl to be", "sl moved early", "news spike", "", "re-entry after news"])
+    assert matches(index, "moved sl") == [0, 1]
+    assert matches(index, '"moved sl"') == [0]
+    assert matches(index, "spike OR early") == [1, 2]
+    assert matches(index, "news AND spike") == [2]
+    assert matches(index, "mov*") == [0, 1]
+    assert matches(index, "re-ent*") == [4]
+    assert matches(index, "missing") == []
+    assert matches(index, "  ") is None
+
+
+def test_edits_and_deletes_match_a_rebuilt_index():
+    texts = ["moved sl", "news spike", "moved tp", "early exit", "news again"]
+    index = SearchIndex.build(texts)
+    index.delete(1)
+    del texts[1]
+    index.edit(0, "early news")
+    texts[0] = "early news"
+    index.add("moved sl late")
+    texts.append("moved sl late")
+    index.delete(0)
+    del texts[0]
+    rebuilt = SearchIndex.build(texts)
+    for query in ("moved", "news", "early", '"moved sl"', "n*", "exit OR late"):
+        assert matches(index, query) == matches(rebuilt, query)
+
+
+def test_delete_only_touches_the_deleted_documents_terms():
+    index = SearchIndex.build(["alpha beta", "gamma", "delta"])
+    gamma = index.postings[index.ids["gamma"]]
+    index.delete(0)
+    assert index.postings[index.ids["gamma"]] is gamma
+    assert matches(index, "gamma") == [0]
+    assert matches(index, "delta") == [1]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = SearchIndex.build(["moved sl", "news spike", "moved tp"])
+    index.delete(0)
+    path = str(tmp_path / "j.search.npz")
+    index.save(path, [["j.json", 1, 2]])
+    assert SearchIndex.load(path, [["j.json", 1, 3]]) is None
+    loaded = SearchIndex.load(path, [["j.json", 1, 2]])
+    assert len(loaded) == 2
+    assert matches(loaded, "moved") == [1]
+    assert matches(loaded, "news") == [0]
+
+
+def test_load_journal_reuses_the_saved_index(journal_file):
+    store = analytics.load_journal(journal_file, None, search=True)
+    assert matches(store.search, '"moved sl"') == [1, 4]
+    saved = SearchIndex.load(index_path(journal_file), journal_signature(journal_file, None))
+    assert saved is not None and len(saved) == len(store)
+
+
+def test_search_without_kept_trades(journal_file):
+    store = analytics.load_journal(journal_file, None, keep_trades=False, search=True)
+    assert store.trades is None
+    assert matches(store.search, "news") == [2]
+
+
+def test_cli_search_on_a_json_journal(journal_file, capsys):
+    # Regression: the stats command loads without trades, so the index must be
+    # built from the journal dicts.
+    assert analytics.main(["stats", journal_file, "--search", '"moved sl"']) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["summary"]["total_trades"] == 2
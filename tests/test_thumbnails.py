@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import profiling
+from thumbnails import ThumbnailCache, cache_key, decode_thumbnail, THUMB_SIZE
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    path = str(tmp_path / "shot.png")
+    Image.new("RGB", (1600, 900), "navy").save(path)
+    return path
+
+
+def test_cache_key_changes_with_the_file_and_size(screenshot):
+    key = cache_key(screenshot, THUMB_SIZE)
+    assert cache_key(screenshot, THUMB_SIZE) == key
+    assert cache_key(screenshot, (10, 10)) != key
+    st = os.stat(screenshot)
+    os.utime(screenshot, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache_key(screenshot, THUMB_SIZE) != key
+
+
+def test_decode_writes_and_then_reuses_the_disk_cache(screenshot, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    key = cache_key(screenshot, THUMB_SIZE)
+    profiling.reset()
+    profiling.enable()
+    try:
+        img = decode_thumbnail(screenshot, THUMB_SIZE, key, cache_dir)
+        assert img.size[0] <= THUMB_SIZE[0] and img.size[1] <= THUMB_SIZE[1]
+        assert os.path.exists(os.path.join(cache_dir, key + ".png"))
+        again = decode_thumbnail(screenshot, THUMB_SIZE, key, cache_dir)
+        assert again.size == img.size
+        counters = profiling.snapshot()["counters"]
+        assert counters["images_decoded"] == 1
+        assert counters["thumbnail_cache_hits"] == 1
+    finally:
+        profiling.enable(False)
+
+
+class FakeMaster:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+
+
+def test_missing_files_report_none_straight_away(tmp_path):
+    cache = ThumbnailCache(FakeMaster(), cache_dir=str(tmp_path / "cache"))
+    results = []
+    cache.request(str(tmp_path / "missing.png"), callback=results.append)
+    assert results == [None]
+    cache.shutdown()
+
+
+def test_shutdown_stops_the_decode_workers(tmp_path, screenshot):
+    cache = ThumbnailCache(FakeMaster(), cache_dir=str(tmp_path / "cache"))
+    cache.shutdown()
+    with pytest.raises(RuntimeError):
+        cache.request(screenshot)
@@ -0,0 +1,97 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytz
+
+from trade_metrics import _normalize_time, compute_metrics, metric_inputs, parse_datetimes, to_utc
+
+
+def metrics(trades):
+    inputs = [metric_inputs(t) for t in trades]
+    pnl = [t["review"]["price"] for t in trades]
+    rr, hold = compute_metrics(inputs, pnl)
+    return rr.tolist(), hold.tolist()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("09:30", "09:30"),
+    ("21:05:10", "21:05:10"),
+    ("09:30 PM", "21:30:00"),
+    ("9:30 AM", "09:30:00"),
+    ("12:05 AM", "00:05:00"),
+    ("11:59:30 PM", "23:59:30"),
+    (" 07:15 ", "07:15"),
+    ("later", "later"),
+])
+def test_normalize_time(value, expected):
+    assert _normalize_time(value) == expected
+
+
+@pytest.mark.filterwarnings("error")
+def test_parse_datetimes_mixes_iso_and_other_layouts():
+    parsed = parse_datetimes(["2024-03-04 10:00", "04/03/2024 10:00", "2024-03-04 09:30 PM", "", "junk"])
+    assert [str(v) for v in parsed[:3]] == ["2024-03-04T10:00", "2024-03-04T10:00", "2024-03-04T21:30"]
+    assert np.isnat(parsed[3]) and np.isnat(parsed[4])
+
+
+@pytest.mark.parametrize("zone, date, entry, exit_time, minutes", [
+    ("UTC", "2024-03-04", "10:00", "12:30", 150),
+    ("US/Eastern", "2024-03-09", "22:00", "2024-03-10 04:00", 300),  # clocks skip 02:00-03:00
+    ("Europe/London", "2024-10-27", "00:30", "2024-10-27 02:30", 180),  # 01:00-02:00 happens twice
+    ("Australia/Sydney", "2024-04-06", "12:00", "2024-04-07 12:00", 25 * 60),
+    ("UTC", "2024-03-04", "22:00", "01:30", 210),  # time-only exit rolls over to the next day
+    ("UTC", "2024-03-04", "09:30 PM", "11:00 PM", 90),
+    ("Not/AZone", "2024-03-04", "10:00", "11:00", 60),
+])
+def test_hold_time_across_time_zones(make_trade, zone, date, entry, exit_time, minutes):
+    _, hold = metrics([make_trade(timezone=zone, trade_date=date, trade_time=entry, exit_time=exit_time)])
+    assert hold == [minutes]
+
+
+def test_unknown_times_give_zero_hold(make_trade):
+    _, hold = metrics([make_trade(exit_time=""), make_trade(trade_time="", exit_time="")])
+    assert hold == [0, 0]
+
+
+def test_to_utc_matches_pytz_trade_by_trade():
+    rng = random.Random(7)
+    zones = ["US/Eastern", "Europe/London", "Asia/Tokyo", "Australia/Sydney", "UTC"]
+    naive = [datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(366 * 1440)) for _ in range(2000)]
+    names = [rng.choice(zones) for _ in naive]
+    local = np.array(naive, dtype="datetime64[m]")
+    expected = [
+        pytz.timezone(z).localize(d, is_dst=False).astimezone(pytz.utc).replace(tzinfo=None) for d, z in zip(naive, names)
+    ]
+    # Times inside a spring-forward gap do not exist; pytz and the hourly table
+    # may place them an hour apart, so they are left out.
+    keep = [
+        i for i, (d, z) in enumerate(zip(naive, names))
+        if pytz.timezone(z).localize(d, is_dst=False).utcoffset() == pytz.timezone(z).localize(d, is_dst=True).utcoffset()
+    ]
+    actual = to_utc(local, names)
+    assert [actual[i] for i in keep] == [np.datetime64(expected[i], "m") for i in keep]
+
+
+def test_rr_from_pnl_and_from_partial_closes(make_trade):
+    rr, _ = metrics([
+        make_trade(price=100.0, sl_pips=50.0, lot_size=0.2),
+        make_trade(price=-100.0, sl_pips=50.0, lot_size=0.2),
+        make_trade(price=0.0, sl_pips=50.0, partial_closes=[{"pips": 30.0, "pnl": 60.0}, {"pips": 45.0, "pnl": 90.0}]),
+        make_trade(price=80.0, sl_pips=40.0, lot_size=0.2, partial_closes=[{"pips": 0.0, "pnl": 80.0}]),
+        make_trade(price=100.0, sl_pips=0.0),
+    ])
+    assert rr == pytest.approx([1.0, -1.0, 1.5, 1.0, 0.0])
+
+
+def test_rr_weights_partial_closes_by_the_lot_they_closed(make_trade):
+    closes = [{"pips": 40.0, "lot": 0.25, "pnl": 0.0}, {"pips": 20.0, "lot": 0.75, "pnl": 0.0}]
+    rr, _ = metrics([
+        make_trade(price=0.0, sl_pips=20.0, lot_size=1.0, partial_closes=closes),
+        make_trade(price=250.0, sl_pips=20.0, lot_size=1.0, partial_closes=closes),
+        make_trade(price=0.0, sl_pips=20.0, lot_size=1.0,
+                   partial_closes=[{"pips": 20.0, "pnl": 100.0}, {"pips": 40.0, "pnl": 200.0}]),
+        make_trade(price=0.0, sl_pips=20.0, lot_size=1.0, partial_closes=[{"pips": 20.0}, {"pips": 40.0}]),
+    ])
+    assert rr == pytest.approx([1.25, 1.25, 1.5, 1.5])
@@ -0,0 +1,77 @@
+import copy
+import sys
+
+import pytest
+
+from trade_model import Screenshots, Trade, TradeInfo, TradeReview, migrate_partial_closes
+
+
+def test_round_trip_is_unchanged(sample_trades):
+    for d in sample_trades:
+        assert Trade.from_dict(copy.deepcopy(d)).to_dict() == d
+
+
+def test_unknown_keys_survive_the_round_trip(make_trade):
+    d = make_trade()
+    d["info"]["broker_ticket"] = "12345"
+    d["review"]["mood"] = "calm"
+    d["tf_screenshots"]["M15"] = {"before": "m15.png", "after": None}
+    d["tf_screenshots"]["H1"] = {"before": "h1.png", "after": None, "annotated": "h1-notes.png"}
+    assert Trade.from_dict(copy.deepcopy(d)).to_dict() == d
+
+
+def test_missing_review_gets_the_defaults():
+    trade = Trade.from_dict({"symbol": "XAUUSD", "timeframe": "1h", "info": {"setup": "Breakout"}})
+    assert trade.review.to_dict() == {"outcome": "", "price": "", "notes": "", "exit_time": "", "max_drawdown_pips": ""}
+    assert trade.partial_closes == [] and trade.sl_to_be is False
+    assert all(trade.tf_screenshots[tf]["before"] is None for tf in ("D1", "H4", "H1"))
+
+
+def test_repeated_strings_are_interned(make_trade):
+    # Build the strings at runtime so they start out as distinct objects.
+    a = Trade.from_dict(make_trade(setup="".join(["Break", "out"]), session="".join(["Lon", "don"])))
+    b = Trade.from_dict(make_trade(setup="".join(["Break", "out"]), session="".join(["Lon", "don"])))
+    assert a.info["setup"] is b.info["setup"]
+    assert a.info["market_session"] is b.info["market_session"]
+    assert a.review["outcome"] is b.review["outcome"]
+    a.info["setup"] = "".join(["Re", "versal"])
+    assert a.info["setup"] is sys.intern("Reversal")
+
+
+def test_records_behave_like_dicts():
+    info = TradeInfo({"setup": "Breakout", "lot_size": 0.2})
+    info["custom"] = 1
+    assert dict(info) == {"setup": "Breakout", "lot_size": 0.2, "custom": 1}
+    assert "setup" in info and "symbol" not in info and info.get("symbol", "-") == "-"
+    del info["setup"], info["custom"]
+    assert info.to_dict() == {"lot_size": 0.2}
+    with pytest.raises(KeyError):
+        info["setup"]
+    with pytest.raises(KeyError):
+        del info["custom"]
+    review = TradeReview({"outcome": "Break Even"})
+    assert review.copy() == review and review.copy() is not review
+
+
+def test_screenshot_paths_share_the_empty_tuple(make_trade):
+    a = Trade.from_dict(make_trade()).tf_screenshots
+    b = Trade.from_dict(make_trade()).tf_screenshots
+    assert a._paths is b._paths
+    a["H4"]["after"] = "h4.png"
+    assert a.path("H4", "after") == "h4.png" and b.path("H4", "after") is None
+    a["H4"]["after"] = None
+    assert a._paths is b._paths
+    assert Screenshots({"D1": {"before": "d1.png"}}).to_dict()["D1"] == {"before": "d1.png", "after": None}
+
+
+def test_migrate_partial_closes_fills_in_old_layouts():
+    closes = migrate_partial_closes([
+        {"pnl": 20.0, "notes": "Reached Partial TP 1"},
+        {"pips": 10.0, "notes": None},
+        {"pips": 5.0, "pnl": 8.0, "reason_for_close": "Other", "notes": "kept"},
+    ])
+    assert closes == [
+        {"pnl": 20.0, "pips": 0.0, "reason_for_close": "Reached Partial TP 1"},
+        {"pips": 10.0, "reason_for_close": "", "pnl": 0.0},
+        {"pips": 5.0, "pnl": 8.0, "reason_for_close": "Other", "notes": "kept"},
+    ]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from trade_table import TradeTable, journal_trade_fields, parse_day
+
+
+def test_from_journal_columns(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    assert len(table) == 5
+    assert table.columns["ID"].tolist() == [1, 2, 3, 4, 5]
+    assert table.columns["P&L"].tolist() == [100.0, -100.0, 250.0, 0.0, -50.0]
+    assert table.columns["Win"].tolist() == [True, False, True, False, False]
+    assert table.columns["R:R"][0] == pytest.approx(1.0)  # 100 / (50 pips * 0.2 lots * $10)
+    assert table.columns["Hold Time"][0] == pytest.approx(150)
+    assert str(table.columns["Trade Date"][2]) == "2024-04-01"
+    assert table.categories["Setup"] == ["Breakout", "Reversal"]
+
+
+def test_row_round_trips_through_from_rows(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    rows = [table.row(i) for i in range(len(table))]
+    rebuilt = TradeTable.from_rows(rows)
+    assert [rebuilt.row(i) for i in range(len(rebuilt))] == rows
+
+
+def test_mask_filters(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    assert table.mask({"Setup": "Reversal"}).tolist() == [False, True, False, True, False]
+    assert table.mask({"Setup": "ANY", "Market Session": "Tokyo"}).tolist() == [False] * 4 + [True]
+    assert not table.mask({"Setup": "Unknown"}).any()
+    assert table.mask({"Stop Loss Size": "50"}).tolist() == [True, True, False, True, True]
+    assert table.mask({"Stop Loss Size": ""}).all()
+    assert table.mask({"From Date": "2024-04-01", "To Date": "2024-05-10"}).tolist() == [False, False, True, True, False]
+    assert table.mask({"From Date": "not a date"}).all()
+
+
+def test_aggregates(sample_trades):
+    table = TradeTable.from_journal(sample_trades)
+    agg = table.aggregates()
+    assert agg["total_trades"] == 5
+    assert agg["wins"] == 2 and agg["losses"] == 3
+    assert agg["win_rate"] == pytest.approx(40.0)
+    assert agg["total_pnl"] == pytest.approx(200.0)
+    assert agg["pnl_std"] == pytest.approx(np.std([100.0, -100.0, 250.0, 0.0, -50.0]))
+    empty = table.aggregates(np.zeros(len(table), dtype=bool))
+    assert empty["total_trades"] == 0 and empty["win_rate"] == 0.0
+
+
+def test_row_edits_keep_ids_in_journal_order(sample_trades, make_trade):
+    table = TradeTable.from_journal(sample_trades)
+    table.append_row(dict(journal_trade_fields(make_trade(setup="Range")), ID=6))
+    assert table.row(5)["Setup"] == "Range"
+    table.set_row(0, dict(journal_trade_fields(make_trade(price=-20.0, outcome="Manual Close")), ID=1))
+    assert table.row(0)["P&L"] == -20.0 and not table.row(0)["Win"]
+    table.delete_row(1)
+    assert table.columns["ID"].tolist() == [1, 2, 3, 4, 5]
+    assert table.row(1)["Market Session"] == "New York"
+
+
+def test_extend_and_concat_remap_category_codes(sample_trades):
+    first = TradeTable.from_journal(sample_trades[:2])
+    second = TradeTable.from_journal(sample_trades[2:])
+    whole = TradeTable.concat([first, second])
+    first.extend(second)
+    expected = TradeTable.from_journal(sample_trades)
+    for table in (whole, first):
+        assert [table.row(i) for i in range(len(table))] == [expected.row(i) for i in range(len(expected))]
+
+
+def test_parse_day_accepts_journal_layouts():
+    assert str(parse_day("2024-03-04")) == "2024-03-04"
+    assert str(parse_day("04/03/2024")) == "2024-03-04"
+    assert np.isnat(parse_day(""))
@@ -0,0 +1,55 @@
+import profiling
+from virtual_table import VirtualTreeview
+
+
+def make_view(root, rendered):
+    def values_for(pos):
+        rendered.append(pos)
+        return (pos, f"row {pos}")
+    view = VirtualTreeview(root, ("ID", "Name"), values_for, buffer=2, show="headings")
+    view.visible_count = 10
+    return view
+
+
+def test_only_the_visible_window_exists(tk_root):
+    rendered = []
+    view = make_view(tk_root, rendered)
+    view.set_rows(list(range(1000)))
+    assert view.tree.get_children() == tuple(str(i) for i in range(12))
+    assert sorted(rendered) == list(range(12))
+
+
+def test_scrolling_reuses_items_already_in_view(tk_root):
+    rendered = []
+    view = make_view(tk_root, rendered)
+    view.set_rows(list(range(1000)))
+    rendered.clear()
+    view.scroll_to(5)
+    assert view.tree.get_children() == tuple(str(i) for i in range(5, 17))
+    assert sorted(rendered) == list(range(12, 17))
+    view.scroll_to(10 ** 6)
+    assert view.first == 990
+    assert view.tree.get_children()[-1] == "999"
+
+
+def test_new_row_lists_are_applied_as_a_diff(tk_root):
+    rendered = []
+    view = make_view(tk_root, rendered)
+    view.set_rows(list(range(100)))
+    rendered.clear()
+    view.set_rows([3, 1, 0, 2, 50])
+    assert view.tree.get_children() == ("3", "1", "0", "2", "50")
+    assert rendered == [50]
+    view.set_rows([])
+    assert view.tree.get_children() == ()
+
+
+def test_render_is_profiled(tk_root):
+    profiling.reset()
+    profiling.enable()
+    try:
+        view = make_view(tk_root, [])
+        view.set_rows(list(range(30)))
+        assert profiling.snapshot()["counters"]["rows_rendered"] >= 12
+    finally:
+        profiling.enable(False)
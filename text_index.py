@@ -0,0 +1,318 @@
+import json
+import os
+import re
+from bisect import bisect_left
+from itertools import chain
+
+import numpy as np
+
+from journal_log import LOG_SUFFIX
+from sqlite_store import JOURNAL_DB_FILE
+from partitions import partition_dir
+
+TRADES_FILE = "trades_journal.json"
+INDEX_SUFFIX = ".search.npz"
+INDEX_VERSION = 1
+TOKEN_RE = re.compile(r"[^\W_]+")
+QUERY_RE = re.compile(r'"([^"]*)"?|(\S+)')
+TEXT_INFO_FIELDS = ("setup", "entry", "sl_reason", "tp_reason")
+
+
+# --- Trade Text ---
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def trade_text(trade):
+    # Notes, partial-close reasons and the playbook picks; works on journal
+    # dicts and Trade objects alike.
+    if isinstance(trade, dict):
+        info, review, closes = trade.get("info") or {}, trade.get("review") or {}, trade.get("partial_closes") or []
+    else:
+        info, review, closes = trade.info, trade.review, trade.partial_closes
+    parts = [review.get("notes")] + [info.get(field) for field in TEXT_INFO_FIELDS]
+    parts += [pc.get("reason_for_close") or pc.get("notes") for pc in closes]
+    return " ".join(str(part) for part in parts if part)
+
+
+def store_texts(store, journal_trades=None):
+    # journal_trades: the dicts a store without trades or a backend was read from.
+    if store.trades is not None:
+        return [trade_text(t) for t in store.trades]
+    if journal_trades is None:
+        journal_trades = store.backend.read_trades()
+    return [trade_text(d) for d in journal_trades]
+
+
+# --- Sidecar Files ---
+def index_path(trades_file=TRADES_FILE):
+    return os.path.splitext(trades_file)[0] + INDEX_SUFFIX
+
+
+def journal_signature(trades_file=TRADES_FILE, db_file=JOURNAL_DB_FILE):
+    # mtime/size of whichever files open_journal_store would read; a saved index
+    # is only trusted while they are unchanged.
+    if db_file and os.path.exists(db_file):
+        paths = [db_file, db_file + "-wal"]
+    elif os.path.isdir(partition_dir(trades_file)):
+        directory = partition_dir(trades_file)
+        paths = [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+    else:
+        paths = [trades_file, trades_file + LOG_SUFFIX]
+    signature = []
+    for path in paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            signature.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+    return signature
+
+
+def _pack(arrays):
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(a) for a in arrays])
+    flat = np.concatenate(arrays).astype(np.int32) if arrays else np.zeros(0, dtype=np.int32)
+    return flat, offsets
+
+
+def _text_array(text):
+    return np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+
+
+def _array_text(array):
+    return array.tobytes().decode("utf-8")
+
+
+# --- Inverted Index ---
+# One sorted int32 array of document ids per token, plus each trade's token
+# sequence for phrase checks. Queries combine boolean masks, so AND/OR/prefix
+# terms cost O(trades) numpy work rather than a scan of the text.
+# Ids are handed out in table order and never reused, so a delete only edits
+# the postings of the deleted trade's own tokens; ids map back to table
+# positions through doc_ids when a query runs.
+class SearchIndex:
+    def __init__(self):
+        self.vocab = []
+        self.ids = {}
+        self.postings = []
+        self.docs = []
+        self.doc_ids = []  # table position -> document id
+        self.next_id = 0
+        self._pending = 0  # docs appended since the postings were last extended
+        self._sorted_vocab = None
+        self._positions = None  # document id -> table position, rebuilt after edits
+
+    @classmethod
+    def build(cls, texts):
+        index = cls()
+        for text in texts:
+            index.docs.append(index._token_ids(tokenize(text)))
+        index._pending = len(index.docs)
+        index._flush()
+        return index
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _token_ids(self, tokens):
+        ids = self.ids
+        for token in tokens:
+            if token not in ids:
+                ids[token] = len(self.vocab)
+                self.vocab.append(token)
+                self.postings.append(np.zeros(0, dtype=np.int32))
+                self._sorted_vocab = None
+        return tuple(map(ids.__getitem__, tokens))
+
+    def _flush(self):
+        # Appended docs sit at the end of the table, so their positions go on
+        # the end of each posting array.
+        if not self._pending:
+            return
+        docs = self.docs[len(self.docs) - self._pending:]
+        first = self.next_id
+        self.next_id += len(docs)
+        self.doc_ids.extend(range(first, self.next_id))
+        self._pending = 0
+        self._positions = None
+        lengths = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+        if not lengths.sum():
+            return
+        tokens = np.fromiter(chain.from_iterable(docs), dtype=np.int64, count=int(lengths.sum()))
+        doc_ids = np.repeat(np.arange(first, self.next_id, dtype=np.int64), lengths)
+        keys = np.sort(tokens * self.next_id + doc_ids)
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]  # one entry per (token, trade)
+        tokens, doc_ids = np.divmod(keys, self.next_id)
+        bounds = np.flatnonzero(np.diff(tokens)) + 1
+        for group in np.split(np.arange(len(tokens)), bounds):
+            token = int(tokens[group[0]])
+            added = doc_ids[group].astype(np.int32)
+            self.postings[token] = np.concatenate((self.postings[token], added)) if len(self.postings[token]) else added
+
+    # --- Updates ---
+    def add(self, text):
+        self.docs.append(self._token_ids(tokenize(text)))
+        self._pending += 1
+
+    def edit(self, pos, text):
+        self._flush()
+        doc = self._token_ids(tokenize(text))
+        doc_id = self.doc_ids[pos]
+        old, new = set(self.docs[pos]), set(doc)
+        for token in old - new:
+            arr = self.postings[token]
+            self.postings[token] = np.delete(arr, np.searchsorted(arr, doc_id))
+        for token in new - old:
+            arr = self.postings[token]
+            self.postings[token] = np.insert(arr, np.searchsorted(arr, doc_id), doc_id)
+        self.docs[pos] = doc
+
+    def delete(self, pos):
+        self._flush()
+        doc_id = self.doc_ids[pos]
+        for token in set(self.docs[pos]):
+            arr = self.postings[token]
+            self.postings[token] = np.delete(arr, np.searchsorted(arr, doc_id))
+        del self.docs[pos]
+        del self.doc_ids[pos]
+        self._positions = None
+
+    def attach(self, store):
+        # Follows the store's saved journal: every add/edit/delete there
+        # re-tokenizes just that trade, from the dict the store passes along.
+        store.search = self
+        store.subscribe(self.on_store_changed)
+
+    def on_store_changed(self, kind, idx, trade_dict):
+        if kind == "delete":
+            self.delete(idx)
+        elif kind == "add":
+            self.add(trade_text(trade_dict))
+        else:
+            self.edit(idx, trade_text(trade_dict))
+
+    # --- Queries ---
+    def positions(self):
+        if self._positions is None:
+            self._positions = np.full(self.next_id, -1, dtype=np.int64)
+            self._positions[self.doc_ids] = np.arange(len(self.doc_ids))
+        return self._positions
+
+    def _term_mask(self, token, prefix=False):
+        mask = np.zeros(len(self.docs), dtype=bool)
+        if not prefix:
+            token_id = self.ids.get(token)
+            if token_id is not None:
+                mask[self.positions()[self.postings[token_id]]] = True
+            return mask
+        if self._sorted_vocab is None:
+            self._sorted_vocab = sorted(self.vocab)
+        vocab = self._sorted_vocab
+        matches = []
+        for i in range(bisect_left(vocab, token), len(vocab)):
+            if not vocab[i].startswith(token):
+                break
+            matches.append(self.postings[self.ids[vocab[i]]])
+        if matches:
+            mask[self.positions()[np.concatenate(matches)]] = True
+        return mask
+
+    def _phrase_mask(self, tokens):
+        mask = np.ones(len(self.docs), dtype=bool)
+        for token in tokens:
+            mask &= self._term_mask(token)
+        if len(tokens) < 2 or not mask.any():
+            return mask
+        phrase = tuple(self.ids[token] for token in tokens)
+        width = len(phrase)
+        for pos in np.flatnonzero(mask):
+            doc = self.docs[pos]
+            mask[pos] = any(doc[i:i + width] == phrase for i in range(len(doc) - width + 1) if doc[i] == phrase[0])
+        return mask
+
+    def search(self, query):
+        # Space-separated terms must all match; OR separates alternatives;
+        # "quoted words" match as a phrase; a trailing * matches any word
+        # starting with the term. Returns None for an empty query.
+        self._flush()
+        groups = [[]]
+        for phrase, word in QUERY_RE.findall(query):
+            if word == "OR":
+                groups.append([])
+            elif word == "AND":
+                continue
+            elif phrase or not word.endswith("*"):
+                tokens = tokenize(phrase or word)
+                if tokens:
+                    groups[-1].append(self._phrase_mask(tokens))
+            else:
+                tokens = tokenize(word)
+                if tokens:
+                    # Only the last word of a term like "re-entry*" is a prefix.
+                    mask = self._phrase_mask(tokens[:-1]) if len(tokens) > 1 else np.ones(len(self.docs), dtype=bool)
+                    groups[-1].append(mask & self._term_mask(tokens[-1], prefix=True))
+        groups = [group for group in groups if group]
+        if not groups:
+            return None
+        result = np.zeros(len(self.docs), dtype=bool)
+        for group in groups:
+            result |= np.logical_and.reduce(group)
+        return result
+
+    # --- Persistence ---
+    def save(self, path, signature):
+        # Saved by table position, so a loaded index starts with ids == positions.
+        self._flush()
+        positions = self.positions()
+        postings, posting_offsets = _pack([positions[arr] for arr in self.postings])
+        docs, doc_offsets = _pack([np.asarray(d, dtype=np.int32) for d in self.docs])
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                meta=_text_array(json.dumps({"version": INDEX_VERSION, "signature": signature})),
+                vocab=_text_array("\n".join(self.vocab)),
+                postings=postings, posting_offsets=posting_offsets,
+                docs=docs, doc_offsets=doc_offsets,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, signature=None):
+        # None when the file is missing, unreadable or written for other journal files.
+        try:
+            with np.load(path) as data:
+                meta = json.loads(_array_text(data["meta"]))
+                if meta.get("version") != INDEX_VERSION or (signature is not None and meta.get("signature") != signature):
+                    return None
+                vocab = _array_text(data["vocab"])
+                postings, posting_offsets = data["postings"], data["posting_offsets"]
+                docs, doc_offsets = data["docs"], data["doc_offsets"]
+        except (OSError, ValueError, KeyError):
+            return None
+        index = cls()
+        index.vocab = vocab.split("\n") if vocab else []
+        index.ids = {token: i for i, token in enumerate(index.vocab)}
+        index.postings = np.split(postings, posting_offsets[1:-1]) if index.vocab else []
+        index.docs = [tuple(doc.tolist()) for doc in np.split(docs, doc_offsets[1:-1])] if len(doc_offsets) > 1 else []
+        index.doc_ids = list(range(len(index.docs)))
+        index.next_id = len(index.docs)
+        return index
+
+
+def open_search_index(store, trades_file=TRADES_FILE, signature=None, journal_trades=None):
+    # Reuses the sidecar index while the journal files still match `signature`
+    # (taken before the journal was read); otherwise rebuilds and saves it.
+    # A store holding only part of a partitioned journal gets an unsaved index.
+    covers = getattr(store.backend, "covers", None)
+    partial = covers is not None and not covers()
+    path = index_path(trades_file) if signature is not None and not partial else None
+    index = SearchIndex.load(path, signature) if path and os.path.exists(path) else None
+    if index is None or len(index) != len(store):
+        index = SearchIndex.build(store_texts(store, journal_trades))
+        if path:
+            try:
+                index.save(path, signature)
+            except OSError:
+                pass  # search still works; it is rebuilt next start
+    index.attach(store)
+    return index
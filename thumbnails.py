@@ -0,0 +1,113 @@
+import hashlib
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageTk
+
+import profiling
+
+THUMB_CACHE_DIR = ".thumb_cache"
+THUMB_SIZE = (120, 75)
+PREVIEW_SIZE = (580, 340)
+MAX_PHOTOS = 256
+POLL_MS = 30
+
+
+def cache_key(path, size):
+    st = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{size[0]}x{size[1]}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def decode_thumbnail(path, size, key, cache_dir=THUMB_CACHE_DIR):
+    cached = os.path.join(cache_dir, key + ".png")
+    if os.path.exists(cached):
+        img = Image.open(cached)
+        img.load()
+        profiling.count("thumbnail_cache_hits")
+        return img
+    with profiling.span("image.decode"):
+        img = Image.open(path)
+        img.draft("RGB", (size[0] * 2, size[1] * 2))  # JPEG: decode at reduced scale
+        img.thumbnail(size)
+    profiling.count("images_decoded")
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cached}.{os.getpid()}.tmp"
+    img.save(tmp_path, format="PNG")
+    os.replace(tmp_path, cached)
+    return img
+
+
+# --- Thumbnail Cache ---
+# Decoding happens on a worker pool; PhotoImage objects are only created on the
+# Tk thread, when _poll drains finished results.
+class ThumbnailCache:
+    def __init__(self, master, cache_dir=THUMB_CACHE_DIR, max_photos=MAX_PHOTOS, workers=4):
+        self.master = master
+        self.cache_dir = cache_dir
+        self.max_photos = max_photos
+        self._photos = OrderedDict()
+        self._pending = {}
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._polling = False
+
+    def request(self, path, size=THUMB_SIZE, callback=None):
+        try:
+            key = cache_key(path, size)
+        except OSError:
+            if callback:
+                callback(None)
+            return
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            if callback:
+                callback(photo)
+            return
+        callbacks = self._pending.get(key)
+        if callbacks is None:
+            callbacks = self._pending[key] = []
+            self._executor.submit(self._decode, path, size, key)
+        if callback:
+            callbacks.append(callback)
+        if not self._polling:
+            self._polling = True
+            self.master.after(POLL_MS, self._poll)
+
+    def request_preview(self, path, callback):
+        self.request(path, PREVIEW_SIZE, callback)
+
+    def prefetch(self, paths, size=THUMB_SIZE):
+        for path in paths:
+            if path and os.path.exists(path):
+                self.request(path, size)
+
+    def _decode(self, path, size, key):
+        try:
+            self._results.put((key, decode_thumbnail(path, size, key, self.cache_dir)))
+        except Exception:
+            self._results.put((key, None))
+
+    def _poll(self):
+        while True:
+            try:
+                key, img = self._results.get_nowait()
+            except queue.Empty:
+                break
+            photo = ImageTk.PhotoImage(img) if img is not None else None
+            if photo is not None:
+                self._photos[key] = photo
+                while len(self._photos) > self.max_photos:
+                    self._photos.popitem(last=False)
+            for callback in self._pending.pop(key, []):
+                callback(photo)
+        if self._pending:
+            self.master.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
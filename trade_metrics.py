@@ -0,0 +1,195 @@
+import re
+import warnings
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pytz
+
+from constants import USD_PER_PIP_PER_LOT
+
+DATETIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d %I:%M %p", "%d/%m/%Y %H:%M", "%m/%d/%Y %H:%M",
+    "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y",
+]
+TIME_FORMATS = ["%H:%M:%S", "%H:%M", "%I:%M %p", "%I:%M:%S %p"]
+CLOCK_TIME_RE = re.compile(r"\d\d:\d\d(:\d\d)?")
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_float(value, default=0.0):
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def metric_inputs(t):
+    info = t.get("info", {})
+    review = t.get("review", {})
+    lot_size = to_float(info.get("lot_size"))
+    partial_closes = t.get("partial_closes") or []
+    pc_pnl = 0.0
+    for pc in partial_closes:
+        # A close's own P&L, else its pips on the lot it closed (an equal share
+        # of the position when the close does not record its lot).
+        pnl = to_float(pc.get("pnl"))
+        if not pnl:
+            lot = to_float(pc.get("lot"), lot_size / len(partial_closes))
+            pnl = to_float(pc.get("pips")) * lot * USD_PER_PIP_PER_LOT
+        pc_pnl += pnl
+    return (
+        str(info.get("trade_date") or ""),
+        str(info.get("trade_time") or ""),
+        str(info.get("timezone") or "UTC"),
+        str(review.get("exit_time") or ""),
+        to_float(info.get("sl_pips")),
+        lot_size,
+        pc_pnl,
+    )
+
+
+# --- Timestamp Parsing ---
+def _parse_one(value):
+    value = value.strip()
+    for fmt in DATETIME_FORMATS:
+        try:
+            return np.datetime64(datetime.strptime(value, fmt), "m")
+        except ValueError:
+            pass
+    return np.datetime64("NaT", "m")
+
+
+def parse_datetimes(values):
+    # numpy parses ISO strings in bulk; only a batch containing other layouts
+    # falls back to strptime, and then only for the values numpy rejects.
+    # numpy reads a trailing "PM" as a time zone and warns before rejecting it.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            return np.array(values, dtype="datetime64[m]")
+        except ValueError:
+            out = np.empty(len(values), dtype="datetime64[m]")
+            for i, value in enumerate(values):
+                try:
+                    out[i] = np.datetime64(value, "m") if value else np.datetime64("NaT", "m")
+                except ValueError:
+                    out[i] = _parse_one(value)
+            return out
+
+
+def _normalize_time(value):
+    value = value.strip()
+    if CLOCK_TIME_RE.fullmatch(value):
+        return value  # already 24-hour; "09:30 PM" and the like go through strptime
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%H:%M:%S")
+        except ValueError:
+            pass
+    return value
+
+
+def _is_time_only(value):
+    return bool(value) and "-" not in value and "/" not in value
+
+
+# --- Time Zones ---
+@lru_cache(maxsize=None)
+def _zone(name):
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        return pytz.utc
+
+
+def _offset_minutes(tz, naive):
+    return int(tz.localize(naive, is_dst=False).utcoffset().total_seconds() // 60)
+
+
+def _month_start(month):
+    year, month = divmod(month, 12)
+    return datetime(1970 + year, month + 1, 1)
+
+
+@lru_cache(maxsize=None)
+def month_offset(zone_name, month):
+    # Offset shared by a whole month, or None if a DST change falls inside it.
+    tz = _zone(zone_name)
+    first = _offset_minutes(tz, _month_start(month))
+    return first if first == _offset_minutes(tz, _month_start(month + 1)) else None
+
+
+@lru_cache(maxsize=None)
+def day_offsets(zone_name, day):
+    # Offset for each local hour of a day inside a DST-change month.
+    tz = _zone(zone_name)
+    start = EPOCH + timedelta(days=day)
+    first, last = _offset_minutes(tz, start), _offset_minutes(tz, start + timedelta(hours=23))
+    if first == last:
+        return (first,) * 24
+    return tuple(_offset_minutes(tz, start + timedelta(hours=h)) for h in range(24))
+
+
+def to_utc(local, zones):
+    utc = local.copy()
+    valid = ~np.isnat(local)
+    zones = np.asarray(zones, dtype=object)
+    for zone_name in set(zones[valid].tolist()):
+        sel = np.flatnonzero(valid & (zones == zone_name))
+        minutes = local[sel].astype(np.int64)
+        months = local[sel].astype("datetime64[M]").astype(np.int64)
+        unique_months, inverse = np.unique(months, return_inverse=True)
+        uniform = np.array([month_offset(zone_name, int(m)) for m in unique_months], dtype=np.float64)
+        offsets = uniform[inverse.ravel()]
+        mixed = np.isnan(offsets)
+        if mixed.any():
+            days = minutes[mixed] // 1440
+            hours = (minutes[mixed] % 1440) // 60
+            unique_days, day_inverse = np.unique(days, return_inverse=True)
+            table = np.array([day_offsets(zone_name, int(d)) for d in unique_days], dtype=np.float64)
+            offsets[mixed] = table[day_inverse.ravel(), hours]
+        utc[sel] = (minutes - offsets.astype(np.int64)).astype("datetime64[m]")
+    return utc
+
+
+# --- Metrics ---
+def compute_metrics(inputs, pnl):
+    n = len(inputs)
+    if not n:
+        return np.zeros(0), np.zeros(0)
+    dates, times, zones, exits, sl_pips, lot_size, pc_pnl = zip(*inputs)
+    sl_pips = np.array(sl_pips, dtype=np.float64)
+    lot_size = np.array(lot_size, dtype=np.float64)
+    pc_pnl = np.array(pc_pnl, dtype=np.float64)
+    pnl = np.asarray(pnl, dtype=np.float64)
+
+    entry = parse_datetimes([f"{d} {_normalize_time(t)}" if d and t else d for d, t in zip(dates, times)])
+    exit_values = [
+        f"{d} {_normalize_time(x)}" if _is_time_only(x) and d else x
+        for d, x in zip(dates, exits)
+    ]
+    exit_ = parse_datetimes(exit_values)
+    time_only = np.array([_is_time_only(x) for x in exits], dtype=bool)
+    # A time-only exit earlier than the entry closed on the following day.
+    rolled = time_only & ~np.isnat(exit_) & ~np.isnat(entry) & (exit_ < entry)
+    exit_[rolled] += np.timedelta64(1, "D")
+
+    entry_utc = to_utc(entry, zones)
+    exit_utc = to_utc(exit_, zones)
+    known = ~np.isnat(entry_utc) & ~np.isnat(exit_utc)
+    hold = np.zeros(n)
+    hold[known] = (exit_utc[known] - entry_utc[known]).astype(np.int64)
+    hold = np.clip(hold, 0, None)
+
+    # R is realized P&L over the dollars at risk, which weights every partial
+    # close by the lot it closed. The trade's own P&L wins; the partial closes
+    # only stand in when it was left blank.
+    risk_usd = sl_pips * lot_size * USD_PER_PIP_PER_LOT
+    realized_pnl = np.where(pnl != 0, pnl, pc_pnl)
+    rr = np.zeros(n)
+    at_risk = risk_usd > 0
+    rr[at_risk] = realized_pnl[at_risk] / risk_usd[at_risk]
+    return rr, hold
@@ -0,0 +1,296 @@
+import sys
+from collections.abc import MutableMapping
+
+# Journal schema, shared by the in-memory model and the SQLite store.
+TIMEFRAMES = ["D1", "H4", "H1"]
+MOMENTS = ["before", "after"]
+INFO_COLUMNS = [
+    "symbol", "timeframe", "trade_type", "setup", "entry", "market_session", "timezone",
+    "trade_date", "trade_time", "entry_price", "lot_size", "sl_pips", "sl_price",
+    "tp_pips", "tp_price", "sl_reason", "tp_reason", "account_balance",
+]
+REVIEW_COLUMNS = ["outcome", "price", "notes", "exit_time", "max_drawdown_pips"]
+PARTIAL_CLOSE_COLUMNS = ["pips", "pnl", "reason_for_close"]
+
+# Journals repeat a handful of setup/session/reason strings across every trade;
+# interning makes each distinct value a single shared object.
+INTERNED_INFO = frozenset([
+    "symbol", "timeframe", "trade_type", "setup", "entry", "market_session",
+    "timezone", "trade_date", "sl_reason", "tp_reason",
+])
+INTERNED_REVIEW = frozenset(["outcome"])
+DEFAULT_REVIEW = {"outcome": "", "price": "", "notes": "", "exit_time": "", "max_drawdown_pips": ""}
+
+_MISSING = object()
+_NO_SHOTS = (None,) * (len(TIMEFRAMES) * len(MOMENTS))
+_TF_SLOT = {tf: i for i, tf in enumerate(TIMEFRAMES)}
+_MOMENT_SLOT = {moment: i for i, moment in enumerate(MOMENTS)}
+
+
+def intern_value(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def migrate_partial_closes(partial_closes):
+    for pc in partial_closes:
+        pc.setdefault("pips", 0.0)
+        if "reason_for_close" not in pc:
+            if "notes" in pc and pc["notes"] is not None:
+                pc["reason_for_close"] = pc["notes"]
+            else:
+                pc["reason_for_close"] = ""
+            pc.pop("notes", None)
+        pc.setdefault("pnl", 0.0)
+    return partial_closes
+
+
+# --- Slotted Records ---
+# Dict-like records whose known keys live in __slots__; keys outside FIELDS go
+# to a small overflow dict, so any journal round-trips unchanged.
+class Record(MutableMapping):
+    __slots__ = ("_extra",)
+    INTERNED = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple(f for f in cls.__slots__ if f != "_extra")
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, data=()):
+        self._extra = None
+        fields = self._FIELD_SET
+        interned = self.INTERNED
+        for key, value in (data.items() if hasattr(data, "items") else data):
+            if key in fields:
+                object.__setattr__(self, key, intern_value(value) if key in interned else value)
+            else:
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in self._FIELD_SET:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra is not None else default
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            object.__setattr__(self, key, intern_value(value) if key in self.INTERNED else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET:
+            if not hasattr(self, key):
+                raise KeyError(key)
+            object.__delattr__(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def copy(self):
+        return type(self)(self)
+
+    def to_dict(self):
+        d = {}
+        for field in self.FIELDS:
+            value = getattr(self, field, _MISSING)
+            if value is not _MISSING:
+                d[field] = value
+        if self._extra:
+            d.update(self._extra)
+        return d
+
+
+class TradeInfo(Record):
+    __slots__ = tuple(INFO_COLUMNS)
+    INTERNED = INTERNED_INFO
+
+
+class TradeReview(Record):
+    __slots__ = tuple(REVIEW_COLUMNS)
+    INTERNED = INTERNED_REVIEW
+
+
+# --- Screenshots ---
+# The six D1/H4/H1 before/after paths are one tuple, shared by every trade
+# that has no screenshots; other timeframes fall back to plain dicts.
+class Screenshots(MutableMapping):
+    __slots__ = ("_paths", "_extra")
+
+    def __init__(self, data=None):
+        self._paths = _NO_SHOTS
+        self._extra = None
+        paths = []
+        for tf in TIMEFRAMES:
+            shots = (data or {}).get(tf) or {}
+            if not all(moment in _MOMENT_SLOT for moment in shots):
+                paths.extend((None,) * len(MOMENTS))
+                self[tf] = shots
+                continue
+            paths.extend(shots.get(moment) for moment in MOMENTS)
+        if any(paths):
+            self._paths = tuple(paths)
+        for tf, shots in (data or {}).items():
+            if tf not in _TF_SLOT:
+                self[tf] = shots
+
+    def path(self, tf, moment):
+        return self._paths[_TF_SLOT[tf] * len(MOMENTS) + _MOMENT_SLOT[moment]]
+
+    def set_path(self, tf, moment, path):
+        paths = list(self._paths)
+        paths[_TF_SLOT[tf] * len(MOMENTS) + _MOMENT_SLOT[moment]] = path
+        self._paths = tuple(paths) if any(paths) else _NO_SHOTS
+
+    def __getitem__(self, tf):
+        if self._extra is not None and tf in self._extra:
+            return self._extra[tf]
+        if tf in _TF_SLOT:
+            return ScreenshotPair(self, tf)
+        raise KeyError(tf)
+
+    def __setitem__(self, tf, shots):
+        shots = shots or {}
+        if tf in _TF_SLOT and all(moment in _MOMENT_SLOT for moment in shots):
+            for moment in MOMENTS:
+                self.set_path(tf, moment, shots.get(moment))
+            if self._extra is not None:
+                self._extra.pop(tf, None)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[tf] = shots
+
+    def __delitem__(self, tf):
+        if tf in _TF_SLOT:
+            self[tf] = None
+        elif self._extra is not None and tf in self._extra:
+            del self._extra[tf]
+        else:
+            raise KeyError(tf)
+
+    def __iter__(self):
+        yield from TIMEFRAMES
+        if self._extra:
+            yield from (tf for tf in self._extra if tf not in _TF_SLOT)
+
+    def __len__(self):
+        return len(TIMEFRAMES) + sum(1 for tf in self._extra or () if tf not in _TF_SLOT)
+
+    def __repr__(self):
+        return f"Screenshots({self.to_dict()!r})"
+
+    def to_dict(self):
+        d = {tf: {moment: self.path(tf, moment) for moment in MOMENTS} for tf in TIMEFRAMES}
+        if self._extra:
+            d.update(self._extra)
+        return d
+
+
+class ScreenshotPair(MutableMapping):
+    __slots__ = ("_owner", "_tf")
+
+    def __init__(self, owner, tf):
+        self._owner = owner
+        self._tf = tf
+
+    def __getitem__(self, moment):
+        if moment not in _MOMENT_SLOT:
+            raise KeyError(moment)
+        return self._owner.path(self._tf, moment)
+
+    def __setitem__(self, moment, path):
+        if moment not in _MOMENT_SLOT:
+            raise KeyError(moment)
+        self._owner.set_path(self._tf, moment, path)
+
+    def __delitem__(self, moment):
+        self[moment] = None
+
+    def __iter__(self):
+        return iter(MOMENTS)
+
+    def __len__(self):
+        return len(MOMENTS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# --- Trade Class ---
+class Trade:
+    __slots__ = ("symbol", "timeframe", "info", "_screenshots", "review", "partial_closes", "sl_to_be")
+
+    def __init__(self, symbol, timeframe, info=None, tf_screenshots=None, review=None, partial_closes=None, sl_to_be=False):
+        self.symbol = intern_value(symbol)
+        self.timeframe = intern_value(timeframe)
+        self.info = info if isinstance(info, TradeInfo) else TradeInfo(info or {})
+        self.tf_screenshots = tf_screenshots
+        self.review = review if isinstance(review, TradeReview) else TradeReview(review or DEFAULT_REVIEW)
+        self.partial_closes = partial_closes or []
+        for pc in self.partial_closes:
+            if "reason_for_close" in pc:
+                pc["reason_for_close"] = intern_value(pc["reason_for_close"])
+        self.sl_to_be = sl_to_be
+
+    @property
+    def tf_screenshots(self):
+        return self._screenshots
+
+    @tf_screenshots.setter
+    def tf_screenshots(self, value):
+        self._screenshots = value if isinstance(value, Screenshots) else Screenshots(value)
+
+    def to_dict(self):
+        return {
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "info": self.info.to_dict(),
+            "tf_screenshots": self._screenshots.to_dict(),
+            "review": self.review.to_dict(),
+            "partial_closes": self.partial_closes,
+            "sl_to_be": self.sl_to_be
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        review = TradeReview({**DEFAULT_REVIEW, **d.get("review", {})})
+        return cls(
+            d.get("symbol", ""),
+            d.get("timeframe", ""),
+            d.get("info", {}),
+            d.get("tf_screenshots", {}),
+            review,
+            migrate_partial_closes(d.get("partial_closes", [])),
+            sl_to_be=d.get("sl_to_be", False)
+        )
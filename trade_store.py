@@ -0,0 +1,168 @@
+import hashlib
+import json
+
+from trade_model import Trade
+from trade_table import TradeTable, journal_trade_fields
+from filter_index import BitmapIndex
+from stats_cube import StatsCube
+import profiling
+
+DIGEST_SIZE = 8
+
+
+def trade_digest(trade_dict):
+    raw = json.dumps(trade_dict, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=DIGEST_SIZE).digest()
+
+
+# --- Shared Trade Store ---
+# One copy of the journal for the main window and any open stats pages: the
+# Trade objects, plus the table, bitmap index and stats cube built from them.
+# The table/index/cube describe the saved journal; listeners hear about every
+# change to it as (kind, index, journal dict) with kind "add", "edit" or
+# "delete" (no dict). The dict is the trade as changed, so listeners never have
+# to read it back from a backend that may already be further along.
+class TradeStore:
+    def __init__(self, trades=None, table=None, backend=None):
+        self.trades = trades  # None when rows are fetched from the backend on demand
+        self.backend = backend
+        self.table = table if table is not None else TradeTable()
+        self.index = BitmapIndex.from_table(self.table)
+        self.cube = StatsCube.from_table(self.table)
+        self.digests = None
+        self.unloaded = None  # summary cube of journal partitions left out of the table
+        self.search = None  # text_index.SearchIndex once one is attached
+        self.source = None  # the journal object the table was read from
+        self.signature = None  # its files' mtime/size before that read (text_index.journal_signature)
+        self._listeners = []
+
+    @classmethod
+    def from_journal(cls, journal_trades, progress=None, backend=None, keep_trades=True, digests=False):
+        # Digests come from the dicts as read, before Trade.from_dict migrates
+        # old partial closes, so a re-read of the same journal matches them.
+        saved = [trade_digest(d) for d in journal_trades] if digests else None
+        with profiling.span("table.build"):
+            table = TradeTable.from_journal(journal_trades, progress)
+        profiling.count("trades_parsed", len(table))
+        if progress:
+            progress(len(table), len(table), "Indexing")
+        trades = None
+        if keep_trades:
+            with profiling.span("trade.from_dict"):
+                trades = [Trade.from_dict(d) for d in journal_trades]
+        with profiling.span("index.build"):
+            store = cls(trades, table, backend)
+        store.digests = saved
+        return store
+
+    def __len__(self):
+        return len(self.table)
+
+    def all_time_cube(self):
+        if self.unloaded is None:
+            return self.cube
+        cube = StatsCube.from_dict(self.cube.to_dict())
+        cube.merge(self.unloaded)
+        return cube
+
+    def get_trade(self, idx):
+        if self.trades is None:
+            return Trade.from_dict(self.backend.get_trade(idx))
+        return self.trades[idx]
+
+    def trade_dict(self, idx):
+        if self.trades is None:
+            return self.backend.get_trade(idx)
+        return self.trades[idx].to_dict()
+
+    # --- Listeners ---
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, kind, idx, trade_dict=None):
+        for listener in list(self._listeners):
+            listener(kind, idx, trade_dict)
+
+    # --- Saved State ---
+    def mark_saved(self):
+        # Per-trade content digests; save_trades compares against them instead
+        # of keeping a serialized copy of every trade.
+        self.digests = [trade_digest(t.to_dict()) for t in self.trades]
+
+    def record(self, idx, trade_dict, digest=None):
+        row = journal_trade_fields(trade_dict)
+        row["ID"] = idx + 1
+        if idx == len(self.table):
+            self.table.append_row(row)
+            self.index.add(row)
+            self.cube.add(row)
+            kind = "add"
+        else:
+            self.cube.replace(self.table.row(idx), row)
+            self.table.set_row(idx, row)
+            self.index.update(idx, row)
+            kind = "edit"
+        if self.digests is not None:
+            digest = digest or trade_digest(trade_dict)
+            if idx == len(self.digests):
+                self.digests.append(digest)
+            else:
+                self.digests[idx] = digest
+        self._notify(kind, idx, trade_dict)
+
+    def forget(self, idx):
+        self.cube.remove(self.table.row(idx))
+        self.table.delete_row(idx)
+        self.index.delete(idx)
+        if self.digests is not None:
+            del self.digests[idx]
+        self._notify("delete", idx)
+
+    # --- Edits ---
+    def add(self, trade):
+        if self.trades is not None:
+            self.trades.append(trade)
+        self.record(len(self.table), trade.to_dict())
+
+    def extend(self, trades):
+        # Bulk append (imports): the table, index and cube grow once for the batch.
+        trade_dicts = [t.to_dict() for t in trades]
+        new = TradeTable.from_journal(trade_dicts)
+        if self.trades is not None:
+            self.trades.extend(trades)
+        start = self.table.extend(new)
+        self.index.extend(self.table, start)
+        self.cube.merge(StatsCube.from_table(new))
+        if self.digests is not None:
+            self.digests.extend(trade_digest(d) for d in trade_dicts)
+        for idx, trade_dict in enumerate(trade_dicts, start=start):
+            self._notify("add", idx, trade_dict)
+
+    def replace(self, idx, trade):
+        if self.trades is not None:
+            self.trades[idx] = trade
+        self.record(idx, trade.to_dict())
+
+    def delete(self, idx):
+        if self.trades is not None:
+            del self.trades[idx]
+        self.forget(idx)
+
+    def apply_change(self, kind, idx, trade_dict=None, digest=None):
+        # A change made to the journal elsewhere, as (kind, index, journal dict).
+        if kind == "delete":
+            self.delete(idx)
+            return
+        if self.digests is not None and digest is None:
+            digest = trade_digest(trade_dict)
+        if self.trades is not None:
+            trade = Trade.from_dict(trade_dict)
+            if idx == len(self.trades):
+                self.trades.append(trade)
+            else:
+                self.trades[idx] = trade
+        self.record(idx, trade_dict, digest)
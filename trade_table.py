@@ -0,0 +1,290 @@
+import numpy as np
+
+from trade_metrics import compute_metrics, metric_inputs, parse_datetimes, to_float
+
+CATEGORICAL_FIELDS = [
+    "Setup", "Entry Type", "Market Session",
+    "Stop Loss Reason", "Reason for Close", "Take Profit Reason",
+]
+NUMERIC_FIELDS = {
+    "ID": np.int64,
+    "Stop Loss Size": np.float64,
+    "P&L": np.float64,
+    "R:R": np.float64,
+    "Win": np.bool_,
+    "Hold Time": np.float64,
+    "Trade Date": "datetime64[D]",
+    "Account Balance": np.float64,
+}
+DATE_FILTERS = ("From Date", "To Date")
+TABLE_COLUMNS = ("ID", "Setup", "Entry Type", "P&L", "R:R", "Win", "Hold Time")
+PROGRESS_EVERY = 5000
+
+
+def category_value(value):
+    return "" if value is None else str(value)
+
+
+def journal_trade_fields(t):
+    row = base_trade_fields(t)
+    rr, hold = compute_metrics([metric_inputs(t)], [row["P&L"]])
+    row["R:R"] = float(rr[0])
+    row["Hold Time"] = float(hold[0])
+    return row
+
+
+def base_trade_fields(t):
+    info = t.get("info", {})
+    review = t.get("review", {})
+    outcome = review.get("outcome", "") or ""
+    return {
+        "Setup": info.get("setup", ""),
+        "Entry Type": info.get("entry", ""),
+        "Market Session": info.get("market_session", ""),
+        "Stop Loss Reason": info.get("sl_reason", ""),
+        "Reason for Close": outcome,
+        "Take Profit Reason": info.get("tp_reason", ""),
+        "Stop Loss Size": to_float(info.get("sl_pips", 0.0)),
+        "P&L": to_float(review.get("price")),
+        "R:R": 0.0,
+        "Win": outcome.lower() == "take profit hit",
+        "Hold Time": 0,
+        "Trade Date": str(info.get("trade_date") or ""),
+        "Account Balance": to_float(info.get("account_balance")),
+    }
+
+
+def to_column(values, dtype):
+    if dtype == NUMERIC_FIELDS["Trade Date"]:
+        # Journal dates are free text; parse_datetimes handles the layouts the app writes.
+        return parse_datetimes([str(v or "") for v in values]).astype(dtype)
+    return np.array(values, dtype=dtype)
+
+
+def parse_day(value):
+    return to_column([value], NUMERIC_FIELDS["Trade Date"])[0]
+
+
+# --- Columnar Trade Store ---
+class TradeTable:
+    def __init__(self):
+        self.categories = {field: [] for field in CATEGORICAL_FIELDS}
+        self._category_codes = {field: {} for field in CATEGORICAL_FIELDS}
+        self.codes = {field: np.empty(0, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        self.columns = {field: np.empty(0, dtype=dtype) for field, dtype in NUMERIC_FIELDS.items()}
+        self._sort_cache = {}
+
+    def __len__(self):
+        return len(self.columns["ID"])
+
+    @classmethod
+    def from_rows(cls, rows):
+        table = cls()
+        rows = list(rows)
+        for field in CATEGORICAL_FIELDS:
+            lookup = table._category_codes[field]
+            values = [category_value(r[field]) for r in rows]
+            # setdefault hands each new value the next code; dict order is code order.
+            table.codes[field] = np.array([lookup.setdefault(v, len(lookup)) for v in values], dtype=np.int32)
+            table.categories[field] = list(lookup)
+        for field, dtype in NUMERIC_FIELDS.items():
+            table.columns[field] = to_column([r[field] for r in rows], dtype)
+        return table
+
+    @classmethod
+    def concat(cls, tables):
+        table = cls()
+        if not tables:
+            return table
+        for field in CATEGORICAL_FIELDS:
+            lookup = table._category_codes[field]
+            parts = []
+            for t in tables:
+                remap = np.array([lookup.setdefault(v, len(lookup)) for v in t.categories[field]], dtype=np.int32)
+                parts.append(remap[t.codes[field]] if len(remap) else t.codes[field])
+            table.codes[field] = np.concatenate(parts)
+            table.categories[field] = list(lookup)
+        for field in NUMERIC_FIELDS:
+            table.columns[field] = np.concatenate([t.columns[field] for t in tables])
+        table.columns["ID"] = np.arange(1, len(table) + 1)
+        return table
+
+    def extend(self, other):
+        start = len(self)
+        for field in CATEGORICAL_FIELDS:
+            remap = np.array([self._intern(field, v) for v in other.categories[field]], dtype=np.int32)
+            codes = remap[other.codes[field]] if len(remap) else other.codes[field]
+            self.codes[field] = np.concatenate((self.codes[field], codes))
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = np.concatenate((self.columns[field], other.columns[field]))
+        self.columns["ID"][start:] = np.arange(start + 1, len(self) + 1)
+        self._sort_cache.clear()
+        return start
+
+    def take(self, order):
+        for field in CATEGORICAL_FIELDS:
+            self.codes[field] = self.codes[field][order]
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = self.columns[field][order]
+        self.columns["ID"] = np.arange(1, len(self) + 1)
+        self._sort_cache.clear()
+
+    @classmethod
+    def from_journal(cls, journal_trades, progress=None):
+        rows = []
+        inputs = []
+        total = len(journal_trades)
+        for idx, t in enumerate(journal_trades):
+            row = base_trade_fields(t)
+            row["ID"] = idx + 1
+            rows.append(row)
+            inputs.append(metric_inputs(t))
+            if progress and idx % PROGRESS_EVERY == 0:
+                progress(idx, total, "Parsing trades")
+        table = cls.from_rows(rows)
+        if progress:
+            progress(total, total, "Computing R:R and hold times")
+        # R:R and hold time are computed for the whole journal in one batch.
+        table.columns["R:R"], table.columns["Hold Time"] = compute_metrics(inputs, table.columns["P&L"])
+        return table
+
+    def append_row(self, row):
+        for field in CATEGORICAL_FIELDS:
+            code = np.array([self._intern(field, row[field])], dtype=np.int32)
+            self.codes[field] = np.concatenate((self.codes[field], code))
+        for field, dtype in NUMERIC_FIELDS.items():
+            self.columns[field] = np.concatenate((self.columns[field], to_column([row[field]], dtype)))
+        self._sort_cache.clear()
+        return len(self) - 1
+
+    def set_row(self, i, row):
+        for field in CATEGORICAL_FIELDS:
+            self.codes[field][i] = self._intern(field, row[field])
+        for field, dtype in NUMERIC_FIELDS.items():
+            self.columns[field][i] = to_column([row[field]], dtype)[0]
+        self._sort_cache.clear()
+
+    def delete_row(self, i):
+        for field in CATEGORICAL_FIELDS:
+            self.codes[field] = np.delete(self.codes[field], i)
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = np.delete(self.columns[field], i)
+        self.columns["ID"][i:] -= 1  # IDs are journal positions
+        self._sort_cache.clear()
+
+    def _intern(self, field, value):
+        value = category_value(value)
+        lookup = self._category_codes[field]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[field])
+            self.categories[field].append(value)
+        return code
+
+    def code_for(self, field, value):
+        return self._category_codes[field].get(value, -1)
+
+    def distinct(self, field):
+        return sorted(self.categories[field])
+
+    # --- Filtering ---
+    def mask(self, filters):
+        mask = np.ones(len(self), dtype=bool)
+        for field, value in filters.items():
+            if field == "Stop Loss Size":
+                try:
+                    min_sl_size = float(value)
+                except (TypeError, ValueError):
+                    continue
+                mask &= self.columns["Stop Loss Size"] >= min_sl_size
+            elif field in DATE_FILTERS:
+                day = parse_day(value) if value else np.datetime64("NaT", "D")
+                if np.isnat(day):
+                    continue
+                dates = self.columns["Trade Date"]
+                mask &= (dates >= day) if field == "From Date" else (dates <= day)
+            elif value != "ANY":
+                code = self.code_for(field, value)
+                if code < 0:
+                    mask[:] = False
+                else:
+                    mask &= self.codes[field] == code
+        return mask
+
+    def indices(self, mask=None):
+        if mask is None:
+            return np.arange(len(self))
+        return np.flatnonzero(mask)
+
+    # --- Sorting ---
+    def _sort_key(self, field, descending):
+        if field in self.codes:
+            categories = self.categories[field]
+            rank = np.empty(len(categories), dtype=np.int64)
+            rank[sorted(range(len(categories)), key=categories.__getitem__)] = np.arange(len(categories))
+            key = rank[self.codes[field]]
+        elif field == "Trade Date":
+            key = self.columns[field].astype(np.int64).astype(np.float64)
+        else:
+            key = self.columns[field].astype(np.float64)
+        return -key if descending else key
+
+    def sort_permutation(self, sort_keys):
+        # sort_keys: ((field, descending), ...) with the primary key first.
+        sort_keys = tuple(sort_keys)
+        perm = self._sort_cache.get(sort_keys)
+        if perm is None:
+            keys = [self._sort_key(field, descending) for field, descending in reversed(sort_keys)]
+            perm = self._sort_cache[sort_keys] = np.lexsort(keys) if keys else np.arange(len(self))
+        return perm
+
+    def sorted_indices(self, mask=None, sort_keys=()):
+        if not sort_keys:
+            return self.indices(mask)
+        perm = self.sort_permutation(sort_keys)
+        return perm if mask is None else perm[mask[perm]]
+
+    # --- Aggregates ---
+    def aggregates(self, mask=None):
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool)
+        total_trades = int(np.count_nonzero(mask))
+        wins = int(np.count_nonzero(self.columns["Win"] & mask))
+        if total_trades:
+            total_pnl = float(self.columns["P&L"][mask].sum())
+            pnl_std = float(self.columns["P&L"][mask].std())
+            avg_rr = float(self.columns["R:R"][mask].mean())
+            avg_hold_time = float(self.columns["Hold Time"][mask].mean())
+            win_rate = wins / total_trades * 100
+        else:
+            total_pnl = pnl_std = avg_rr = avg_hold_time = win_rate = 0.0
+        return {
+            "total_trades": total_trades,
+            "wins": wins,
+            "losses": total_trades - wins,
+            "win_rate": win_rate,
+            "total_pnl": total_pnl,
+            "avg_rr": avg_rr,
+            "avg_hold_time": avg_hold_time,
+            "pnl_std": pnl_std,
+        }
+
+    # --- Row Access ---
+    def row(self, i):
+        record = {field: self.categories[field][self.codes[field][i]] for field in CATEGORICAL_FIELDS}
+        for field in NUMERIC_FIELDS:
+            record[field] = self.columns[field][i].item()
+        day = record["Trade Date"]
+        record["Trade Date"] = day.isoformat() if day is not None else ""
+        return record
+
+    def table_values(self, i):
+        return (
+            int(self.columns["ID"][i]),
+            self.categories["Setup"][self.codes["Setup"][i]],
+            self.categories["Entry Type"][self.codes["Entry Type"][i]],
+            f"${self.columns['P&L'][i]:.2f}",
+            f"{self.columns['R:R'][i]:.2f}",
+            "\u2705" if self.columns["Win"][i] else "\u274c",
+            f"{self.columns['Hold Time'][i]:.0f} min",
+        )
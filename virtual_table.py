@@ -0,0 +1,117 @@
+import tkinter as tk
+from tkinter import ttk
+
+import profiling
+
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 24
+
+
+# --- Virtualized Treeview ---
+# Only the rows in view (plus a small buffer) exist as Treeview items. Items
+# are keyed by table position, so a new row list is applied as a diff.
+class VirtualTreeview(ttk.Frame):
+    def __init__(self, master, columns, values_for, buffer=5, **tree_kwargs):
+        super().__init__(master)
+        self.values_for = values_for
+        self.buffer = buffer
+        self.rows = []
+        self.first = 0
+        self.visible_count = 1
+        self.tree = ttk.Treeview(self, columns=columns, **tree_kwargs)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._on_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_key(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self.visible_count))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self.visible_count))
+
+    def _row_height(self):
+        height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            return int(height) or DEFAULT_ROW_HEIGHT
+        except (TypeError, ValueError):
+            return DEFAULT_ROW_HEIGHT
+
+    def _on_configure(self, event):
+        visible_count = max(1, (event.height - HEADING_HEIGHT) // self._row_height())
+        if visible_count != self.visible_count:
+            self.visible_count = visible_count
+            self.render()
+
+    def _on_mousewheel(self, event):
+        self._scroll_by(-1 if event.delta > 0 else 1)
+        return "break"
+
+    def _on_key(self, step):
+        window = self.tree.get_children()
+        focus = self.tree.focus()
+        if focus not in window:
+            return None
+        pos = window.index(focus) + step
+        if 0 <= pos < min(len(window), self.visible_count):
+            return None
+        target = self.first + pos
+        if not 0 <= target < len(self.rows):
+            return "break"
+        self._scroll_by(step)
+        iid = str(self.rows[target])
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        return "break"
+
+    def _scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def scroll_to(self, first):
+        max_first = max(0, len(self.rows) - self.visible_count)
+        first = min(max(0, int(first)), max_first)
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self._scroll_by(amount * self.visible_count if args[2] == "pages" else amount)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.first = min(self.first, max(0, len(rows) - self.visible_count))
+        self.render()
+
+    def refresh(self):
+        for iid in self.tree.get_children():
+            self.tree.item(iid, values=self.values_for(int(iid)))
+
+    def render(self):
+        with profiling.span("treeview.render"):
+            self._render()
+
+    def _render(self):
+        window = [str(pos) for pos in self.rows[self.first:self.first + self.visible_count + self.buffer]]
+        wanted = set(window)
+        current = self.tree.get_children()
+        stale = [iid for iid in current if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        existing = set(current) - set(stale)
+        for i, iid in enumerate(window):
+            if iid in existing:
+                self.tree.move(iid, "", i)
+            else:
+                self.tree.insert("", i, iid=iid, values=self.values_for(int(iid)))
+        profiling.count("rows_rendered", len(window) - len(existing))
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_count) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)